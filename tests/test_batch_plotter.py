@@ -0,0 +1,60 @@
+"""Regression tests for batch plotting."""
+
+from __future__ import annotations
+
+from dataclasses import replace
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+from visulite.models.chart_config import ChartConfig  # noqa: E402
+from visulite.services.batch_manifest import BatchManifest  # noqa: E402
+from visulite.services.batch_plotter import BatchJob, BatchPlotter  # noqa: E402
+from visulite.services.chart_manager import ChartManager  # noqa: E402
+from visulite.services.data_loader import DataLoader  # noqa: E402
+from visulite.services.export_manager import ExportManager  # noqa: E402
+
+
+def test_prune_keeps_output_taken_over_by_live_input(tmp_path):
+    source_dir = tmp_path / "data"
+    target_dir = tmp_path / "charts"
+    source_dir.mkdir()
+    (source_dir / "data.csv").write_text("x,y\n1,2\n2,3\n3,5\n", encoding="utf-8")
+    plotter = BatchPlotter(DataLoader(), ChartManager(), ExportManager())
+    job = BatchJob(target_dir, ChartConfig(x_column="x", y_columns=["y"]), (4, 3), 72, ("png",))
+
+    list(plotter.iter_results(source_dir, job))
+    (source_dir / "data.csv").unlink()
+    (source_dir / "data.tsv").write_text("x\ty\n1\t4\n2\t1\n", encoding="utf-8")
+    results = list(plotter.iter_results(source_dir, replace(job, prune=True)))
+
+    assert [result.status for result in results] == ["exported"]
+    assert (target_dir / "data.png").exists()
+    entries = BatchManifest.load(target_dir).entries
+    assert list(entries) == [str((source_dir / "data.tsv").resolve())]
+
+
+def test_combined_only_files_count_as_exported(tmp_path):
+    source_dir = tmp_path / "data"
+    source_dir.mkdir()
+    for name in ("a", "b"):
+        (source_dir / f"{name}.csv").write_text("x,y\n1,2\n2,3\n", encoding="utf-8")
+    plotter = BatchPlotter(DataLoader(), ChartManager(), ExportManager())
+    job = BatchJob(
+        tmp_path / "charts",
+        ChartConfig(x_column="x", y_columns=["y"]),
+        (4, 3),
+        72,
+        (),
+        combined_pdf=True,
+    )
+
+    results = list(plotter.iter_results(source_dir, job))
+
+    assert [(result.status, result.outputs) for result in results[:2]] == [
+        ("exported", ()),
+        ("exported", ()),
+    ]
+    assert results[-1].status == "combined"
+    assert (tmp_path / "charts" / "charts.pdf").exists()
@@ -0,0 +1,51 @@
+"""Histogram binning compared with numpy's bin rules."""
+
+from __future__ import annotations
+
+import logging
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from visulite.services.binning import MAX_BINS, HistogramCache, bin_edges
+
+
+@pytest.mark.parametrize("rule", ["fd", "sturges"])
+def test_data_driven_rules_match_numpy(rule):
+    values = np.random.default_rng(0).normal(size=5_000)
+    np.testing.assert_allclose(bin_edges(values, rule), np.histogram_bin_edges(values, rule))
+
+
+def test_count_and_width_rules():
+    values = np.array([0.0, 1.0, 2.5, 10.0])
+    np.testing.assert_allclose(bin_edges(values, "count", bins=4), [0.0, 2.5, 5.0, 7.5, 10.0])
+    np.testing.assert_allclose(bin_edges(values, "width", width=4.0), [0.0, 4.0, 8.0, 12.0])
+    with pytest.raises(ValueError):
+        bin_edges(values, "width", width=0.0)
+
+
+def test_heavy_tail_is_capped_before_allocating(caplog):
+    rng = np.random.default_rng(1)
+    # FD would ask for ~1e16 bins here; numpy cannot allocate the edges.
+    values = np.concatenate([rng.normal(size=10_000), [1e17]])
+    with caplog.at_level(logging.INFO, logger="visulite.binning"):
+        edges = bin_edges(values, "fd")
+    assert len(edges) == MAX_BINS + 1
+    assert edges[0] == values.min() and edges[-1] == values.max()
+    assert "using 1000" in caplog.text
+
+
+def test_width_rule_is_capped():
+    edges = bin_edges(np.array([0.0, 1e9]), "width", width=1.0)
+    assert len(edges) == MAX_BINS + 1
+
+
+def test_shared_histograms_count_every_value():
+    rng = np.random.default_rng(2)
+    columns = [pd.Series(rng.normal(size=n), name=name) for n, name in [(300, "a"), (700, "b")]]
+    first, second = HistogramCache().histograms(columns, "fd")
+    np.testing.assert_array_equal(first.edges, second.edges)
+    counts, _ = np.histogram(columns[1].to_numpy(), bins=second.edges)
+    np.testing.assert_array_equal(second.counts, counts)
+    assert first.counts.sum() == 300
@@ -0,0 +1,64 @@
+"""Box plot statistics compared with numpy quantiles."""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from visulite.services.boxstats import box_stats, group_codes, grouped_box_stats
+
+
+def _reference(values: np.ndarray) -> dict:
+    q1, median, q3 = np.quantile(values, [0.25, 0.5, 0.75])
+    low, high = q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)
+    inside = values[(values >= low) & (values <= high)]
+    return {
+        "q1": q1,
+        "med": median,
+        "q3": q3,
+        "whislo": inside.min(),
+        "whishi": inside.max(),
+        "mean": values.mean(),
+        "outliers": len(values) - len(inside),
+    }
+
+
+def test_grouped_box_stats_match_numpy_quantiles():
+    rng = np.random.default_rng(0)
+    groups = pd.Series(rng.choice(["a", "b", "c", "d"], size=5_000))
+    values = rng.standard_cauchy(size=5_000)
+    values[::97] = np.nan
+    codes, labels = group_codes(groups)
+
+    stats = grouped_box_stats(values, codes, labels)
+
+    for label, box in zip(labels, stats):
+        group = values[(groups == label).to_numpy() & np.isfinite(values)]
+        expected = _reference(group)
+        assert box["label"] == label and box["count"] == len(group)
+        for key, value in expected.items():
+            np.testing.assert_allclose(box[key], value, err_msg=f"{label} {key}")
+
+
+def test_grouped_box_stats_leave_empty_groups_none():
+    codes = np.array([0, 0, 2, -1])
+    values = np.array([1.0, 3.0, np.nan, 5.0])
+    stats = grouped_box_stats(values, codes, ["a", "b", "c"])
+    assert stats[1] is None and stats[2] is None
+    assert stats[0]["med"] == 2.0
+
+
+def test_box_stats_cap_the_flier_sample():
+    values = np.concatenate([np.zeros(200), np.arange(1.0, 51.0) * 100])
+    box = box_stats(values, max_outliers=10)
+    expected = _reference(values)
+    assert box["outliers"] == expected["outliers"] == 50
+    assert len(box["fliers"]) == 10
+    assert box["fliers"][0] == 100.0 and box["fliers"][-1] == 5000.0
+
+
+def test_group_codes_keep_the_largest_groups():
+    groups = pd.Series(["a"] * 5 + ["b"] + ["c"] * 3 + [None])
+    codes, labels = group_codes(groups, max_groups=2)
+    assert labels == ["a", "c"]
+    assert list(codes) == [0] * 5 + [-1] + [1] * 3 + [-1]
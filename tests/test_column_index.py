@@ -0,0 +1,39 @@
+"""Sorted column index range queries compared with boolean masks."""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from visulite.services.column_index import ColumnIndexCache
+
+
+def test_range_queries_match_masks():
+    rng = np.random.default_rng(0)
+    values = rng.normal(size=2_000)
+    values[::50] = np.nan
+    index = ColumnIndexCache.build(pd.Series(values))
+    assert not index.monotonic
+
+    for low, high in [(-0.5, 0.5), (None, -1.0), (1.0, None), (5.0, 6.0)]:
+        expected = np.ones(len(values), dtype=bool)
+        if low is not None:
+            expected &= values >= low
+        if high is not None:
+            expected &= values <= high
+        np.testing.assert_array_equal(index.range_mask(low, high), expected)
+        np.testing.assert_array_equal(index.range_positions(low, high), np.flatnonzero(expected))
+
+
+def test_monotonic_column_gives_padded_slice():
+    index = ColumnIndexCache.build(pd.Series(np.arange(10.0)))
+    assert index.monotonic
+    assert index.range_positions(3.0, 5.5, pad=1) == slice(2, 7)
+
+
+def test_cache_reuses_index_until_column_is_replaced():
+    cache = ColumnIndexCache()
+    series = pd.Series(np.arange(5.0), name="x")
+    first = cache.get(series)
+    assert cache.get(series) is first
+    assert cache.get(pd.Series(np.arange(5.0), name="x")) is not first
@@ -0,0 +1,45 @@
+"""Correlation matrices compared with pandas."""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from visulite.services.correlation import cluster_order, correlation_matrix
+
+
+def _frame() -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    base = rng.normal(size=(3_000, 2))
+    frame = pd.DataFrame(
+        {
+            "a": base[:, 0],
+            "b": base[:, 0] * 2 + rng.normal(scale=0.5, size=3_000) + 1e3,
+            "c": base[:, 1],
+            "d": -base[:, 1] + rng.normal(scale=0.1, size=3_000),
+            "flat": np.ones(3_000),
+        }
+    )
+    frame.loc[::7, "a"] = np.nan
+    frame.loc[::11, "c"] = np.nan
+    return frame
+
+
+def test_pairwise_matches_dataframe_corr():
+    frame = _frame()
+    corr = correlation_matrix(frame, frame.columns)
+    np.testing.assert_allclose(corr, frame.corr().to_numpy(), atol=1e-5)
+
+
+def test_complete_rows_match_dropna_corr():
+    frame = _frame()
+    corr = correlation_matrix(frame, frame.columns, pairwise=False)
+    np.testing.assert_allclose(corr, frame.dropna().corr().to_numpy(), atol=1e-5)
+
+
+def test_cluster_order_puts_correlated_columns_together():
+    frame = _frame()[["a", "c", "b", "d"]]
+    order = list(cluster_order(correlation_matrix(frame, frame.columns)))
+    assert sorted(order) == [0, 1, 2, 3]
+    assert abs(order.index(0) - order.index(2)) == 1
+    assert abs(order.index(1) - order.index(3)) == 1
@@ -0,0 +1,36 @@
+"""Missing-value filling compared with pandas."""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+from pandas.testing import assert_series_equal
+
+from visulite.services.data_processor import DataProcessor
+
+
+def test_interpolate_matches_series_interpolate():
+    values = pd.Series([np.nan, 1.0, np.nan, np.nan, 4.0, np.nan, 10.0, np.nan, np.nan], name="y")
+    frame = pd.DataFrame({"y": values, "label": list("abcdefghi")})
+    filled = DataProcessor().fill_missing(frame, "interpolate")
+    assert_series_equal(filled["y"], values.interpolate())
+    assert filled["label"].equals(frame["label"])
+
+
+def test_grouped_interpolate_matches_groupwise_pandas():
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame(
+        {"g": rng.choice(["a", "b", "c"], size=300), "y": rng.normal(size=300)}
+    )
+    frame.loc[rng.random(300) < 0.3, "y"] = np.nan
+    filled = DataProcessor().fill_missing(frame, "interpolate", group_by="g")
+    expected = frame.groupby("g", sort=False)["y"].transform(
+        lambda group: group.reset_index(drop=True).interpolate().set_axis(group.index)
+    )
+    assert_series_equal(filled["y"], expected)
+
+
+def test_grouped_mean_fill():
+    frame = pd.DataFrame({"g": ["a", "a", "b", "b"], "y": [1.0, np.nan, 5.0, np.nan]})
+    filled = DataProcessor().fill_missing(frame, "mean", group_by="g")
+    assert filled["y"].tolist() == [1.0, 1.0, 5.0, 5.0]
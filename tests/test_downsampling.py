@@ -0,0 +1,54 @@
+"""Downsampling and LOD pyramids keep the envelope of the full series."""
+
+from __future__ import annotations
+
+import numpy as np
+
+from visulite.services.downsampling import lttb_indices, minmax_indices
+from visulite.services.lod import BASE_BUCKET, LodPyramid
+
+
+def _series(length: int) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    return np.cumsum(rng.normal(size=length))
+
+
+def test_minmax_keeps_every_bucket_extreme():
+    values = _series(10_000)
+    keep = minmax_indices(values, 200)
+    assert len(keep) <= 202 and keep[0] == 0 and keep[-1] == len(values) - 1
+    bucket = int(np.ceil(len(values) / 100))
+    for start in range(0, len(values), bucket):
+        block = values[start:start + bucket]
+        kept = values[keep[(keep >= start) & (keep < start + bucket)]]
+        assert kept.min() == block.min() and kept.max() == block.max()
+
+
+def test_lttb_selects_ordered_points_including_ends():
+    x = np.arange(5_000.0)
+    y = _series(5_000)
+    y[10] = np.nan
+    keep = lttb_indices(x, y, 300)
+    assert len(keep) == 300
+    assert keep[0] == 0 and keep[-1] == len(y) - 1
+    assert np.all(np.diff(keep) > 0) and 10 not in keep
+
+
+def test_lod_minmax_query_matches_bucket_extremes():
+    values = _series(BASE_BUCKET * 4_096)
+    pyramid = LodPyramid.build(values)
+    start, stop = 10_000, 200_000
+    rows, lows_highs = pyramid.query(start, stop, 1_000, "minmax")
+    np.testing.assert_array_equal(values[rows], lows_highs)
+    visible = values[start:stop]
+    assert lows_highs.min() <= visible.min() and lows_highs.max() >= visible.max()
+    assert np.all(np.diff(rows) >= 0)
+
+
+def test_lod_mean_query_and_round_trip():
+    values = _series(BASE_BUCKET * 1_024)
+    pyramid = LodPyramid.from_bytes(LodPyramid.build(values).to_bytes())
+    rows, means = pyramid.query(0, len(values), 600, "mean")
+    size = len(values) // len(means)
+    np.testing.assert_allclose(means, values.reshape(-1, size).mean(axis=1))
+    assert rows[0] == size // 2
@@ -1,5 +1,16 @@
 """VisuLite package root."""
 
-from .app import run_app
+from __future__ import annotations
+
+
+def __getattr__(name: str):
+    # The GUI pulls in Qt; import it only when asked for, so the headless
+    # command line (``python -m visulite render|batch``) never loads it.
+    if name == "run_app":
+        from .app import run_app
+
+        return run_app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = ["run_app"]
@@ -0,0 +1,6 @@
+"""``python -m visulite``: the application, or the headless ``render``/``batch`` commands."""
+
+from visulite.cli import main
+
+if __name__ == "__main__":
+    raise SystemExit(main())
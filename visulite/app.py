@@ -15,7 +15,7 @@ from .ui.styles import QSS_LIGHT, QSS_DARK
 
 
 def run_app(dark_mode: bool = False) -> int:
-    """Entrypoint used by ``python -m visulite`` as well as ``main.py``."""
+    """Entrypoint used by ``main.py`` and ``python -m visulite`` without a subcommand."""
     configure_logging()
 
     app = QApplication.instance()
@@ -0,0 +1,302 @@
+"""Command line interface: render charts without the Qt user interface.
+
+``python -m visulite render`` draws one data file and ``python -m visulite
+batch`` every data file of some folders or glob patterns, both with a chart
+configuration saved from the application (编辑 → 保存配置). Only pandas and
+Matplotlib's Agg backend are imported, so the commands start quickly on
+machines without a display. Without a subcommand the application starts.
+"""
+
+from __future__ import annotations
+
+import argparse
+import glob
+import logging
+import os
+import sys
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+import matplotlib
+
+# Before anything imports pyplot: never pick a GUI backend on a headless node.
+matplotlib.use("Agg")
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg  # noqa: E402
+from matplotlib.figure import Figure  # noqa: E402
+
+from visulite.common.logging import configure_logging  # noqa: E402
+from visulite.models.chart_config import ChartConfig  # noqa: E402
+from visulite.services.batch_book import COMBINED_NAME, BatchBook, SheetLayout  # noqa: E402
+from visulite.services.batch_plotter import BatchJob, BatchPlotter, BatchResult  # noqa: E402
+from visulite.services.chart_manager import ChartManager  # noqa: E402
+from visulite.services.config_manager import ConfigManager  # noqa: E402
+from visulite.services.data_loader import DataLoader  # noqa: E402
+from visulite.services.export_manager import (  # noqa: E402
+    ExportManager,
+    ExportTarget,
+    VectorOptions,
+)
+from visulite.services.render_cache import RenderCache  # noqa: E402
+
+logger = logging.getLogger("visulite.cli")
+
+
+class CliError(Exception):
+    """A problem with the command line's inputs, reported without a traceback."""
+
+
+def build_parser() -> argparse.ArgumentParser:
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument(
+        "-c", "--config", type=Path, default=None,
+        help="图表配置 JSON（默认使用应用中最后保存的配置）",
+    )
+    common.add_argument("--theme", default="default", help="Matplotlib 样式名（默认 default）")
+    common.add_argument(
+        "--size", type=float, nargs=2, metavar=("WIDTH", "HEIGHT"), default=(6.0, 4.0),
+        help="图表尺寸（英寸，默认 6 4）",
+    )
+    common.add_argument("--dpi", type=int, default=300, help="栅格格式的分辨率（默认 300）")
+    common.add_argument("--full-fidelity", action="store_true", help="不降采样，绘制完整数据")
+    common.add_argument(
+        "--rasterize-above", type=int, default=None, metavar="POINTS",
+        help="SVG/PDF 中点数超过此值的折线与散点按 DPI 栅格化，坐标轴与文字仍为矢量",
+    )
+    common.add_argument(
+        "--simplify", type=_tolerance, default=None, metavar="PIXELS",
+        help="SVG/PDF 中折线路径的简化容差（像素，0–1；Matplotlib 默认约 0.11）",
+    )
+    common.add_argument("-v", "--verbose", action="store_true", help="在终端输出详细日志")
+
+    parser = argparse.ArgumentParser(
+        prog="python -m visulite",
+        description="VisuLite 命令行绘图；不带子命令时启动图形界面。",
+    )
+    commands = parser.add_subparsers(dest="command", metavar="{render,batch}")
+
+    render = commands.add_parser(
+        "render", parents=[common], help="绘制一个数据文件",
+        description="绘制一个数据文件；格式由输出文件的扩展名决定。",
+    )
+    render.add_argument("source", type=Path, help="数据文件")
+    render.add_argument(
+        "-o", "--output", type=Path, action="append", required=True,
+        help="输出文件（.png/.jpg/.svg/.pdf），可重复指定以导出多种格式",
+    )
+
+    batch = commands.add_parser(
+        "batch", parents=[common], help="批量绘制文件夹或通配符匹配的数据文件",
+        description="批量绘制数据文件，每个文件按相同配置输出到目标文件夹。",
+    )
+    batch.add_argument("sources", nargs="+", help="文件夹、数据文件或通配符（如 'data/*.csv'）")
+    batch.add_argument("-o", "--output-dir", type=Path, required=True, help="目标文件夹")
+    batch.add_argument(
+        "-f", "--format", dest="formats", nargs="*", default=["png"],
+        choices=sorted(ExportManager.SUPPORTED_FORMATS),
+        help="每个文件的导出格式（默认 png；不带格式时只写合并输出）",
+    )
+    batch.add_argument(
+        "-j", "--workers", type=int, default=1, help="并行工作进程数（默认 1，即本进程内绘制）"
+    )
+    batch.add_argument(
+        "--no-incremental", dest="incremental", action="store_false",
+        help="重新绘制全部文件，忽略目标文件夹中的清单",
+    )
+    batch.add_argument("--prune", action="store_true", help="删除源文件已不存在的输出")
+    batch.add_argument("--no-cache", dest="cache", action="store_false", help="不使用渲染缓存")
+    batch.add_argument(
+        "--combined-pdf", action="store_true", help=f"同时把全部图表写入 {COMBINED_NAME}.pdf"
+    )
+    batch.add_argument(
+        "--contact-sheet", type=_sheet_layout, nargs="?", const=SheetLayout(), metavar="COLSxROWS",
+        help=f"同时生成缩略图总览 {COMBINED_NAME}_sheet_NNN.png（默认 4x5）",
+    )
+    return parser
+
+
+def _sheet_layout(text: str) -> SheetLayout:
+    try:
+        columns, rows = (int(part) for part in text.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"应为 列x行，如 4x5: {text}") from None
+    if columns < 1 or rows < 1:
+        raise argparse.ArgumentTypeError(f"行列数至少为 1: {text}")
+    return SheetLayout(columns, rows)
+
+
+def _tolerance(text: str) -> float:
+    value = float(text)
+    if not 0 < value <= 1:
+        raise argparse.ArgumentTypeError(f"简化容差应在 0 到 1 像素之间: {text}")
+    return value
+
+
+def _vector_options(args: argparse.Namespace) -> VectorOptions | None:
+    if args.rasterize_above is None and args.simplify is None:
+        return None
+    return VectorOptions(args.rasterize_above, args.simplify)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command is None:
+        from visulite.app import run_app
+
+        return run_app()
+
+    configure_logging(console_level=logging.INFO if args.verbose else logging.WARNING)
+    try:
+        config = _load_config(args.config)
+        if args.command == "render":
+            return _render(args, config)
+        return _batch(args, config)
+    except CliError as exc:
+        print(f"错误: {exc}", file=sys.stderr)
+        return 2
+    except KeyboardInterrupt:
+        return 130
+
+
+def _load_config(path: Path | None) -> ChartConfig:
+    if path is None:
+        path = ConfigManager().config_path
+        if not path.exists():
+            raise CliError("尚未保存图表配置；请在应用中保存配置或用 --config 指定 JSON 文件")
+    try:
+        return ConfigManager.read_chart_config(path)
+    except (OSError, ValueError, TypeError) as exc:
+        raise CliError(f"无法读取图表配置 {path}: {exc}") from exc
+
+
+def _render(args: argparse.Namespace, config: ChartConfig) -> int:
+    by_base: Dict[Path, List[ExportTarget]] = {}
+    for output in args.output:
+        fmt = output.suffix.lstrip(".").lower()
+        if fmt not in ExportManager.SUPPORTED_FORMATS:
+            raise CliError(f"不支持的输出格式: {output}")
+        by_base.setdefault(output.with_suffix(""), []).append(
+            ExportTarget(fmt, args.dpi, vector=_vector_options(args))
+        )
+
+    try:
+        frame, _ = DataLoader().load(args.source)
+    except Exception as exc:
+        raise CliError(f"无法加载 {args.source}: {exc}") from exc
+    missing = [column for column in config.required_columns() if column not in frame.columns]
+    if missing:
+        raise CliError(f"{args.source} 缺少列: {', '.join(missing)}")
+
+    figure = Figure(figsize=tuple(args.size), tight_layout=True)
+    FigureCanvasAgg(figure)
+    ChartManager().plot_figure(
+        figure, frame, config, theme=args.theme, full_fidelity=args.full_fidelity, draw=False
+    )
+    export_manager = ExportManager()
+    for base_path, targets in by_base.items():
+        for path in export_manager.export_many(figure, base_path, targets):
+            print(path)
+    return 0
+
+
+def _batch(args: argparse.Namespace, config: ChartConfig) -> int:
+    if args.workers < 1:
+        raise CliError("--workers 至少为 1")
+    if not args.formats and not (args.combined_pdf or args.contact_sheet):
+        raise CliError("没有输出：请用 --format 指定格式，或使用 --combined-pdf / --contact-sheet")
+    cache = RenderCache(Path.home() / ".visulite" / "render_cache") if args.cache else None
+    plotter = BatchPlotter(DataLoader(), ChartManager(), ExportManager(cache=cache))
+    groups = _source_groups(plotter, args.sources)
+    job = BatchJob(
+        args.output_dir,
+        config,
+        tuple(args.size),
+        args.dpi,
+        tuple(dict.fromkeys(args.formats)),
+        args.theme,
+        args.full_fidelity,
+        incremental=args.incremental,
+        prune=args.prune,
+        combined_pdf=args.combined_pdf,
+        contact_sheet=args.contact_sheet,
+        vector=_vector_options(args),
+    )
+
+    # One book for every folder, so they all end up in the same documents.
+    book = (
+        BatchBook(job.target_dir, job.combined_pdf, job.contact_sheet, job.dpi, job.vector)
+        if job.combined
+        else None
+    )
+    counts: Counter = Counter()
+    try:
+        for source_dir, files in groups.items():
+            results = plotter.iter_results(
+                source_dir, job, args.workers, files=files, book=book
+            )
+            try:
+                for result in results:
+                    counts[result.status] += 1
+                    print(_describe(result), flush=True)
+            finally:
+                results.close()
+        if book is not None:
+            combined = book.close()
+            if combined:
+                counts["combined"] += 1
+                print(_describe(BatchResult(job.target_dir, "combined", tuple(combined))))
+    finally:
+        if book is not None:
+            book.close(complete=False)  # an interrupted run keeps the previous documents
+    summary = ", ".join(f"{status} {count}" for status, count in counts.items())
+    print(f"完成: {summary or '没有数据文件'}", file=sys.stderr)
+    return 1 if counts["failed"] else 0
+
+
+def _source_groups(plotter: BatchPlotter, sources: Sequence[str]) -> Dict[Path, List[Path]]:
+    """Data files named by ``sources`` (folders, files or globs), grouped by folder.
+
+    Each folder is one incremental run, so its manifest entries and pruning
+    stay scoped to it.
+    """
+    extensions = plotter.data_loader.SUPPORTED_EXTENSIONS
+    groups: Dict[Path, Dict[Path, None]] = {}
+    for source in sources:
+        path = Path(source)
+        if path.is_dir():
+            matches = plotter.source_files(path)
+        elif glob.has_magic(source):
+            matches = [
+                Path(match)
+                for match in sorted(glob.glob(source, recursive=True))
+                if Path(match).suffix.lower() in extensions and os.path.isfile(match)
+            ]
+        elif path.is_file():
+            matches = [path]
+        else:
+            raise CliError(f"找不到 {source}")
+        if not matches:
+            logger.warning("No data files in %s", source)
+        for match in matches:
+            groups.setdefault(match.parent, {})[match] = None
+
+    # Outputs are named after the input's stem, in one target folder.
+    stems = Counter(match.stem for files in groups.values() for match in files)
+    clashes = sorted(stem for stem, count in stems.items() if count > 1)
+    if clashes:
+        raise CliError(f"多个输入文件同名，输出会相互覆盖: {', '.join(clashes)}")
+    return {directory: sorted(files) for directory, files in groups.items()}
+
+
+def _describe(result: BatchResult) -> str:
+    line = f"{result.status:<9} {result.source}"
+    if result.outputs and result.status != "removed":
+        line += " -> " + ", ".join(output.name for output in result.outputs)
+    if result.message:
+        line += f" ({result.message})"
+    return line
+
+
+__all__ = ["build_parser", "main"]
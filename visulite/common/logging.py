@@ -7,8 +7,12 @@ from logging.handlers import RotatingFileHandler
 from pathlib import Path
 
 
-def configure_logging(debug: bool = False) -> None:
-    """Configure logging for GUI + services."""
+def configure_logging(debug: bool = False, console_level: int | None = None) -> None:
+    """Configure logging for GUI + services.
+
+    ``console_level`` raises the threshold of console output only; the log
+    file still records everything at the package level.
+    """
     level = logging.DEBUG if debug else logging.INFO
     log_dir = Path.home() / ".visulite"
     log_dir.mkdir(parents=True, exist_ok=True)
@@ -25,6 +29,8 @@ def configure_logging(debug: bool = False) -> None:
 
     console_handler = logging.StreamHandler()
     console_handler.setFormatter(formatter)
+    if console_level is not None:
+        console_handler.setLevel(console_level)
 
     root_logger = logging.getLogger("visulite")
     root_logger.setLevel(level)
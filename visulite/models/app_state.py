@@ -4,7 +4,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, List, Optional, Tuple
 
 import pandas as pd
 
@@ -30,26 +30,37 @@ class AppState:
     original_frame: pd.DataFrame | None = None
     dataset_meta: DatasetMeta = field(default_factory=DatasetMeta)
     chart_config: ChartConfig = field(default_factory=ChartConfig)
+    # Processing steps applied since loading, e.g. ("head", 100); part of
+    # the data fingerprint used to memoize renders.
+    history: List[Tuple[Any, ...]] = field(default_factory=list)
 
     def has_data(self) -> bool:
         return self.data_frame is not None and not self.data_frame.empty
 
     def set_dataset(self, frame: pd.DataFrame, meta: DatasetMeta) -> None:
-        """Store a fresh dataset and reset processing state."""
-        self.original_frame = frame.copy()
+        """Store a fresh dataset and reset processing state.
+
+        Processing steps never modify a frame in place, so the original and
+        the working view can share column buffers.
+        """
+        self.original_frame = frame.copy(deep=False)
         self.data_frame = frame
         self.dataset_meta = meta
+        self.history = []
 
     def reset_view(self) -> pd.DataFrame | None:
         """Revert to the original dataframe."""
         if self.original_frame is None:
             return None
-        self.data_frame = self.original_frame.copy()
+        self.data_frame = self.original_frame.copy(deep=False)
+        self.history = []
         return self.data_frame
 
-    def update_view(self, frame: pd.DataFrame) -> None:
-        """Persist the current working dataframe."""
+    def update_view(self, frame: pd.DataFrame, step: Tuple[Any, ...] = ()) -> None:
+        """Persist the current working dataframe produced by processing ``step``."""
         self.data_frame = frame
+        if step:
+            self.history.append(step)
 
 
 __all__ = ["AppState", "DatasetMeta"]
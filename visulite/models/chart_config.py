@@ -21,9 +21,33 @@ class ChartConfig:
     color_scheme: str = "auto"  # "auto" or hex color like "#FF0000"
     x_label: Optional[str] = None
     y_label: Optional[str] = None
+    downsample: str = "minmax"  # "minmax", "lttb" or "none" for dense line charts
+    scatter_mode: str = "auto"  # "auto", "points" or "density"
+    bar_aggregate: str = "sum"  # "sum", "mean", "count" or "max" per X value
+    bar_top_n: int = 30  # keep the largest N X values, fold the rest into "其他"
+    bar_mode: str = "grouped"  # "grouped" or "stacked" for several Y columns
+    hist_rule: str = "count"  # "fd" (Freedman–Diaconis), "sturges", "count" or "width"
+    hist_bins: int = 30  # bin count for the "count" rule
+    hist_bin_width: float = 1.0  # bin width for the "width" rule
+    hist_shared_bins: bool = True  # bin all Y columns on common edges
+    heatmap_pairwise: bool = True  # pairwise-complete rows instead of complete rows only
+    heatmap_reorder: bool = False  # cluster correlated columns next to each other
+    box_group_by_x: bool = False  # one box per X value (and Y column) instead of per column
+    box_max_outliers: int = 1000  # outlier markers drawn per box, evenly sampled
+    grid_by: str = "none"  # small multiples: "none", "column" (per Y column) or "value"
+    grid_column: Optional[str] = None  # column whose values get a panel each for "value"
+    grid_share_y: bool = True  # grid panels share one Y axis
 
     def to_dict(self) -> dict:
         return asdict(self)
 
+    def required_columns(self) -> List[str]:
+        """Columns a data file must have to be plotted with this configuration."""
+        columns = [self.x_column] if self.x_column else []
+        columns += list(self.y_columns)
+        if self.grid_by == "value" and self.grid_column:
+            columns.append(self.grid_column)
+        return columns
+
 
 __all__ = ["ChartConfig"]
@@ -0,0 +1,116 @@
+"""Shared Qt list model of dataset column names."""
+
+from __future__ import annotations
+
+from typing import Iterable, List, Set
+
+from PySide6.QtCore import QAbstractListModel, QIdentityProxyModel, QModelIndex, Qt
+
+
+class ColumnListModel(QAbstractListModel):
+    """Single source of column names for every column picker.
+
+    Pickers attach views or proxies to one instance, so loading a dataset
+    resets one model instead of repopulating each widget item by item.
+    """
+
+    def __init__(self, columns: Iterable[str] | None = None) -> None:
+        super().__init__()
+        self._columns: List[str] = list(columns or [])
+        self._positions: dict[str, int] = {}
+        self._reindex()
+
+    def set_columns(self, columns: Iterable[str]) -> None:
+        self.beginResetModel()
+        self._columns = [str(column) for column in columns]
+        self._reindex()
+        self.endResetModel()
+
+    def columns(self) -> List[str]:
+        return list(self._columns)
+
+    def position(self, column: str) -> int:
+        """Return the row of ``column`` or ``-1`` if it is unknown."""
+        return self._positions.get(column, -1)
+
+    def _reindex(self) -> None:
+        self._positions = {column: row for row, column in enumerate(self._columns)}
+
+    # Qt overrides
+    def rowCount(self, parent: QModelIndex | None = None) -> int:  # noqa: N802
+        return 0 if parent and parent.isValid() else len(self._columns)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):  # noqa: N802
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.EditRole, Qt.ToolTipRole):
+            return None
+        return self._columns[index.row()]
+
+
+class CheckableColumnProxy(QIdentityProxyModel):
+    """Adds check boxes on top of a :class:`ColumnListModel`.
+
+    Checked columns are stored by name, so they survive search filtering
+    and are dropped only when the underlying column list changes.
+    """
+
+    def __init__(self, source: ColumnListModel) -> None:
+        super().__init__()
+        self._checked: Set[str] = set()
+        self.setSourceModel(source)
+        source.modelReset.connect(self._prune)
+
+    def checked_columns(self) -> List[str]:
+        """Checked column names in dataset order."""
+        source: ColumnListModel = self.sourceModel()  # type: ignore[assignment]
+        return [column for column in source.columns() if column in self._checked]
+
+    def set_checked_columns(self, columns: Iterable[str]) -> None:
+        source: ColumnListModel = self.sourceModel()  # type: ignore[assignment]
+        self._checked = {column for column in columns if source.position(column) >= 0}
+        self._emit_all_changed()
+
+    def set_checked(self, columns: Iterable[str], checked: bool) -> None:
+        names = set(columns)
+        if checked:
+            self._checked |= names
+        else:
+            self._checked -= names
+        self._emit_all_changed()
+
+    def _prune(self) -> None:
+        source: ColumnListModel = self.sourceModel()  # type: ignore[assignment]
+        self._checked = {column for column in self._checked if source.position(column) >= 0}
+
+    def _emit_all_changed(self) -> None:
+        rows = self.rowCount()
+        if rows:
+            self.dataChanged.emit(
+                self.index(0, 0), self.index(rows - 1, 0), [Qt.CheckStateRole]
+            )
+
+    # Qt overrides
+    def flags(self, index: QModelIndex):  # noqa: N802
+        # Not user-checkable: views toggle on click so the whole row is a target.
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):  # noqa: N802
+        if role == Qt.CheckStateRole and index.isValid():
+            column = super().data(index, Qt.DisplayRole)
+            return Qt.Checked if column in self._checked else Qt.Unchecked
+        return super().data(index, role)
+
+    def setData(self, index: QModelIndex, value, role: int = Qt.EditRole) -> bool:  # noqa: N802
+        if role != Qt.CheckStateRole or not index.isValid():
+            return False
+        column = super().data(index, Qt.DisplayRole)
+        if value in (Qt.Checked, Qt.Checked.value):
+            self._checked.add(column)
+        else:
+            self._checked.discard(column)
+        self.dataChanged.emit(index, index, [Qt.CheckStateRole])
+        return True
+
+
+__all__ = ["ColumnListModel", "CheckableColumnProxy"]
@@ -2,22 +2,51 @@
 
 from __future__ import annotations
 
+from collections import OrderedDict
+
 from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt
+import numpy as np
 import pandas as pd
 
 
 class DataFrameModel(QAbstractTableModel):
-    """Expose pandas frames to Qt's model/view framework."""
+    """Expose pandas frames to Qt's model/view framework.
+
+    Columns are materialised lazily: the view only asks for visible cells,
+    and each requested column is converted to a NumPy array once and kept in
+    a small LRU, so very wide frames cost nothing for off-screen columns.
+    """
+
+    # Roughly a few screens of horizontally scrolled columns.
+    COLUMN_CACHE_SIZE = 256
 
     def __init__(self, frame: pd.DataFrame | None = None) -> None:
         super().__init__()
         self._frame = frame if frame is not None else pd.DataFrame()
+        self._columns: "OrderedDict[int, object]" = OrderedDict()
 
     def update_frame(self, frame: pd.DataFrame) -> None:
         self.beginResetModel()
         self._frame = frame
+        self._columns.clear()
         self.endResetModel()
 
+    def _column_values(self, column: int):
+        values = self._columns.get(column)
+        if values is None:
+            series = self._frame.iloc[:, column]
+            if isinstance(series.dtype, np.dtype) and series.dtype.kind not in "mM":
+                values = series.to_numpy()
+            else:
+                # Keep pandas scalars (Timestamp, NA, ...) so cells read as before.
+                values = series.array
+            self._columns[column] = values
+            if len(self._columns) > self.COLUMN_CACHE_SIZE:
+                self._columns.popitem(last=False)
+        else:
+            self._columns.move_to_end(column)
+        return values
+
     # Qt overrides
     def flags(self, index: QModelIndex):  # noqa: N802
         if not index.isValid():
@@ -35,7 +64,7 @@ class DataFrameModel(QAbstractTableModel):
     ) -> str | None:
         if not index.isValid() or role not in (Qt.DisplayRole, Qt.EditRole):
             return None
-        value = self._frame.iat[index.row(), index.column()]
+        value = self._column_values(index.column())[index.row()]
         return "" if pd.isna(value) else str(value)
 
     def headerData(  # noqa: N802
@@ -63,6 +92,7 @@ class DataFrameModel(QAbstractTableModel):
 
         ascending = order == Qt.AscendingOrder
         self.layoutAboutToBeChanged.emit()
+        self._columns.clear()
         self._frame = (
             self._frame.assign(__sort_key=sort_key)
             .sort_values(by="__sort_key", ascending=ascending, kind="mergesort")
@@ -0,0 +1,177 @@
+"""Group-by aggregation for bar charts."""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import List, Sequence
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger("visulite.aggregation")
+
+BAR_AGGREGATES = ("sum", "mean", "count", "max")
+BAR_MODES = ("grouped", "stacked")
+OTHER_LABEL = "其他"
+
+
+@dataclass(frozen=True)
+class BarTable:
+    """Aggregated bar heights: one row per category, one column per series."""
+
+    categories: List[str]
+    values: np.ndarray  # shape (len(categories), len(series))
+    series: List[str]
+    truncated: bool = False
+
+
+def aggregate_bars(
+    frame: pd.DataFrame,
+    x_column: str,
+    y_columns: Sequence[str],
+    how: str = "sum",
+    top_n: int | None = 30,
+) -> BarTable:
+    """Group ``y_columns`` by ``x_column`` and aggregate them with ``how``.
+
+    When there are more than ``top_n`` categories, the ``top_n`` largest
+    (by total across series) are kept and every other row is folded into a
+    single :data:`OTHER_LABEL` bar aggregated with the same rule. Rows with
+    a missing X value are ignored.
+    """
+    if how not in BAR_AGGREGATES:
+        raise ValueError(f"Unsupported bar aggregate {how}")
+    series = list(y_columns)
+    if how == "count":
+        data = frame[series].notna()
+    else:
+        data = pd.DataFrame(
+            {
+                column: frame[column]
+                if pd.api.types.is_numeric_dtype(frame[column])
+                and not pd.api.types.is_bool_dtype(frame[column])
+                else pd.to_numeric(frame[column], errors="coerce")
+                for column in series
+            },
+            index=frame.index,
+        )
+    grouped = data.groupby(frame[x_column], sort=True, observed=True, dropna=True)
+
+    # Keeping sums and counts lets the tail fold into "other" exactly, means included.
+    if how == "max":
+        table = grouped.max()
+        primary = table.to_numpy(dtype=np.float64, na_value=np.nan)
+        counts = None
+    else:
+        sums = grouped.sum(min_count=1)
+        primary = sums.to_numpy(dtype=np.float64, na_value=np.nan)
+        counts = grouped.count().to_numpy(dtype=np.float64)
+        table = sums
+    keys = table.index
+
+    truncated = top_n is not None and top_n > 0 and len(keys) > top_n
+    if not truncated:
+        values = _finish(primary, counts, how)
+        return BarTable(_labels(keys), values, series)
+
+    score = np.nansum(np.abs(_finish(primary, counts, how)), axis=1)
+    keep = np.sort(np.argsort(-score, kind="stable")[:top_n])
+    if not (pd.api.types.is_numeric_dtype(keys) or pd.api.types.is_datetime64_any_dtype(keys)):
+        # Unordered categories read best from the largest down.
+        keep = keep[np.argsort(-score[keep], kind="stable")]
+    rest = np.ones(len(keys), dtype=bool)
+    rest[keep] = False
+
+    if how == "max":
+        other = _nan_reduce(primary[rest], np.nanmax)[None, :]
+        values = np.vstack([primary[keep], other])
+    else:
+        other_primary = _nan_reduce(primary[rest], np.nansum)[None, :]
+        other_counts = counts[rest].sum(axis=0)[None, :]
+        values = _finish(
+            np.vstack([primary[keep], other_primary]),
+            np.vstack([counts[keep], other_counts]),
+            how,
+        )
+    logger.debug("Folded %d bar categories into '%s'", int(rest.sum()), OTHER_LABEL)
+    return BarTable(_labels(keys[keep]) + [OTHER_LABEL], values, series, truncated=True)
+
+
+def bar_geometry(
+    table: BarTable, mode: str = "grouped", width: float = 0.8
+) -> List[np.ndarray]:
+    """Rectangle vertices per series, shaped ``(n_categories, 4, 2)``.
+
+    Categories sit at integer positions. Grouped bars split ``width``
+    between the series; stacked bars pile positive and negative values
+    separately so they never overlap.
+    """
+    n_categories, n_series = table.values.shape
+    positions = np.arange(n_categories, dtype=np.float64)
+    heights = np.nan_to_num(table.values, nan=0.0)
+    polygons = []
+    if mode == "stacked":
+        positive = np.zeros(n_categories)
+        negative = np.zeros(n_categories)
+        left = positions - width / 2
+        for column in range(n_series):
+            height = heights[:, column]
+            bottom = np.where(height >= 0, positive, negative)
+            polygons.append(_rectangles(left, width, bottom, height))
+            positive += np.clip(height, 0, None)
+            negative += np.clip(height, None, 0)
+    else:
+        bar_width = width / max(n_series, 1)
+        for column in range(n_series):
+            left = positions - width / 2 + column * bar_width
+            polygons.append(
+                _rectangles(left, bar_width, np.zeros(n_categories), heights[:, column])
+            )
+    return polygons
+
+
+def _rectangles(
+    left: np.ndarray, width: float, bottom: np.ndarray, height: np.ndarray
+) -> np.ndarray:
+    right = left + width
+    top = bottom + height
+    return np.stack(
+        [
+            np.column_stack([left, bottom]),
+            np.column_stack([left, top]),
+            np.column_stack([right, top]),
+            np.column_stack([right, bottom]),
+        ],
+        axis=1,
+    )
+
+
+def _finish(primary: np.ndarray, counts: np.ndarray | None, how: str) -> np.ndarray:
+    if how == "mean":
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return primary / counts
+    return primary
+
+
+def _nan_reduce(block: np.ndarray, reducer) -> np.ndarray:
+    if not len(block):
+        return np.full(block.shape[1], np.nan)
+    valid = ~np.isnan(block).all(axis=0)
+    result = np.full(block.shape[1], np.nan)
+    result[valid] = reducer(block[:, valid], axis=0)
+    return result
+
+
+def _labels(keys: pd.Index) -> List[str]:
+    return [str(key) for key in keys]
+
+
+__all__ = [
+    "BAR_AGGREGATES",
+    "BAR_MODES",
+    "OTHER_LABEL",
+    "BarTable",
+    "aggregate_bars",
+    "bar_geometry",
+]
@@ -0,0 +1,199 @@
+"""Combined outputs of a batch run: one multi-page PDF and contact sheets."""
+
+from __future__ import annotations
+
+import io
+import logging
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List
+
+import matplotlib as mpl
+from matplotlib import font_manager
+from matplotlib.backends.backend_pdf import PdfPages
+from matplotlib.figure import Figure
+from PIL import Image, ImageDraw, ImageFont
+
+from visulite.services.export_manager import ExportTarget, VectorOptions
+from visulite.services.themes import cjk_fonts
+
+logger = logging.getLogger("visulite.batch_book")
+
+# File names in the target folder: charts.pdf, charts_sheet_001.png, ...
+COMBINED_NAME = "charts"
+_PART_SUFFIX = ".part"
+
+
+@dataclass(frozen=True)
+class SheetLayout:
+    """Thumbnails per contact sheet and their width in pixels."""
+
+    columns: int = 4
+    rows: int = 5
+    thumbnail_width: int = 320
+
+    @property
+    def per_sheet(self) -> int:
+        return self.columns * self.rows
+
+
+def render_thumbnail(figure: Figure, width: int) -> bytes:
+    """PNG of ``figure`` scaled to ``width`` pixels, for a contact sheet."""
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format="png", dpi=width / figure.get_figwidth())
+    return buffer.getvalue()
+
+
+class BatchBook:
+    """Pages of a batch run, added in file order and written as they come.
+
+    The PDF gets one page per chart through Matplotlib's ``PdfPages``,
+    which writes every page out when it is added, so memory does not grow
+    with the number of inputs. Contact sheets tile ``columns x rows``
+    thumbnails captioned with the file name and are saved as soon as they
+    are full. Everything is written under temporary names and only renamed
+    by :meth:`close` once the run completes; an interrupted run keeps the
+    previous documents.
+    """
+
+    CAPTION_SIZE = 13
+    PADDING = 8
+
+    def __init__(
+        self,
+        target_dir: Path,
+        pdf: bool,
+        sheet: SheetLayout | None,
+        dpi: int = 300,
+        vector: VectorOptions | None = None,
+    ) -> None:
+        self.target_dir = target_dir
+        self.sheet = sheet
+        self.dpi = dpi
+        self._pdf_target = ExportTarget("pdf", dpi, vector=vector)
+        self.pdf_path = target_dir / f"{COMBINED_NAME}.pdf" if pdf else None
+        self._pdf: PdfPages | None = None
+        self._pages = 0
+        self._sheet: Image.Image | None = None
+        self._tiles = 0
+        self._tile_size: tuple[int, int] | None = None
+        self._sheet_paths: List[Path] = []
+        self._font: ImageFont.ImageFont | ImageFont.FreeTypeFont | None = None
+        self._closed = False
+
+    def add(self, source: Path, page: Figure | None, thumbnail: bytes | None) -> None:
+        """Append ``source``'s chart: ``page`` to the PDF, ``thumbnail`` to the sheets."""
+        if page is not None and self.pdf_path is not None:
+            if self._pdf is None:
+                self._pdf = PdfPages(
+                    self._part(self.pdf_path), metadata={"Creator": "VisuLite"}
+                )
+            with self._pdf_target.options(page):
+                self._pdf.savefig(page, dpi=self.dpi)
+            self._pages += 1
+        if thumbnail is not None and self.sheet is not None:
+            self._add_tile(source, Image.open(io.BytesIO(thumbnail)))
+
+    def close(self, complete: bool = True) -> List[Path]:
+        """Finish the documents; with ``complete=False`` discard this run's files."""
+        if self._closed:
+            return []
+        self._closed = True
+        if self._pdf is not None:
+            self._pdf.close()
+        if self._sheet is not None and complete:
+            self._save_sheet()
+        written = ([self.pdf_path] if self._pages else []) + self._sheet_paths
+        if not complete:
+            for path in written:
+                self._part(path).unlink(missing_ok=True)
+            return []
+        for path in written:
+            os.replace(self._part(path), path)
+        if self.sheet is not None:
+            # Fewer inputs than last time leave fewer sheets; drop the extra ones.
+            for stale in self.target_dir.glob(f"{COMBINED_NAME}_sheet_*.png"):
+                if stale not in self._sheet_paths:
+                    stale.unlink(missing_ok=True)
+        logger.info(
+            "Wrote %d PDF pages and %d contact sheets to %s",
+            self._pages, len(self._sheet_paths), self.target_dir,
+        )
+        return written
+
+    @staticmethod
+    def _part(path: Path) -> Path:
+        return path.with_name(path.name + _PART_SUFFIX)
+
+    def _add_tile(self, source: Path, thumbnail: Image.Image) -> None:
+        assert self.sheet is not None
+        if self._tile_size is None:
+            self._tile_size = thumbnail.size
+        width, height = self._tile_size
+        if thumbnail.size != self._tile_size:
+            thumbnail.thumbnail(self._tile_size)
+        caption = self._caption_height()
+        if self._sheet is None:
+            self._sheet = Image.new(
+                "RGB",
+                (
+                    self.sheet.columns * (width + self.PADDING) + self.PADDING,
+                    self.sheet.rows * (height + caption + self.PADDING) + self.PADDING,
+                ),
+                "white",
+            )
+        row, column = divmod(self._tiles, self.sheet.columns)
+        left = self.PADDING + column * (width + self.PADDING)
+        top = self.PADDING + row * (height + caption + self.PADDING)
+        self._sheet.paste(thumbnail.convert("RGB"), (left, top))
+        draw = ImageDraw.Draw(self._sheet)
+        font = self._caption_font()
+        text = self._fit(draw, source.name, font, width)
+        draw.text(
+            (left + (width - draw.textlength(text, font=font)) / 2, top + height + 2),
+            text, fill="#333333", font=font,
+        )
+        self._tiles += 1
+        if self._tiles == self.sheet.per_sheet:
+            self._save_sheet()
+
+    def _save_sheet(self) -> None:
+        assert self._sheet is not None and self.sheet is not None and self._tile_size
+        used_rows = -(-self._tiles // self.sheet.columns)
+        if used_rows < self.sheet.rows:
+            row_height = self._tile_size[1] + self._caption_height() + self.PADDING
+            self._sheet = self._sheet.crop(
+                (0, 0, self._sheet.width, used_rows * row_height + self.PADDING)
+            )
+        path = self.target_dir / f"{COMBINED_NAME}_sheet_{len(self._sheet_paths) + 1:03d}.png"
+        self._sheet.save(self._part(path), format="png")
+        self._sheet_paths.append(path)
+        self._sheet = None
+        self._tiles = 0
+
+    def _caption_height(self) -> int:
+        return self.CAPTION_SIZE + 6
+
+    def _caption_font(self):
+        if self._font is None:
+            # Pillow has no per-glyph fallback, so an installed CJK font (which
+            # also covers Latin) comes first; else the font the charts use.
+            families = [*cjk_fonts(), *mpl.rcParams["font.family"]]
+            try:
+                path = font_manager.findfont(font_manager.FontProperties(family=families))
+                self._font = ImageFont.truetype(path, self.CAPTION_SIZE)
+            except OSError:
+                self._font = ImageFont.load_default(self.CAPTION_SIZE)
+        return self._font
+
+    @staticmethod
+    def _fit(draw: ImageDraw.ImageDraw, text: str, font, width: int) -> str:
+        if draw.textlength(text, font=font) <= width:
+            return text
+        while text and draw.textlength(text + "…", font=font) > width:
+            text = text[:-1]
+        return text + "…"
+
+
+__all__ = ["COMBINED_NAME", "BatchBook", "SheetLayout", "render_thumbnail"]
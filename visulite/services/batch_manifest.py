@@ -0,0 +1,132 @@
+"""Record of what a batch run produced, so later runs only redo what changed."""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Tuple
+
+from visulite.services.render_cache import render_key
+
+logger = logging.getLogger("visulite.batch_manifest")
+
+MANIFEST_NAME = ".visulite-batch.json"
+MANIFEST_VERSION = 2
+
+
+class BatchManifest:
+    """Inputs, settings and outputs of earlier batch runs into one target folder.
+
+    Each entry stores the source file's size and modification time, the
+    settings key of the run that rendered it and the output file names. An
+    input is up to date when all of these still match and the outputs
+    exist. The manifest lives in the target folder as JSON; an unreadable
+    one is treated as empty, which only means rendering everything again.
+    """
+
+    def __init__(self, path: Path, entries: Dict[str, Dict[str, Any]] | None = None) -> None:
+        self.path = path
+        self.entries: Dict[str, Dict[str, Any]] = entries or {}
+        self._dirty = False
+
+    @classmethod
+    def load(cls, target_dir: Path) -> "BatchManifest":
+        path = target_dir / MANIFEST_NAME
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return cls(path)
+        except (OSError, ValueError):
+            logger.warning("Ignoring unreadable batch manifest %s", path, exc_info=True)
+            return cls(path)
+        if data.get("version") != MANIFEST_VERSION:
+            return cls(path)
+        return cls(path, data.get("entries", {}))
+
+    @staticmethod
+    def settings_key(*settings: Any) -> str:
+        return render_key("batch", *settings)
+
+    @staticmethod
+    def _state(source: Path) -> Tuple[int, int] | None:
+        try:
+            stat = source.stat()
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def is_current(self, source: Path, outputs: Sequence[Path], settings: str) -> bool:
+        entry = self.entries.get(str(source.resolve()))
+        if entry is None or entry["settings"] != settings:
+            return False
+        if entry["outputs"] != [output.name for output in outputs]:
+            return False
+        state = self._state(source)
+        return (
+            state is not None
+            and [entry["size"], entry["mtime_ns"]] == list(state)
+            and all(output.exists() for output in outputs)
+        )
+
+    def record(self, source: Path, outputs: Sequence[Path], settings: str) -> None:
+        state = self._state(source)
+        if state is None:
+            return
+        self.entries[str(source.resolve())] = {
+            "size": state[0],
+            "mtime_ns": state[1],
+            "settings": settings,
+            "outputs": [output.name for output in outputs],
+        }
+        self._dirty = True
+
+    def stale(self, source_dir: Path) -> List[Tuple[Path, List[Path]]]:
+        """(source, outputs) of entries for ``source_dir`` whose source is gone.
+
+        Outputs that an entry with an existing source also lists (say
+        ``data.png`` of a removed ``data.csv`` and a new ``data.tsv``) are
+        left out; they belong to the live input now.
+        """
+        directory = source_dir.resolve()
+        gone = {source for source in self.entries if not Path(source).exists()}
+        live = {
+            name
+            for source, entry in self.entries.items()
+            if source not in gone
+            for name in entry["outputs"]
+        }
+        return [
+            (
+                Path(source),
+                [self.path.parent / name for name in entry["outputs"] if name not in live],
+            )
+            for source, entry in self.entries.items()
+            if source in gone and Path(source).parent == directory
+        ]
+
+    def forget(self, source: Path) -> None:
+        if self.entries.pop(str(source), None) is not None:
+            self._dirty = True
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        payload = json.dumps(
+            {"version": MANIFEST_VERSION, "entries": self.entries}, ensure_ascii=False
+        )
+        try:
+            # Write and rename, so an interrupted run never leaves half a manifest.
+            handle, temporary = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+            with os.fdopen(handle, "w", encoding="utf-8") as stream:
+                stream.write(payload)
+            os.replace(temporary, self.path)
+        except OSError:
+            logger.warning("Could not write batch manifest %s", self.path, exc_info=True)
+            return
+        self._dirty = False
+
+
+__all__ = ["MANIFEST_NAME", "BatchManifest"]
@@ -3,32 +3,143 @@
 from __future__ import annotations
 
 import logging
+import multiprocessing
+import pickle
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field, replace
 from pathlib import Path
-from typing import List
+from typing import Any, Deque, Dict, Iterator, List, Sequence, Set, Tuple
 
 from matplotlib.backends.backend_agg import FigureCanvasAgg  # type: ignore
 from matplotlib.figure import Figure
 
 from visulite.models.chart_config import ChartConfig
+from visulite.services.batch_book import BatchBook, SheetLayout, render_thumbnail
+from visulite.services.batch_manifest import BatchManifest
 from visulite.services.chart_manager import ChartManager
 from visulite.services.data_loader import DataLoader
-from visulite.services.export_manager import ExportManager
+from visulite.services.export_manager import (
+    VECTOR_FORMATS,
+    ExportManager,
+    ExportTarget,
+    VectorOptions,
+)
+from visulite.services.render_cache import DataFingerprinter, RenderCache, render_key
 
 logger = logging.getLogger("visulite.batch_plotter")
 
+_SUBPLOT_PARAMS = ("left", "bottom", "right", "top", "wspace", "hspace")
+
+
+@dataclass(frozen=True)
+class BatchJob:
+    """Settings shared by every file of one batch run."""
+
+    target_dir: Path
+    config: ChartConfig
+    figure_size: Tuple[float, float]
+    dpi: int
+    formats: Tuple[str, ...]
+    theme: str = "default"
+    full_fidelity: bool = False
+    # Skip inputs rendered with the same settings by an earlier run.
+    incremental: bool = True
+    # Delete outputs whose input file no longer exists.
+    prune: bool = False
+    # Also collect every chart into one multi-page PDF and/or contact sheets.
+    combined_pdf: bool = False
+    contact_sheet: SheetLayout | None = None
+    # Size control for SVG/PDF outputs, including the combined PDF.
+    vector: VectorOptions | None = None
+
+    @property
+    def combined(self) -> bool:
+        return self.combined_pdf or self.contact_sheet is not None
+
+    @property
+    def targets(self) -> List[ExportTarget]:
+        return [ExportTarget(fmt, self.dpi, vector=self.vector) for fmt in self.formats]
+
+    def base_path(self, source: Path) -> Path:
+        return self.target_dir / source.stem
+
+    def output_paths(self, source: Path) -> List[Path]:
+        base = self.base_path(source)
+        return [target.path_for(base) for target in self.targets]
+
+    def settings_key(self) -> str:
+        settings: list = [
+            self.config.to_dict(),
+            self.theme,
+            list(self.figure_size),
+            self.dpi,
+            list(self.formats),
+            self.full_fidelity,
+        ]
+        if self.vector is not None and VECTOR_FORMATS.intersection(self.formats):
+            # Only then; earlier manifests stay valid for runs without it.
+            settings.append(asdict(self.vector))
+        return BatchManifest.settings_key(*settings)
+
+
+@dataclass(frozen=True)
+class BatchResult:
+    """Outcome for one source file.
+
+    ``status`` is ``exported``, ``cached`` (copied from the render cache),
+    ``unchanged`` (up to date from an earlier run), ``skipped``, ``failed``
+    or ``removed`` (outputs of a deleted input, with ``prune``). ``outputs``
+    holds one file per requested format; files drawn only into the combined
+    outputs are ``exported`` with none. A last ``combined`` result, whose
+    ``source`` is the target folder, lists the multi-page PDF and contact
+    sheets.
+    """
+
+    source: Path
+    status: str
+    outputs: Tuple[Path, ...] = ()
+    message: str = ""
+    # The chart for the combined outputs; taken off before results are yielded.
+    page: Any = field(default=None, repr=False, compare=False)
+    thumbnail: bytes | None = field(default=None, repr=False, compare=False)
+
 
 class BatchPlotter:
-    """Render charts for every supported data file inside a directory."""
+    """Render charts for every supported data file inside a directory.
+
+    When the export manager has a render cache, files whose plotted columns
+    are unchanged since an earlier run are exported from the cache without
+    being plotted again. Incremental runs go further and do not even load
+    inputs that a manifest in the target folder records as rendered with
+    the same settings. With ``workers > 1`` files are spread over worker
+    processes, each with its own loader, chart manager and Matplotlib state;
+    results still come back in file order.
+
+    Each plotter (so each worker process) draws every single-chart file on
+    one figure: the axes, ticks and text artists made for the first file
+    are kept and only the data is swapped in for the next, which the chart
+    manager does in place for line and scatter charts.
+
+    Combined outputs (``job.combined_pdf``, ``job.contact_sheet``) are
+    assembled in this process in file order, from figures and thumbnails that workers
+    send back, while per-file outputs are still written by the workers.
+    """
 
     def __init__(
         self,
         data_loader: DataLoader,
         chart_manager: ChartManager,
         export_manager: ExportManager,
+        fingerprinter: DataFingerprinter | None = None,
     ) -> None:
         self.data_loader = data_loader
         self.chart_manager = chart_manager
         self.export_manager = export_manager
+        self.fingerprinter = fingerprinter or DataFingerprinter()
+        self._figure: Figure | None = None
+        self._subplot_defaults: Dict[str, float] = {}
 
     def run(
         self,
@@ -37,36 +148,322 @@ class BatchPlotter:
         config: ChartConfig,
         figure_size: tuple[float, float],
         dpi: int,
-        fmt: str,
+        fmt: str | Sequence[str],
         theme: str = "default",
+        full_fidelity: bool = False,
+        workers: int = 1,
+        max_in_flight: int | None = None,
+        incremental: bool = True,
+        prune: bool = False,
+        combined_pdf: bool = False,
+        contact_sheet: SheetLayout | None = None,
+        vector: VectorOptions | None = None,
     ) -> List[Path]:
-        exported: List[Path] = []
+        job = BatchJob(
+            target_dir,
+            config,
+            tuple(figure_size),
+            dpi,
+            (fmt,) if isinstance(fmt, str) else tuple(fmt),
+            theme,
+            full_fidelity,
+            incremental=incremental,
+            prune=prune,
+            combined_pdf=combined_pdf,
+            contact_sheet=contact_sheet,
+            vector=vector,
+        )
+        return [
+            output
+            for result in self.iter_results(source_dir, job, workers, max_in_flight)
+            if result.status != "removed"
+            for output in result.outputs
+        ]
+
+    def source_files(self, source_dir: Path) -> List[Path]:
         if not source_dir.exists():
             raise FileNotFoundError(f"Source directory not found: {source_dir}")
-        target_dir.mkdir(parents=True, exist_ok=True)
-        for file_path in sorted(source_dir.iterdir()):
-            if file_path.suffix.lower() not in self.data_loader.SUPPORTED_EXTENSIONS:
+        return [
+            path
+            for path in sorted(source_dir.iterdir())
+            if path.suffix.lower() in self.data_loader.SUPPORTED_EXTENSIONS
+        ]
+
+    def iter_results(
+        self,
+        source_dir: Path,
+        job: BatchJob,
+        workers: int = 1,
+        max_in_flight: int | None = None,
+        files: Sequence[Path] | None = None,
+        book: BatchBook | None = None,
+    ) -> Iterator[BatchResult]:
+        """Render every file of ``source_dir`` and yield its result in file order.
+
+        ``files`` limits the run to those files of ``source_dir``, e.g. the
+        matches of a glob pattern. Combined outputs go to ``book`` when one
+        is given, so runs over several folders can share it; the caller then
+        closes it. Otherwise the run opens its own book for them.
+
+        With ``job.incremental``, files the target folder's manifest records
+        as up to date yield ``unchanged`` without being loaded. At most
+        ``max_in_flight`` files (twice the worker count by default) are
+        submitted but not yet collected, which bounds the memory held by
+        finished results waiting for a slower predecessor. Closing the
+        iterator early cancels files that have not started.
+        """
+        files = list(files) if files is not None else self.source_files(source_dir)
+        job.target_dir.mkdir(parents=True, exist_ok=True)
+        manifest = BatchManifest.load(job.target_dir)
+        settings = job.settings_key()
+        current = (
+            {
+                file_path
+                for file_path in files
+                if manifest.is_current(file_path, job.output_paths(file_path), settings)
+            }
+            if job.incremental
+            else set()
+        )
+        if current:
+            logger.info("%d of %d files are up to date", len(current), len(files))
+        own_book = book is None and job.combined
+        if own_book:
+            book = BatchBook(
+                job.target_dir, job.combined_pdf, job.contact_sheet, job.dpi, job.vector
+            )
+        # Combined documents need a page from every input, so with them
+        # up-to-date inputs are still plotted, just not exported again.
+        todo = [file_path for file_path in files if book is not None or file_path not in current]
+        if workers <= 1 or len(todo) <= 1:
+            rendered = (
+                self._render_safely(file_path, job, file_path in current) for file_path in todo
+            )
+        else:
+            rendered = self._iter_parallel(
+                todo, job, workers, max_in_flight or 2 * workers, current
+            )
+
+        saved_at = time.monotonic()
+        # Outputs of this run's files, which pruning must never remove.
+        kept: Set[str] = set()
+        try:
+            for file_path in files:
+                if file_path in current and book is None:
+                    outputs = tuple(job.output_paths(file_path))
+                    kept.update(output.name for output in outputs)
+                    yield BatchResult(file_path, "unchanged", outputs)
+                    continue
+                result = next(rendered)
+                if book is not None:
+                    book.add(file_path, result.page, result.thumbnail)
+                    result = replace(result, page=None, thumbnail=None)
+                kept.update(output.name for output in result.outputs)
+                if result.status == "skipped":
+                    logger.warning("Skip %s due to %s", result.source.name, result.message)
+                elif result.outputs and result.status != "unchanged":
+                    manifest.record(file_path, result.outputs, settings)
+                    if time.monotonic() - saved_at > 5.0:
+                        manifest.save()  # keep progress if the run is interrupted
+                        saved_at = time.monotonic()
+                yield result
+            if own_book:
+                combined = book.close()
+                if combined:
+                    yield BatchResult(job.target_dir, "combined", tuple(combined))
+            if job.prune:
+                yield from self._prune(manifest, source_dir, kept)
+        finally:
+            rendered.close()
+            manifest.save()
+            if own_book:
+                book.close(complete=False)  # a cancelled run keeps the previous documents
+
+    @staticmethod
+    def _prune(
+        manifest: BatchManifest, source_dir: Path, kept: Set[str]
+    ) -> Iterator[BatchResult]:
+        for source, outputs in manifest.stale(source_dir):
+            outputs = [output for output in outputs if output.name not in kept]
+            if not outputs:
+                # Every output now belongs to another input; only the entry goes.
+                manifest.forget(source)
                 continue
             try:
-                frame, _ = self.data_loader.load(file_path)
-                required_columns = [config.x_column] if config.x_column else []
-                required_columns += list(config.y_columns)
-                missing = [col for col in required_columns if col and col not in frame.columns]
-                if missing:
-                    logger.warning(
-                        "Skip %s due to missing columns: %s", file_path.name, ", ".join(missing)
+                for output in outputs:
+                    output.unlink(missing_ok=True)
+            except OSError as exc:
+                logger.warning("Could not remove stale outputs of %s: %s", source.name, exc)
+                continue
+            manifest.forget(source)
+            logger.info("Removed the outputs of %s, the input is gone", source.name)
+            yield BatchResult(source, "removed", tuple(outputs))
+
+    def _iter_parallel(
+        self,
+        files: List[Path],
+        job: BatchJob,
+        workers: int,
+        max_in_flight: int,
+        current: Set[Path],
+    ) -> Iterator[BatchResult]:
+        cache = self.export_manager.cache
+        workers = min(workers, len(files))
+        logger.info("Rendering %d files in %d worker processes", len(files), workers)
+        # Spawned workers start from a clean interpreter: no GUI state, no
+        # threads forked mid-operation, and a Matplotlib state of their own.
+        pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(
+                cache.directory if cache is not None else None,
+                cache.disk_bytes if cache is not None else 0,
+            ),
+        )
+        pending: Deque[Tuple[Path, Future]] = deque()
+        try:
+            for file_path in files:
+                pending.append(
+                    (
+                        file_path,
+                        pool.submit(_render_in_worker, file_path, job, file_path in current),
                     )
-                    continue
-                figure = Figure(figsize=figure_size, tight_layout=True)
-                FigureCanvasAgg(figure)
-                axes = figure.add_subplot(111)
-                self.chart_manager.plot(axes, frame, config, theme=theme)
-                output_path = target_dir / f"{file_path.stem}.{fmt}"
-                self.export_manager.export(figure, output_path, dpi=dpi, fmt=fmt)
-                exported.append(output_path)
-            except Exception:  # pragma: no cover - logged for operator
-                logger.exception("Failed to render %s", file_path)
-        return exported
-
-
-__all__ = ["BatchPlotter"]
+                )
+                if len(pending) >= max_in_flight:
+                    yield self._collect(*pending.popleft())
+            while pending:
+                yield self._collect(*pending.popleft())
+        finally:
+            for _, future in pending:
+                future.cancel()
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    @staticmethod
+    def _collect(file_path: Path, future: Future) -> BatchResult:
+        try:
+            result = future.result()
+        except Exception as exc:  # the worker process died
+            logger.exception("Worker failed while rendering %s", file_path)
+            return BatchResult(file_path, "failed", message=str(exc))
+        if result.status == "failed":
+            # Worker logs go to its own stderr; record the failure here too.
+            logger.error("Failed to render %s: %s", file_path, result.message)
+        if result.page is not None:
+            result = replace(result, page=pickle.loads(result.page))
+        return result
+
+    def _render_safely(
+        self, file_path: Path, job: BatchJob, pages_only: bool = False
+    ) -> BatchResult:
+        try:
+            return self._render_file(file_path, job, pages_only)
+        except Exception as exc:  # pragma: no cover - logged for operator
+            logger.exception("Failed to render %s", file_path)
+            # The figure may hold a half-drawn chart; start the next file afresh.
+            self._figure = None
+            return BatchResult(file_path, "failed", message=str(exc))
+
+    def _render_file(
+        self, file_path: Path, job: BatchJob, pages_only: bool = False
+    ) -> BatchResult:
+        """Plot and export ``file_path``; ``pages_only`` plots it for the combined outputs."""
+        config = job.config
+        frame, _ = self.data_loader.load(file_path)
+        required_columns = config.required_columns()
+        missing = [col for col in required_columns if col and col not in frame.columns]
+        if missing:
+            return BatchResult(
+                file_path, "skipped", message=f"missing columns: {', '.join(missing)}"
+            )
+        base_path = job.base_path(file_path)
+        cache_key = None
+        restored = False
+        if self.export_manager.cache is not None and not pages_only:
+            fingerprint = self.fingerprinter.fingerprint(frame, required_columns)
+            cache_key = render_key(
+                fingerprint,
+                config.to_dict(),
+                job.theme,
+                list(job.figure_size),
+                job.full_fidelity,
+            )
+            restored = bool(job.targets) and self.export_manager.restore_many(
+                base_path, job.targets, cache_key
+            )
+            if restored and not job.combined:
+                return BatchResult(file_path, "cached", tuple(job.output_paths(file_path)))
+        figure = self._prepared_figure(job)
+        # Exporting draws the figure; a draw after plotting would be wasted.
+        self.chart_manager.plot_figure(
+            figure, frame, config, theme=job.theme, full_fidelity=job.full_fidelity, draw=False
+        )
+        if pages_only or restored:
+            status = "unchanged" if pages_only else "cached"
+            outputs = tuple(job.output_paths(file_path))
+        elif not job.targets:
+            return BatchResult(
+                file_path, "exported", message="combined outputs only", **self._pages(figure, job)
+            )
+        else:
+            status = "exported"
+            outputs = tuple(
+                self.export_manager.export_many(figure, base_path, job.targets, cache_key=cache_key)
+            )
+        return BatchResult(file_path, status, outputs, **self._pages(figure, job))
+
+    @staticmethod
+    def _pages(figure: Figure, job: BatchJob) -> Dict[str, Any]:
+        """What the combined outputs of ``job`` need from ``figure``."""
+        sheet = job.contact_sheet
+        return {
+            "page": figure if job.combined_pdf else None,
+            "thumbnail": render_thumbnail(figure, sheet.thumbnail_width) if sheet else None,
+        }
+
+    def _prepared_figure(self, job: BatchJob) -> Figure:
+        """The figure kept from the previous file, or a new one for ``job``.
+
+        Small-multiple grids are laid out once when the chart manager
+        creates them, so every file gets a new figure for those.
+        """
+        figure = self._figure
+        reuse = job.config.grid_by == "none"
+        if not reuse or figure is None or tuple(figure.get_size_inches()) != job.figure_size:
+            figure = Figure(figsize=job.figure_size, tight_layout=True)
+            FigureCanvasAgg(figure)
+            self._figure = figure if reuse else None
+            self._subplot_defaults = {
+                name: getattr(figure.subplotpars, name) for name in _SUBPLOT_PARAMS
+            }
+        else:
+            # Lay out from the same starting point as a new figure: tick
+            # density and line downsampling follow the axes size, so the
+            # previous file's tight layout would change this file's output.
+            figure.subplots_adjust(**self._subplot_defaults)
+        return figure
+
+
+# Per-process plotter of a worker, created once by the pool initializer.
+_worker_plotter: BatchPlotter | None = None
+
+
+def _init_worker(cache_directory: Path | None, disk_bytes: int) -> None:
+    global _worker_plotter
+    cache = None
+    if cache_directory is not None:
+        # Workers share the disk level; a memory level per process would only duplicate it.
+        cache = RenderCache(cache_directory, memory_bytes=0, disk_bytes=disk_bytes)
+    _worker_plotter = BatchPlotter(DataLoader(), ChartManager(), ExportManager(cache=cache))
+
+
+def _render_in_worker(file_path: Path, job: BatchJob, pages_only: bool) -> BatchResult:
+    assert _worker_plotter is not None
+    result = _worker_plotter._render_safely(file_path, job, pages_only)
+    if result.page is not None:
+        # The next file is drawn on the same figure: send a snapshot of this one.
+        result = replace(result, page=pickle.dumps(result.page))
+    return result
+
+
+__all__ = ["BatchJob", "BatchPlotter", "BatchResult"]
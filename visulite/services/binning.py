@@ -0,0 +1,162 @@
+"""Histogram bin edges and counts, cached per column version."""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import Hashable, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from visulite.services.column_index import ColumnVersion, VersionedCache
+
+logger = logging.getLogger("visulite.binning")
+
+# "fd" = Freedman–Diaconis, "sturges", "count" = fixed number of bins,
+# "width" = fixed bin width
+BIN_RULES = ("fd", "sturges", "count", "width")
+# Upper bound on bins from the data-driven and fixed-width rules.
+MAX_BINS = 1000
+
+
+@dataclass(frozen=True)
+class HistogramBins:
+    """Bin edges (``len(counts) + 1`` of them) and the counts between them."""
+
+    edges: np.ndarray
+    counts: np.ndarray
+
+
+def finite_values(series: pd.Series) -> np.ndarray:
+    """Non-missing values of ``series`` as float64."""
+    values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+    return values[np.isfinite(values)]
+
+
+def bin_edges(
+    values: np.ndarray, rule: str = "count", bins: int = 30, width: float = 0.0
+) -> np.ndarray:
+    """Compute bin edges for finite ``values`` with the given ``rule``.
+
+    Args:
+        values: Finite data; may be empty.
+        rule: One of :data:`BIN_RULES`.
+        bins: Number of bins for the ``"count"`` rule.
+        width: Bin width for the ``"width"`` rule.
+    """
+    if rule not in BIN_RULES:
+        raise ValueError(f"Unsupported bin rule {rule}")
+    if not len(values):
+        return np.array([0.0, 1.0])
+    low, high = float(values.min()), float(values.max())
+    if low == high:
+        low, high = low - 0.5, high + 0.5
+    if rule == "count":
+        return np.linspace(low, high, max(1, int(bins)) + 1)
+    if rule == "width":
+        if width <= 0:
+            raise ValueError("Bin width must be positive")
+    else:
+        width = _rule_width(values, rule)
+    count = np.ceil((high - low) / width) if width > 0 else 1.0
+    if count > MAX_BINS:
+        # Freedman–Diaconis explodes on heavy tails; keep it drawable.
+        logger.info("Bin rule %s asks for %.0f bins; using %d", rule, count, MAX_BINS)
+        return np.linspace(low, high, MAX_BINS + 1)
+    count = max(1, int(count))
+    if rule == "width":
+        return low + np.arange(count + 1) * width
+    return np.histogram_bin_edges(values, bins=count, range=(low, high))
+
+
+def _rule_width(values: np.ndarray, rule: str) -> float:
+    """Bin width of the data-driven ``rule``, as numpy computes it."""
+    if rule == "fd":
+        q75, q25 = np.percentile(values, [75, 25])
+        return 2.0 * float(q75 - q25) * len(values) ** (-1.0 / 3.0)
+    return float(np.ptp(values)) / (np.log2(len(values)) + 1.0)
+
+
+def bin_counts(values: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    """Count finite ``values`` per bin (the last bin includes its right edge)."""
+    counts, _ = np.histogram(values, bins=edges)
+    return counts
+
+
+class HistogramCache:
+    """LRU cache of histogram edges and counts keyed by column buffer and bin rule.
+
+    Like :class:`~visulite.services.column_index.ColumnIndexCache`, entries
+    are validated against the buffers that back the columns, so replaced
+    columns are rescanned and unchanged ones never are.
+    """
+
+    def __init__(self, max_entries: int = 64) -> None:
+        self._cache = VersionedCache(max_entries)
+
+    def histograms(
+        self,
+        columns: Sequence[pd.Series],
+        rule: str = "count",
+        bins: int = 30,
+        width: float = 0.0,
+        shared: bool = True,
+    ) -> List[HistogramBins]:
+        """Histogram for every series in ``columns``.
+
+        With ``shared`` all columns are binned on edges computed from their
+        combined values, so the histograms can be overlaid bin for bin.
+        """
+        params = (rule, int(bins), float(width))
+        versions = [ColumnVersion(series) for series in columns]
+        if not shared:
+            return [
+                self._cache.get(
+                    ("own", version.name, version.token, params),
+                    [version],
+                    lambda series=series: self._own_bins(series, params),
+                )
+                for series, version in zip(columns, versions)
+            ]
+
+        edges = self._cache.get(
+            ("edges", tuple((v.name, v.token) for v in versions), params),
+            versions,
+            lambda: bin_edges(
+                np.concatenate([finite_values(series) for series in columns]), *params
+            ),
+        )
+        edges_key = (len(edges), float(edges[0]), float(edges[-1]), hash(edges.tobytes()))
+        return [
+            self._cache.get(
+                ("counts", version.name, version.token, edges_key),
+                [version],
+                lambda series=series: HistogramBins(
+                    edges, bin_counts(finite_values(series), edges)
+                ),
+            )
+            for series, version in zip(columns, versions)
+        ]
+
+    def invalidate(self, column: Hashable | None = None) -> None:
+        """Drop cached histograms involving ``column`` (or all when ``None``)."""
+        self._cache.invalidate(column)
+
+    @staticmethod
+    def _own_bins(series: pd.Series, params: Tuple[str, int, float]) -> HistogramBins:
+        values = finite_values(series)
+        edges = bin_edges(values, *params)
+        logger.debug("Binned column %s with rule %s", series.name, params[0])
+        return HistogramBins(edges, bin_counts(values, edges))
+
+
+__all__ = [
+    "BIN_RULES",
+    "MAX_BINS",
+    "HistogramBins",
+    "HistogramCache",
+    "bin_counts",
+    "bin_edges",
+    "finite_values",
+]
@@ -0,0 +1,197 @@
+"""Box plot statistics computed once per column (and group) for ``Axes.bxp``."""
+
+from __future__ import annotations
+
+import logging
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from visulite.services.binning import finite_values
+from visulite.services.column_index import ColumnVersion, VersionedCache
+
+logger = logging.getLogger("visulite.boxstats")
+
+# Whiskers reach the furthest values within this many IQRs of the box.
+WHISKER_IQR = 1.5
+# Grouped box plots keep at most this many of the most populated groups.
+MAX_GROUPS = 100
+
+# One dict per box in the format ``Axes.bxp`` expects.
+BoxStats = Dict[str, object]
+
+
+def _sample(outliers: np.ndarray, limit: int) -> np.ndarray:
+    """Evenly spaced subset of sorted ``outliers``; the extremes are always kept."""
+    if limit <= 0:
+        return outliers[:0]
+    if len(outliers) <= limit:
+        return outliers
+    return outliers[np.linspace(0, len(outliers) - 1, limit).round().astype(np.intp)]
+
+
+def box_stats(
+    values: np.ndarray, label: str = "", max_outliers: int = 1000, whis: float = WHISKER_IQR
+) -> BoxStats | None:
+    """Quartiles, whiskers and a capped outlier sample of finite ``values``.
+
+    Quartiles come from a partial sort (``np.quantile``), so the column is
+    never fully sorted; only the outliers are. Returns ``None`` for empty
+    input.
+    """
+    if not len(values):
+        return None
+    q1, median, q3 = np.quantile(values, [0.25, 0.5, 0.75])
+    iqr = q3 - q1
+    low_fence, high_fence = q1 - whis * iqr, q3 + whis * iqr
+    inside = (values >= low_fence) & (values <= high_fence)
+    outliers = np.sort(values[~inside])
+    return {
+        "label": label,
+        "med": median,
+        "q1": q1,
+        "q3": q3,
+        "whislo": values[values >= low_fence].min(),
+        "whishi": values[values <= high_fence].max(),
+        "mean": values.mean(),
+        "fliers": _sample(outliers, max_outliers),
+        "count": len(values),
+        "outliers": len(outliers),
+    }
+
+
+def group_codes(groups: pd.Series, max_groups: int = MAX_GROUPS) -> Tuple[np.ndarray, List[str]]:
+    """Factorize ``groups`` into integer codes and labels.
+
+    Missing values get code ``-1``. When there are more than ``max_groups``
+    distinct values only the most populated ones keep a code; the rest are
+    dropped (``-1``) as well.
+    """
+    codes, uniques = pd.factorize(groups, sort=True)
+    labels = [str(value) for value in uniques]
+    if len(labels) > max_groups:
+        sizes = np.bincount(codes[codes >= 0], minlength=len(labels))
+        keep = np.sort(np.argsort(-sizes, kind="stable")[:max_groups])
+        remap = np.full(len(labels) + 1, -1, dtype=np.intp)
+        remap[keep] = np.arange(len(keep))
+        codes = remap[codes]  # -1 indexes the trailing -1
+        logger.warning(
+            "Box plot limited to the %d largest of %d groups", max_groups, len(labels)
+        )
+        labels = [labels[i] for i in keep]
+    return codes.astype(np.intp), labels
+
+
+def grouped_box_stats(
+    values: np.ndarray,
+    codes: np.ndarray,
+    labels: List[str],
+    max_outliers: int = 1000,
+    whis: float = WHISKER_IQR,
+) -> List[BoxStats | None]:
+    """Box statistics of ``values`` for every group in ``codes``.
+
+    A radix sort on the group codes lays each group out contiguously and
+    sorting each slice in place orders the values within it; quartiles,
+    whiskers and outliers of all groups are then read off by index
+    arithmetic. Groups without finite values yield ``None``.
+    """
+    valid = (codes >= 0) & np.isfinite(values)
+    codes, values = codes[valid], values[valid]
+    order = np.argsort(codes, kind="stable")
+    codes, values = codes[order], values[order]
+
+    counts = np.bincount(codes, minlength=len(labels))
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    for start, count in zip(starts, counts):
+        values[start:start + count].sort()
+    present = np.flatnonzero(counts)
+    stats: List[BoxStats | None] = [None] * len(labels)
+    if not len(present):
+        return stats
+
+    def quantile(q: float) -> np.ndarray:
+        # Linear interpolation, the same as np.quantile's default method.
+        position = starts[present] + q * (counts[present] - 1)
+        below = np.floor(position).astype(np.intp)
+        above = np.ceil(position).astype(np.intp)
+        return values[below] + (values[above] - values[below]) * (position - below)
+
+    q1, median, q3 = quantile(0.25), quantile(0.5), quantile(0.75)
+    low_fence = np.zeros(len(labels))
+    high_fence = np.zeros(len(labels))
+    low_fence[present] = q1 - whis * (q3 - q1)
+    high_fence[present] = q3 + whis * (q3 - q1)
+    above_low = values >= low_fence[codes]
+    below_high = values <= high_fence[codes]
+    whislo = np.minimum.reduceat(np.where(above_low, values, np.inf), starts[present])
+    whishi = np.maximum.reduceat(np.where(below_high, values, -np.inf), starts[present])
+    means = np.add.reduceat(values, starts[present]) / counts[present]
+
+    outlier = ~(above_low & below_high)
+    for i, group in enumerate(present):
+        rows = slice(starts[group], starts[group] + counts[group])
+        outliers = values[rows][outlier[rows]]  # already sorted
+        stats[group] = {
+            "label": labels[group],
+            "med": median[i],
+            "q1": q1[i],
+            "q3": q3[i],
+            "whislo": whislo[i],
+            "whishi": whishi[i],
+            "mean": means[i],
+            "fliers": _sample(outliers, max_outliers),
+            "count": int(counts[group]),
+            "outliers": len(outliers),
+        }
+    return stats
+
+
+class BoxStatsCache:
+    """Box statistics cached per column version, outlier cap and grouping column."""
+
+    def __init__(self, max_entries: int = 64) -> None:
+        self._cache = VersionedCache(max_entries)
+
+    def stats(self, series: pd.Series, max_outliers: int = 1000) -> BoxStats | None:
+        version = ColumnVersion(series)
+        return self._cache.get(
+            ("box", version.name, version.token, max_outliers),
+            [version],
+            lambda: box_stats(finite_values(series), str(series.name), max_outliers),
+        )
+
+    def grouped_stats(
+        self, series: pd.Series, groups: pd.Series, max_outliers: int = 1000
+    ) -> Tuple[List[str], List[BoxStats | None]]:
+        """Per-group statistics of ``series`` plus the group labels."""
+        group_version = ColumnVersion(groups)
+        codes, labels = self._cache.get(
+            ("groups", group_version.name, group_version.token),
+            [group_version],
+            lambda: group_codes(groups),
+        )
+        version = ColumnVersion(series)
+        stats = self._cache.get(
+            ("grouped", version.name, version.token, group_version.token, max_outliers),
+            [version, group_version],
+            lambda: grouped_box_stats(
+                series.to_numpy(dtype=np.float64, na_value=np.nan), codes, labels, max_outliers
+            ),
+        )
+        return labels, stats
+
+    def invalidate(self, column: str | None = None) -> None:
+        self._cache.invalidate(column)
+
+
+__all__ = [
+    "MAX_GROUPS",
+    "WHISKER_IQR",
+    "BoxStats",
+    "BoxStatsCache",
+    "box_stats",
+    "group_codes",
+    "grouped_box_stats",
+]
@@ -3,12 +3,41 @@
 from __future__ import annotations
 
 import logging
-from typing import Sequence, List
+import math
+import weakref
+from contextlib import contextmanager
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, Iterator, List, Mapping, Sequence
 
 import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
+from matplotlib.artist import Artist
+from matplotlib.colorbar import Colorbar
+from matplotlib.figure import Figure
+from matplotlib.layout_engine import LayoutEngine
+from matplotlib.collections import PolyCollection
+from matplotlib.lines import Line2D
+from matplotlib.markers import MarkerStyle
+from matplotlib.ticker import Formatter, MaxNLocator
 
 from visulite.models.chart_config import ChartConfig
+from visulite.services.aggregation import aggregate_bars, bar_geometry
+from visulite.services.binning import HistogramCache
+from visulite.services.boxstats import BoxStatsCache
+from visulite.services.column_index import (
+    ColumnIndexCache,
+    ColumnVersion,
+    SortedColumnIndex,
+    VersionedCache,
+    numeric_values,
+)
+from visulite.services.correlation import CorrelationCache
+from visulite.services.density import DensityImage, add_density_image, density_colormap
+from visulite.services.downsampling import downsample_indices, point_budget
+from visulite.services.lod import LodCache
+from visulite.services.themes import apply_theme, grid_style, theme_context
+from visulite.services.time_axis import is_datetime, set_datetime_axis
 
 logger = logging.getLogger("visulite.chart_manager")
 
@@ -19,63 +48,441 @@ DEFAULT_COLORS: List[str] = [
 ]
 
 
+class _PositionLabels(Formatter):
+    """Label integer positions (categories, matrix columns) with ``labels``.
+
+    With ``nearest`` a value between positions takes the nearest label,
+    otherwise it gets none. A class rather than a FuncFormatter closure, so
+    figures stay picklable (batch workers send them to the parent).
+    """
+
+    def __init__(self, labels: Sequence[str], nearest: bool = False) -> None:
+        self.labels = list(labels)
+        self.nearest = nearest
+
+    def __call__(self, value: float, pos=None) -> str:
+        if not math.isfinite(value):
+            return ""
+        if self.nearest:
+            value = round(value)
+        elif not float(value).is_integer():
+            return ""
+        position = int(value)
+        return self.labels[position] if 0 <= position < len(self.labels) else ""
+
+
+class _ViewportBinding:
+    """Keep line/scatter artists in sync with the visible x-range.
+
+    Rows inside the x-limits are looked up through the sorted x index and
+    line series are then downsampled from full resolution to the point
+    budget of the axes, so every zoom level shows exact peaks. For very
+    long series over a sorted x, ``lod`` supplies precomputed min/max/mean
+    pyramids that answer the same question in time independent of the
+    series length.
+    """
+
+    def __init__(
+        self,
+        index: SortedColumnIndex,
+        x_values: np.ndarray,
+        downsample: str,
+        lod: LodCache | None = None,
+    ) -> None:
+        self.index = index
+        self.x_values = x_values
+        self.downsample = downsample
+        self.lod = lod if index.monotonic else None
+        self.full_fidelity = False
+        self.y_values: Dict[str, np.ndarray] = {}
+        self.y_versions: Dict[str, ColumnVersion] = {}
+        self.artists: Dict[str, Artist] = {}
+
+    def budget(self, axes: plt.Axes) -> int | None:
+        if self.full_fidelity or self.downsample == "none":
+            return None
+        return point_budget(axes)
+
+    def series_data(
+        self, column: str, rows: np.ndarray | slice, budget: int | None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        x_data = self.x_values[rows]
+        y_data = self.y_values[column][rows]
+        if budget is not None and len(x_data) > budget:
+            reduced = self._from_pyramid(column, rows, budget)
+            if reduced is not None:
+                return reduced
+            keep = downsample_indices(x_data, y_data, budget, self.downsample)
+            return x_data[keep], y_data[keep]
+        return x_data, y_data
+
+    def _from_pyramid(
+        self, column: str, rows: np.ndarray | slice, budget: int
+    ) -> tuple[np.ndarray, np.ndarray] | None:
+        # Monotonic x means the visible rows are always one contiguous slice.
+        if self.lod is None or not isinstance(rows, slice) or column not in self.y_versions:
+            return None
+        pyramid = self.lod.get(self.y_versions[column], self.y_values[column])
+        if pyramid is None:
+            return None
+        start, stop, _ = rows.indices(len(self.x_values))
+        result = pyramid.query(start, stop, budget, self.downsample)
+        if result is None:
+            return None
+        positions, values = result
+        return self.x_values[positions], values
+
+    def line_rows(self, rows: np.ndarray | slice) -> np.ndarray | slice:
+        """Rows a line may draw for the selection ``rows``.
+
+        Over a non-monotonic x the selected rows come from disjoint runs of
+        the data, and joining them would draw chords between the runs, so
+        lines then keep every row and are only downsampled.
+        """
+        return rows if self.index.monotonic else slice(None)
+
+    def show(self, axes: plt.Axes, column: str, rows: np.ndarray | slice) -> None:
+        artist = self.artists[column]
+        if hasattr(artist, "set_data"):
+            rows = self.line_rows(rows)
+            artist.set_data(*self.series_data(column, rows, self.budget(axes)))
+        else:
+            x_data, y_data = self.series_data(column, rows, None)
+            artist.set_offsets(np.column_stack([x_data, y_data]))
+
+    def refresh(self, axes: plt.Axes) -> None:
+        low, high = sorted(axes.get_xlim())
+        rows = self.index.range_positions(low, high, pad=1)
+        for column in self.artists:
+            self.show(axes, column, rows)
+
+    def on_xlim_changed(self, axes: plt.Axes) -> None:
+        self.refresh(axes)
+
+
+@dataclass
+class _Series:
+    """Artists drawing one Y column and the column buffer they were built from."""
+
+    kind: str
+    artists: List[Artist]
+    version: ColumnVersion | None = None
+
+
+@dataclass
+class _PlotState:
+    """What :class:`ChartManager` last drew into an axes.
+
+    ``layout`` holds every setting whose change requires rebuilding the plot;
+    anything else is applied to the existing artists.
+    """
+
+    layout: tuple
+    x_version: ColumnVersion | None
+    y_versions: Dict[str, ColumnVersion] = field(default_factory=dict)
+    series: Dict[str, _Series] = field(default_factory=dict)
+    density: bool = False
+    theme: str | None = None
+    binding: _ViewportBinding | None = None
+    colorbar: Colorbar | None = None
+
+    def is_current(self, axes: plt.Axes) -> bool:
+        """False once someone else cleared the axes underneath us."""
+        return all(
+            artist.axes is axes
+            for series in self.series.values()
+            for artist in series.artists
+        )
+
+
+@dataclass
+class _Grid:
+    """Panels :class:`ChartManager` laid out in a figure for small multiples.
+
+    ``engine`` is the figure's layout engine from before the grid, restored
+    when the figure goes back to a single chart.
+    """
+
+    key: tuple
+    axes: List[plt.Axes]
+    engine: LayoutEngine | None
+
+
 class ChartManager:
-    """Create matplotlib charts from pandas data."""
+    """Create matplotlib charts from pandas data.
+
+    Artists are kept per axes and series between calls to :meth:`plot`, so
+    refreshing after a title, style or Y selection change only touches the
+    affected artists. The axes are rebuilt when the chart type, the X data
+    or the rendering mode changes.
+    """
 
     SUPPORTED_TYPES = {"line", "bar", "scatter", "histogram", "boxplot", "heatmap"}
+    XY_TYPES = {"line", "bar", "scatter"}
+    # Chart types whose Y series are added, removed and updated one by one.
+    SERIES_TYPES = {"line", "scatter"}
+    # Below this many rows slicing to the viewport costs more than it saves.
+    VIEWPORT_MIN_ROWS = 10_000
+    # Above this many points "auto" scatter plots switch to density rendering.
+    DENSITY_THRESHOLD = 500_000
+    # Heatmaps with more columns than this label only a subset of the ticks.
+    HEATMAP_LABEL_LIMIT = 40
+    # "column": one panel per Y column, "value": one per value of grid_column.
+    GRID_MODES = ("none", "column", "value")
+    # Small-multiple grids show at most this many panels.
+    MAX_PANELS = 36
+    # Chart types whose grid panels share one X axis.
+    SHARED_X_TYPES = {"line", "scatter", "histogram"}
+
+    def __init__(
+        self, index_cache: ColumnIndexCache | None = None, lod_cache: LodCache | None = None
+    ) -> None:
+        self.index_cache = index_cache or ColumnIndexCache()
+        # Level-of-detail pyramids for very long line series (built in the background).
+        self.lod_cache = lod_cache
+        self.histogram_cache = HistogramCache()
+        self.correlation_cache = CorrelationCache()
+        self.box_cache = BoxStatsCache()
+        # X columns as float64 arrays, shared by every axes that plots them.
+        self._x_cache = VersionedCache(max_entries=4)
+        self._states: "weakref.WeakKeyDictionary[plt.Axes, _PlotState]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._grids: "weakref.WeakKeyDictionary[Figure, _Grid]" = weakref.WeakKeyDictionary()
 
     def plot(
-        self, 
-        axes: plt.Axes, 
-        frame: pd.DataFrame, 
+        self,
+        axes: plt.Axes,
+        frame: pd.DataFrame,
         config: ChartConfig,
-        theme: str = "default"
+        theme: str = "default",
+        full_fidelity: bool = False,
+        draw: bool = True,
     ) -> None:
+        """Render ``config`` into ``axes``.
+
+        Dense line series are downsampled to the axes' pixel width unless
+        ``full_fidelity`` is set (or the config disables downsampling).
+        ``draw=False`` leaves the canvas alone, for figures that are only
+        saved: an Agg canvas would otherwise draw right away.
+        """
+        self._validate(config)
+        logger.info("Rendering chart type=%s with theme=%s", config.chart_type, theme)
+        # The theme only applies while this figure's artists are created.
+        with theme_context(theme) as rc:
+            self._plot_axes(axes, frame, config, theme, rc, full_fidelity)
+        if draw:
+            self._draw_idle(axes.figure)
+
+    def plot_figure(
+        self,
+        figure: Figure,
+        frame: pd.DataFrame,
+        config: ChartConfig,
+        theme: str = "default",
+        full_fidelity: bool = False,
+        draw: bool = True,
+    ) -> None:
+        """Render ``config`` into ``figure``: one axes, or a grid if ``config.grid_by`` asks."""
+        if config.grid_by != "none":
+            self.plot_grid(
+                figure, frame, config, theme=theme, full_fidelity=full_fidelity, draw=draw
+            )
+            return
+        grid = self._grids.pop(figure, None)
+        if grid is not None:
+            self._clear_figure(figure)
+            figure.set_layout_engine(grid.engine)
+        axes = figure.axes[0] if figure.axes else figure.add_subplot(111)
+        self.plot(axes, frame, config, theme=theme, full_fidelity=full_fidelity, draw=draw)
+
+    def plot_grid(
+        self,
+        figure: Figure,
+        frame: pd.DataFrame,
+        config: ChartConfig,
+        theme: str = "default",
+        full_fidelity: bool = False,
+        draw: bool = True,
+    ) -> None:
+        """Render ``config`` as small multiples in ``figure``.
+
+        There is one panel per Y column (``grid_by="column"``) or per value of
+        ``grid_column`` (``grid_by="value"``). Panels share their X axis and,
+        with ``grid_share_y``, their Y axis. The figure is laid out once when
+        the grid is created; later calls with the same grid shape update the
+        panels in place like :meth:`plot`.
+        """
+        self._validate(config)
+        panels = self._grid_panels(frame, config)
+        share_x = config.chart_type in self.SHARED_X_TYPES
+        share_y = config.grid_share_y and config.chart_type != "heatmap"
+        n_columns = math.ceil(math.sqrt(len(panels)))
+        n_rows = math.ceil(len(panels) / n_columns)
+        key = (n_rows, n_columns, len(panels), share_x, share_y)
+
+        grid = self._grids.get(figure)
+        created = (
+            grid is None
+            or grid.key != key
+            or any(axes not in figure.axes for axes in grid.axes)
+        )
+        if created:
+            engine = grid.engine if grid is not None else figure.get_layout_engine()
+            self._clear_figure(figure)
+            cells = figure.subplots(
+                n_rows, n_columns, sharex=share_x, sharey=share_y, squeeze=False
+            ).ravel()
+            for unused in cells[len(panels):]:
+                unused.remove()
+            grid = _Grid(key, list(cells[:len(panels)]), engine)
+            self._grids[figure] = grid
+
+        logger.info(
+            "Rendering %d-panel %s grid with theme=%s", len(panels), config.chart_type, theme
+        )
+        with theme_context(theme) as rc:
+            for position, (axes, (panel_frame, panel_config)) in enumerate(
+                zip(grid.axes, panels)
+            ):
+                self._plot_axes(axes, panel_frame, panel_config, theme, rc, full_fidelity)
+                # Only the outer panels of shared axes keep their tick labels.
+                bottom = position + n_columns >= len(panels)
+                left = position % n_columns == 0
+                if share_x:
+                    axes.tick_params(axis="x", labelbottom=bottom)
+                    if not bottom:
+                        axes.set_xlabel("")
+                if share_y:
+                    axes.tick_params(axis="y", labelleft=left)
+                    if not left:
+                        axes.set_ylabel("")
+            figure.suptitle(config.title)
+            if created:
+                # A single layout pass; the margins are kept for later draws.
+                figure.tight_layout()
+        if draw:
+            self._draw_idle(figure)
+
+    def _validate(self, config: ChartConfig) -> None:
         if config.chart_type not in self.SUPPORTED_TYPES:
             raise ValueError(f"Unsupported chart type {config.chart_type}")
         if not config.x_column:
             raise ValueError("X column not selected")
         if not config.y_columns:
             raise ValueError("At least one Y column is required")
+        if config.grid_by not in self.GRID_MODES:
+            raise ValueError(f"Unsupported grid mode {config.grid_by}")
 
-        logger.info("Rendering chart type=%s with theme=%s", config.chart_type, theme)
-        
-        # Apply theme
-        if theme and theme != "default":
-            try:
-                plt.style.use(theme)
-            except Exception:
-                logger.warning("Theme '%s' not available, using default", theme)
-                plt.style.use("default")
-        else:
-            plt.style.use("default")
-        
-        axes.clear()
+    def _plot_axes(
+        self,
+        axes: plt.Axes,
+        frame: pd.DataFrame,
+        config: ChartConfig,
+        theme: str,
+        rc: Mapping[str, Any],
+        full_fidelity: bool,
+    ) -> None:
+        layout = self._layout_key(frame, config, full_fidelity)
+        state = self._states.get(axes)
+        if not (
+            state is not None
+            and state.is_current(axes)
+            and self._update(axes, frame, config, layout, state)
+        ):
+            self._rebuild(axes, frame, config, layout, full_fidelity, state)
+            state = self._states[axes]
+        if state.theme != theme:
+            self._apply_theme(axes, state, rc)
+            state.theme = theme
 
-        if config.chart_type == "histogram":
-            self._plot_histogram(axes, frame, config)
-        elif config.chart_type == "boxplot":
-            self._plot_boxplot(axes, frame, config)
-        elif config.chart_type == "heatmap":
-            self._plot_heatmap(axes, frame, config)
+        axes.set_title(config.title)
+        if config.show_grid:
+            axes.grid(True, **grid_style(rc))
         else:
-            self._plot_xy(axes, frame, config)
+            axes.grid(False)
 
-        axes.set_title(config.title)
-        axes.grid(config.show_grid)
-        
         # Set axis labels
-        if config.x_label:
-            axes.set_xlabel(config.x_label)
-        if config.y_label:
-            axes.set_ylabel(config.y_label)
-        
+        axes.set_xlabel(config.x_label or "")
+        axes.set_ylabel(config.y_label or "")
+
+        legend = axes.get_legend()
         if config.show_legend:
             axes.legend(loc="best")
-        canvas = getattr(axes.figure, "canvas", None)
+        elif legend is not None:
+            legend.remove()
+
+    @staticmethod
+    def _draw_idle(figure: Figure) -> None:
+        canvas = getattr(figure, "canvas", None)
         if canvas is not None:
             canvas.draw_idle()
 
+    def _clear_figure(self, figure: Figure) -> None:
+        for axes in figure.axes:
+            self._states.pop(axes, None)
+        figure.clear()
+
+    def _grid_panels(
+        self, frame: pd.DataFrame, config: ChartConfig
+    ) -> List[tuple[pd.DataFrame, ChartConfig]]:
+        """Frame and config of every panel in a small-multiples grid."""
+        if config.grid_by == "column":
+            if config.chart_type == "heatmap":
+                raise ValueError("Heatmap grids must be split by value")
+            columns = list(config.y_columns)[: self.MAX_PANELS]
+            # Every panel plots the full frame, so X data and indexes are shared.
+            return [
+                (frame, replace(config, y_columns=[column], title=column, show_legend=False))
+                for column in columns
+            ]
+
+        if not config.grid_column:
+            raise ValueError("Grid column not selected")
+        groups = frame.groupby(frame[config.grid_column], sort=True, observed=True).indices
+        if not groups:
+            raise ValueError("Grid column has no values")
+        labels = list(groups)
+        if len(labels) > self.MAX_PANELS:
+            logger.warning(
+                "Grid limited to the %d largest of %d values", self.MAX_PANELS, len(labels)
+            )
+            largest = set(sorted(labels, key=lambda label: -len(groups[label]))[: self.MAX_PANELS])
+            labels = [label for label in labels if label in largest]
+        show_legend = config.show_legend and len(config.y_columns) > 1
+        return [
+            (
+                frame.take(groups[label]),
+                replace(
+                    config,
+                    title=f"{config.grid_column} = {label}",
+                    show_legend=show_legend and position == 0,
+                ),
+            )
+            for position, label in enumerate(labels)
+        ]
+
+    def _x_values(self, series: pd.Series) -> np.ndarray:
+        """``series`` as float64, computed once for every axes plotting it.
+
+        Datetimes become nanoseconds since the epoch, the unit of the sorted
+        column index, so Matplotlib never converts them point by point.
+        """
+        version = ColumnVersion(series)
+        return self._x_cache.get(
+            (version.name, version.token), [version], lambda: numeric_values(series)
+        )
+
+    def _plot_x(self, series: pd.Series) -> pd.Series | np.ndarray:
+        """X data as handed to Matplotlib: epoch floats for datetimes, else as is."""
+        return self._x_values(series) if is_datetime(series) else series
+
+    @staticmethod
+    def _is_numeric(series: pd.Series, allow_datetime: bool = False) -> bool:
+        if allow_datetime and is_datetime(series):
+            return True
+        return pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+
     def _get_colors(self, config: ChartConfig, count: int) -> List[str]:
         """Get colors for the plot based on config."""
         if config.color_scheme == "auto":
@@ -84,66 +491,558 @@ class ChartManager:
             # Use the same custom color for all lines
             return [config.color_scheme] * count
 
-    def _plot_xy(self, axes: plt.Axes, frame: pd.DataFrame, config: ChartConfig) -> None:
-        x_series = frame[config.x_column]
+    @contextmanager
+    def full_resolution(self, figure: plt.Figure) -> Iterator[None]:
+        """Temporarily show every visible point, e.g. while exporting ``figure``."""
+        bindings = [
+            (axes, state.binding)
+            for axes in figure.axes
+            if (state := self._states.get(axes)) is not None and state.binding is not None
+        ]
+        for axes, binding in bindings:
+            binding.full_fidelity = True
+            binding.refresh(axes)
+        try:
+            yield
+        finally:
+            for axes, binding in bindings:
+                binding.full_fidelity = False
+                binding.refresh(axes)
+
+    # Rebuild / incremental update ----------------------------------------------------
+
+    def _layout_key(
+        self, frame: pd.DataFrame, config: ChartConfig, full_fidelity: bool
+    ) -> tuple:
+        key: tuple = (config.chart_type, config.x_column, full_fidelity)
+        if config.chart_type in self.SERIES_TYPES:
+            # Datetime X gets its own tick locator and formatter, for its timezone.
+            x_series = frame[config.x_column]
+            key += (str(x_series.dtype) if is_datetime(x_series) else None,)
+        if config.chart_type == "line":
+            key += (config.downsample,)
+        elif config.chart_type == "scatter":
+            density = self._use_density(frame, config)
+            # Density images cannot be updated in place, so their data is layout.
+            key += (density, tuple(config.y_columns) if density else ())
+        elif config.chart_type == "bar":
+            key += (
+                tuple(config.y_columns), config.bar_aggregate, config.bar_top_n, config.bar_mode
+            )
+        elif config.chart_type == "histogram":
+            key += (
+                tuple(config.y_columns),
+                config.hist_rule,
+                config.hist_bins,
+                config.hist_bin_width,
+                config.hist_shared_bins,
+            )
+        elif config.chart_type == "heatmap":
+            key += (tuple(config.y_columns), config.heatmap_pairwise, config.heatmap_reorder)
+        elif config.chart_type == "boxplot":
+            key += (tuple(config.y_columns), config.box_group_by_x, config.box_max_outliers)
+        else:
+            key += (tuple(config.y_columns),)
+        return key
+
+    def _rebuild(
+        self,
+        axes: plt.Axes,
+        frame: pd.DataFrame,
+        config: ChartConfig,
+        layout: tuple,
+        full_fidelity: bool,
+        previous: _PlotState | None,
+    ) -> None:
+        colorbar = previous.colorbar if previous is not None else None
+        if colorbar is not None and config.chart_type != "heatmap":
+            colorbar.remove()
+            colorbar = None
+        axes.clear()
+        # clear() keeps the hover formatters a heatmap installs.
+        axes.fmt_xdata = None
+        axes.fmt_ydata = None
+
+        state = _PlotState(layout=layout, x_version=ColumnVersion(frame[config.x_column]))
+        state.y_versions = {column: ColumnVersion(frame[column]) for column in config.y_columns}
+        self._states[axes] = state
+        if config.chart_type == "histogram":
+            state.series = self._plot_histogram(axes, frame, config)
+        elif config.chart_type == "boxplot":
+            state.series = self._plot_boxplot(axes, frame, config)
+        elif config.chart_type == "heatmap":
+            state.colorbar = self._plot_heatmap(axes, frame, config, colorbar)
+        elif config.chart_type == "bar":
+            state.series = self._plot_bars(axes, frame, config)
+        else:
+            self._plot_xy(axes, frame, config, state, full_fidelity)
+
+    def _update(
+        self,
+        axes: plt.Axes,
+        frame: pd.DataFrame,
+        config: ChartConfig,
+        layout: tuple,
+        state: _PlotState,
+    ) -> bool:
+        """Bring existing artists up to date; return False if a rebuild is needed."""
+        if layout != state.layout or state.x_version is None:
+            return False
+        x_changed = not state.x_version.matches(frame[config.x_column])
+        if x_changed and not self._can_swap_x(frame, config, state):
+            return False
+        if config.chart_type not in self.SERIES_TYPES:
+            if not all(
+                state.y_versions[column].matches(frame[column]) for column in config.y_columns
+            ):
+                return False
+            colors = self._get_colors(config, len(config.y_columns))
+            for column, color in zip(config.y_columns, colors):
+                if column in state.series:
+                    self._style_series(state.series[column], config, color)
+            return True
+
+        data_changed = False
+        for column in [column for column in state.series if column not in config.y_columns]:
+            for artist in state.series.pop(column).artists:
+                artist.remove()
+            state.y_versions.pop(column, None)
+            if state.binding is not None:
+                state.binding.artists.pop(column, None)
+                state.binding.y_values.pop(column, None)
+                state.binding.y_versions.pop(column, None)
+            data_changed = True
+
         colors = self._get_colors(config, len(config.y_columns))
-        
-        for i, column in enumerate(config.y_columns):
+        for column, color in zip(config.y_columns, colors):
+            series = state.series.get(column)
             y_series = frame[column]
-            color = colors[i]
-            marker = config.marker_style if config.marker_style else None
-            
+            if (
+                series is not None
+                and not x_changed
+                and state.y_versions[column].matches(y_series)
+            ):
+                self._style_series(series, config, color)
+                continue
+            if series is None or not self._set_series_data(axes, frame, config, column, state):
+                if series is not None:
+                    for artist in series.artists:
+                        artist.remove()
+                state.series[column] = self._add_series(axes, frame, config, column, color, state)
+            else:
+                self._style_series(state.series[column], config, color)
+            state.y_versions[column] = ColumnVersion(y_series)
+            data_changed = True
+
+        if x_changed:
+            state.x_version = ColumnVersion(frame[config.x_column])
+        if data_changed:
+            self._rescale(axes, state)
+        logger.debug("Updated chart in place (data changed=%s)", data_changed)
+        return True
+
+    def _can_swap_x(self, frame: pd.DataFrame, config: ChartConfig, state: _PlotState) -> bool:
+        """True if new X data can go into the existing artists, as between batch files.
+
+        Only plain line and scatter artists qualify: viewport-bound series
+        and density images are built around their X index.
+        """
+        if config.chart_type not in self.SERIES_TYPES or state.binding is not None:
+            return False
+        if state.density or any(
+            series.kind not in {"line", "scatter"} for series in state.series.values()
+        ):
+            return False
+        x_series = frame[config.x_column]
+        return len(x_series) < self.VIEWPORT_MIN_ROWS and self._is_numeric(
+            x_series, allow_datetime=True
+        )
+
+    def _apply_theme(
+        self, axes: plt.Axes, state: _PlotState, rc: Mapping[str, Any]
+    ) -> None:
+        """Restyle the figure and the series' line widths for a new theme."""
+        apply_theme(axes.figure, rc)
+        for series in state.series.values():
+            if series.kind == "line":
+                series.artists[0].set_linewidth(rc["lines.linewidth"])
+                series.artists[0].set_markersize(rc["lines.markersize"])
+            elif series.kind == "scatter":
+                series.artists[0].set_sizes([rc["lines.markersize"] ** 2])
+
+    def _rescale(self, axes: plt.Axes, state: _PlotState) -> None:
+        if state.binding is not None:
+            # Show every row so the data limits cover the whole series.
+            all_rows = state.binding.index.range_positions(None, None)
+            for column in state.binding.artists:
+                state.binding.show(axes, column, all_rows)
+        axes.relim()
+        # relim() ignores collections, so add scatter offsets explicitly.
+        for series in state.series.values():
+            if series.kind == "scatter":
+                offsets = np.asarray(series.artists[0].get_offsets(), dtype=np.float64)
+                finite = offsets[np.isfinite(offsets).all(axis=1)]
+                if len(finite):
+                    axes.update_datalim(finite)
+        axes.autoscale_view()
+
+    # XY charts -----------------------------------------------------------------------
+
+    def _plot_xy(
+        self,
+        axes: plt.Axes,
+        frame: pd.DataFrame,
+        config: ChartConfig,
+        state: _PlotState,
+        full_fidelity: bool = False,
+    ) -> None:
+        colors = self._get_colors(config, len(config.y_columns))
+        if is_datetime(frame[config.x_column]):
+            set_datetime_axis(axes.xaxis, frame[config.x_column])
+        state.density = config.chart_type == "scatter" and self._use_density(frame, config)
+        if config.chart_type == "line" or (config.chart_type == "scatter" and not state.density):
+            state.binding = self._create_viewport(frame, config)
+        if state.binding is not None:
+            state.binding.full_fidelity = full_fidelity
+
+        for column, color in zip(config.y_columns, colors):
+            state.series[column] = self._add_series(axes, frame, config, column, color, state)
+
+        if state.binding is not None:
+            axes.callbacks.connect("xlim_changed", state.binding.on_xlim_changed)
+
+    def _add_series(
+        self,
+        axes: plt.Axes,
+        frame: pd.DataFrame,
+        config: ChartConfig,
+        column: str,
+        color: str,
+        state: _PlotState,
+    ) -> _Series:
+        """Create the artists for one Y column."""
+        x_series = frame[config.x_column]
+        y_series = frame[column]
+        marker = config.marker_style if config.marker_style else None
+        binding = state.binding
+        if binding is not None and config.chart_type in {"line", "scatter"}:
+            binding.y_values[column] = y_series.to_numpy(dtype=np.float64, na_value=np.nan)
+            binding.y_versions[column] = ColumnVersion(y_series)
+            all_rows = binding.index.range_positions(None, None)
+            budget = None
             if config.chart_type == "line":
-                axes.plot(
-                    x_series, y_series,
-                    linestyle=config.line_style,
-                    marker=marker,
-                    color=color,
-                    label=column
-                )
-            elif config.chart_type == "bar":
-                axes.bar(x_series, y_series, label=column, alpha=0.7, color=color)
-            elif config.chart_type == "scatter":
-                scatter_marker = marker if marker else "o"
-                axes.scatter(x_series, y_series, label=column, color=color, marker=scatter_marker)
+                all_rows = binding.line_rows(all_rows)
+                budget = binding.budget(axes)
+            x_data, y_data = binding.series_data(column, all_rows, budget)
+        else:
+            x_data, y_data = self._plot_x(x_series), y_series
+
+        if config.chart_type == "line":
+            (line,) = axes.plot(
+                x_data, y_data,
+                linestyle=config.line_style,
+                marker=marker,
+                color=color,
+                label=column
+            )
+            if binding is not None:
+                binding.artists[column] = line
+            return _Series("line", [line])
+        if state.density:
+            image = self._plot_density(axes, frame, config.x_column, column, color)
+            # Images have no legend entry; an empty collection stands in.
+            proxy = axes.scatter([], [], label=column, color=color, marker=marker or "s")
+            return _Series("density", [image, proxy])
+        scatter_marker = marker if marker else "o"
+        collection = axes.scatter(
+            x_data, y_data, label=column, color=color, marker=scatter_marker
+        )
+        if binding is not None:
+            binding.artists[column] = collection
+        return _Series("scatter", [collection])
+
+    def _set_series_data(
+        self,
+        axes: plt.Axes,
+        frame: pd.DataFrame,
+        config: ChartConfig,
+        column: str,
+        state: _PlotState,
+    ) -> bool:
+        """Swap new Y data into existing artists; return False if they must be recreated."""
+        series = state.series[column]
+        y_series = frame[column]
+        binding = state.binding
+        if binding is not None and column in binding.artists:
+            binding.y_values[column] = y_series.to_numpy(dtype=np.float64, na_value=np.nan)
+            binding.y_versions[column] = ColumnVersion(y_series)
+            return True
+        if series.kind == "line":
+            series.artists[0].set_data(self._plot_x(frame[config.x_column]), y_series)
+            return True
+        x_series = frame[config.x_column]
+        if series.kind == "scatter" and self._is_numeric(x_series, allow_datetime=True):
+            series.artists[0].set_offsets(
+                np.column_stack([
+                    self._x_values(x_series),
+                    y_series.to_numpy(dtype=np.float64, na_value=np.nan),
+                ])
+            )
+            return True
+        return False
+
+    def _style_series(self, series: _Series, config: ChartConfig, color: str) -> None:
+        """Apply colours and marker/line styles without touching the data."""
+        marker = config.marker_style if config.marker_style else None
+        if series.kind == "line":
+            line = series.artists[0]
+            line.set_color(color)
+            line.set_linestyle(config.line_style)
+            line.set_marker(marker or "None")
+        elif series.kind == "scatter":
+            collection = series.artists[0]
+            collection.set_color(color)
+            style = MarkerStyle(marker or "o")
+            collection.set_paths([style.get_path().transformed(style.get_transform())])
+        elif series.kind == "density":
+            image, proxy = series.artists
+            image.set_cmap(density_colormap(color))
+            proxy.set_color(color)
+        elif series.kind == "bar":
+            series.artists[0].set_facecolor(color)
+            series.artists[0].set_edgecolor(color)
+        elif series.kind == "box":
+            for artist in series.artists:
+                if isinstance(artist, Line2D):  # outlier markers
+                    artist.set_markeredgecolor(color)
+                else:
+                    artist.set_facecolor(color)
+        else:  # histogram patches
+            for patch in series.artists:
+                patch.set_facecolor(color)
+
+    def _use_density(self, frame: pd.DataFrame, config: ChartConfig) -> bool:
+        if config.scatter_mode == "points":
+            return False
+        numeric = self._is_numeric(frame[config.x_column], allow_datetime=True) and all(
+            self._is_numeric(frame[column]) for column in config.y_columns
+        )
+        if not numeric:
+            if config.scatter_mode == "density":
+                logger.warning("Density scatter needs numeric columns, drawing points")
+            return False
+        if config.scatter_mode == "density":
+            return True
+        return len(frame.index) * len(config.y_columns) > self.DENSITY_THRESHOLD
+
+    def _plot_density(
+        self,
+        axes: plt.Axes,
+        frame: pd.DataFrame,
+        x_column: str,
+        y_column: str,
+        color: str,
+    ) -> DensityImage:
+        """Draw one Y series as a pixel-resolution density image."""
+        x_series = frame[x_column]
+        return add_density_image(
+            axes,
+            self._x_values(x_series),
+            frame[y_column].to_numpy(dtype=np.float64, na_value=np.nan),
+            color,
+            x_index=self.index_cache.get(x_series),
+        )
+
+    def _create_viewport(
+        self, frame: pd.DataFrame, config: ChartConfig
+    ) -> _ViewportBinding | None:
+        """Index numeric x data so artists can follow zooming and panning."""
+        x_series = frame[config.x_column]
+        if len(x_series) < self.VIEWPORT_MIN_ROWS:
+            return None
+        if not (
+            self._is_numeric(x_series, allow_datetime=True)
+            and all(self._is_numeric(frame[column]) for column in config.y_columns)
+        ):
+            return None
+        index = self.index_cache.get(x_series)
+        if index is None:
+            return None
+        lod = self.lod_cache if config.chart_type == "line" else None
+        return _ViewportBinding(index, self._x_values(x_series), config.downsample, lod)
+
+    # Bar charts ----------------------------------------------------------------------
+
+    def _plot_bars(
+        self, axes: plt.Axes, frame: pd.DataFrame, config: ChartConfig
+    ) -> Dict[str, _Series]:
+        """Aggregate Y by X and draw each series as one collection of bars."""
+        table = aggregate_bars(
+            frame,
+            config.x_column,
+            config.y_columns,
+            how=config.bar_aggregate,
+            top_n=config.bar_top_n,
+        )
+        colors = self._get_colors(config, len(table.series))
+        series: Dict[str, _Series] = {}
+        polygons = bar_geometry(table, mode=config.bar_mode)
+        for column, color, verts in zip(table.series, colors, polygons):
+            collection = PolyCollection(
+                verts, facecolors=color, edgecolors=color, alpha=0.7, label=column
+            )
+            axes.add_collection(collection, autolim=True)
+            series[column] = _Series("bar", [collection])
 
-    def _plot_histogram(self, axes: plt.Axes, frame: pd.DataFrame, config: ChartConfig) -> None:
+        self._categorical_x(axes, table.categories)
+        return series
+
+    @staticmethod
+    def _categorical_x(axes: plt.Axes, categories: List[str]) -> None:
+        """Label integer x positions with ``categories``, thinning the ticks if needed."""
+        axes.xaxis.set_major_locator(MaxNLocator(nbins=max(1, min(len(categories), 20)), integer=True))
+        axes.xaxis.set_major_formatter(_PositionLabels(categories))
+        axes.margins(x=0.01)
+        axes.autoscale_view()
+        if len(categories) > 8:
+            axes.tick_params(axis="x", labelrotation=45)
+
+    # Distribution charts -------------------------------------------------------------
+
+    def _plot_histogram(
+        self, axes: plt.Axes, frame: pd.DataFrame, config: ChartConfig
+    ) -> Dict[str, _Series]:
         numeric_columns: Sequence[str] = [
             col for col in config.y_columns if pd.api.types.is_numeric_dtype(frame[col])
         ]
         if not numeric_columns:
             raise ValueError("Histogram requires numeric Y columns")
-        
+
         colors = self._get_colors(config, len(numeric_columns))
-        axes.hist(
-            [frame[col].dropna() for col in numeric_columns],
-            label=list(numeric_columns),
-            bins=30,
-            alpha=0.6,
-            color=colors[:len(numeric_columns)],
+        histograms = self.histogram_cache.histograms(
+            [frame[col] for col in numeric_columns],
+            rule=config.hist_rule,
+            bins=config.hist_bins,
+            width=config.hist_bin_width,
+            shared=config.hist_shared_bins,
         )
+        series: Dict[str, _Series] = {}
+        for column, color, histogram in zip(numeric_columns, colors, histograms):
+            # One step patch per column, drawn straight from the cached counts.
+            patch = axes.stairs(
+                histogram.counts, histogram.edges, fill=True, alpha=0.6, color=color, label=column
+            )
+            series[column] = _Series("histogram", [patch])
+        return series
 
-    def _plot_boxplot(self, axes: plt.Axes, frame: pd.DataFrame, config: ChartConfig) -> None:
+    def _plot_boxplot(
+        self, axes: plt.Axes, frame: pd.DataFrame, config: ChartConfig
+    ) -> Dict[str, _Series]:
+        """Draw boxes from cached statistics, one per column or per X group and column."""
         numeric_columns: Sequence[str] = [
             col for col in config.y_columns if pd.api.types.is_numeric_dtype(frame[col])
         ]
         if not numeric_columns:
             raise ValueError("Boxplot requires at least one numeric column")
-        data = [frame[col].dropna() for col in numeric_columns]
-        axes.boxplot(data, labels=list(numeric_columns), vert=True, patch_artist=True)
 
-    def _plot_heatmap(self, axes: plt.Axes, frame: pd.DataFrame, config: ChartConfig) -> None:
-        numeric_frame = frame[config.y_columns].select_dtypes(include="number")
-        if numeric_frame.empty:
+        colors = self._get_colors(config, len(numeric_columns))
+        series: Dict[str, _Series] = {}
+        if not config.box_group_by_x:
+            for position, (column, color) in enumerate(zip(numeric_columns, colors), start=1):
+                stats = self.box_cache.stats(frame[column], config.box_max_outliers)
+                if stats is not None:
+                    series[column] = self._draw_boxes(axes, [stats], [position], 0.5, color)
+            axes.set_xticks(range(1, len(numeric_columns) + 1), numeric_columns)
+            return series
+
+        # Grouped: boxes for each X category, the Y columns side by side.
+        width = 0.8 / len(numeric_columns)
+        labels: List[str] = []
+        for offset, (column, color) in enumerate(zip(numeric_columns, colors)):
+            labels, stats = self.box_cache.grouped_stats(
+                frame[column], frame[config.x_column], config.box_max_outliers
+            )
+            positions = [
+                group - 0.4 + (offset + 0.5) * width
+                for group, box in enumerate(stats) if box is not None
+            ]
+            boxes = [box for box in stats if box is not None]
+            if boxes:
+                series[column] = self._draw_boxes(
+                    axes, boxes, positions, width * 0.8, color, label=column
+                )
+        self._categorical_x(axes, labels)
+        return series
+
+    @staticmethod
+    def _draw_boxes(
+        axes: plt.Axes,
+        stats: List[dict],
+        positions: List[float],
+        width: float,
+        color: str,
+        label: str | None = None,
+    ) -> _Series:
+        drawn = axes.bxp(
+            stats,
+            positions=positions,
+            widths=width,
+            patch_artist=True,
+            manage_ticks=False,
+            boxprops={"facecolor": color, "alpha": 0.7},
+            flierprops={"marker": "o", "markersize": 3, "markeredgecolor": color, "alpha": 0.5},
+        )
+        if label is not None:
+            drawn["boxes"][0].set_label(label)
+        return _Series("box", [*drawn["boxes"], *drawn["fliers"]])
+
+    def _plot_heatmap(
+        self,
+        axes: plt.Axes,
+        frame: pd.DataFrame,
+        config: ChartConfig,
+        colorbar: Colorbar | None = None,
+    ) -> Colorbar:
+        """Draw the correlation matrix, reusing ``colorbar`` from a previous heatmap."""
+        columns = [
+            column for column in config.y_columns
+            if pd.api.types.is_numeric_dtype(frame[column])
+        ]
+        if not columns:
             raise ValueError("Heatmap requires numeric columns")
-        corr = numeric_frame.corr()
-        axes.clear()
-        image = axes.imshow(corr, cmap="viridis", aspect="auto")
-        axes.set_xticks(range(len(corr.columns)))
-        axes.set_yticks(range(len(corr.index)))
-        axes.set_xticklabels(corr.columns, rotation=45, ha="right")
-        axes.set_yticklabels(corr.index)
-        axes.figure.colorbar(image, ax=axes, fraction=0.046, pad=0.04)
+        corr = self.correlation_cache.matrix(frame, columns, pairwise=config.heatmap_pairwise)
+        if config.heatmap_reorder and len(columns) > 2:
+            order = self.correlation_cache.order(
+                frame, columns, pairwise=config.heatmap_pairwise
+            )
+            corr = corr[np.ix_(order, order)]
+            columns = [columns[i] for i in order]
+
+        # Large matrices are resampled to the screen by the image itself
+        # ("antialiased" averages cells that share a pixel).
+        image = axes.imshow(
+            corr, cmap="viridis", aspect="auto", vmin=-1.0, vmax=1.0,
+            interpolation="antialiased" if len(columns) > self.HEATMAP_LABEL_LIMIT else "nearest",
+        )
+
+        name = _PositionLabels(columns, nearest=True)
+        if len(columns) <= self.HEATMAP_LABEL_LIMIT:
+            axes.set_xticks(range(len(columns)))
+            axes.set_yticks(range(len(columns)))
+            axes.set_xticklabels(columns, rotation=45, ha="right")
+            axes.set_yticklabels(columns)
+        else:
+            # Label a readable subset; hovering reports the exact pair.
+            for axis in (axes.xaxis, axes.yaxis):
+                axis.set_major_locator(MaxNLocator(nbins=self.HEATMAP_LABEL_LIMIT, integer=True))
+                axis.set_major_formatter(_PositionLabels(columns, nearest=True))
+            axes.tick_params(axis="x", labelrotation=90)
+        axes.fmt_xdata = name
+        axes.fmt_ydata = name
+        if colorbar is not None:
+            colorbar.update_normal(image)
+            return colorbar
+        return axes.figure.colorbar(image, ax=axes, fraction=0.046, pad=0.04)
 
 
 __all__ = ["ChartManager"]
@@ -0,0 +1,268 @@
+"""Cached sorted indexes for fast numeric range queries."""
+
+from __future__ import annotations
+
+import logging
+import threading
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger("visulite.column_index")
+
+
+@dataclass(frozen=True)
+class SortedColumnIndex:
+    """Argsort permutation plus sorted values of one numeric column.
+
+    ``NaN`` rows are excluded, so ``len(values)`` may be smaller than the
+    column length. ``monotonic`` is set when the column is already sorted,
+    in which case range queries map directly onto contiguous row slices.
+    """
+
+    order: np.ndarray
+    values: np.ndarray
+    length: int
+    monotonic: bool
+
+    def bounds(self, low: float | None, high: float | None) -> Tuple[int, int]:
+        """Return ``[lo, hi)`` positions into ``values`` for ``low <= v <= high``."""
+        lo = 0 if low is None else int(np.searchsorted(self.values, low, side="left"))
+        hi = (
+            len(self.values)
+            if high is None
+            else int(np.searchsorted(self.values, high, side="right"))
+        )
+        return lo, max(lo, hi)
+
+    def range_positions(
+        self, low: float | None, high: float | None, pad: int = 0
+    ) -> np.ndarray | slice:
+        """Row positions whose value lies in ``[low, high]``, in row order.
+
+        ``pad`` extends the selection by that many neighbours on each side,
+        which keeps line segments crossing the range edges intact.
+        """
+        lo, hi = self.bounds(low, high)
+        lo = max(0, lo - pad)
+        hi = min(len(self.values), hi + pad)
+        if self.monotonic:
+            return slice(lo, hi)
+        return np.sort(self.order[lo:hi])
+
+    def range_mask(self, low: float | None, high: float | None) -> np.ndarray:
+        """Boolean row mask for ``low <= value <= high``."""
+        lo, hi = self.bounds(low, high)
+        mask = np.zeros(self.length, dtype=bool)
+        mask[self.order[lo:hi]] = True
+        return mask
+
+
+def numeric_values(series: pd.Series) -> np.ndarray:
+    """Return ``series`` as a float64 array with unparsable entries as ``NaN``.
+
+    Datetime columns are expressed as nanoseconds since the epoch.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        stamps = series.to_numpy(dtype="datetime64[ns]")
+        values = stamps.view("i8").astype(np.float64)
+        values[np.isnat(stamps)] = np.nan
+        return values
+    numeric = pd.to_numeric(series, errors="coerce")
+    return numeric.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _buffer_of(series: pd.Series) -> Any:
+    """Return the object that owns the memory behind ``series``."""
+    if isinstance(series.dtype, np.dtype):
+        values = series.to_numpy(copy=False)
+        root = values
+        while isinstance(root.base, np.ndarray):
+            root = root.base
+        return values, root
+    array = series.array
+    return array, array
+
+
+def column_token(series: pd.Series) -> Tuple[Hashable, Any]:
+    """Identify the buffer backing ``series``.
+
+    Returns a hashable token and the owning object. The token stays valid
+    while the owner is alive, so holding a weak reference to the owner and
+    comparing identities detects when a column has been replaced.
+    """
+    values, owner = _buffer_of(series)
+    if isinstance(values, np.ndarray):
+        pointer = values.__array_interface__["data"][0]
+        token: Hashable = (pointer, values.shape, values.strides, values.dtype.str)
+    else:
+        token = (id(values), len(values), str(series.dtype))
+    return token, owner
+
+
+class ColumnVersion:
+    """Snapshot of which buffer backed a column when it was captured.
+
+    :meth:`matches` is true while the column still uses that same buffer,
+    which lets caches and renderers skip work for unchanged columns.
+    """
+
+    __slots__ = ("name", "token", "_owner")
+
+    def __init__(self, series: pd.Series) -> None:
+        token, owner = column_token(series)
+        self.name = series.name
+        self.token = token
+        try:
+            self._owner: weakref.ref | None = weakref.ref(owner)
+        except TypeError:
+            self._owner = None
+
+    @property
+    def trackable(self) -> bool:
+        """False when the buffer cannot be weakly referenced (never matches)."""
+        return self._owner is not None
+
+    def matches(self, series: pd.Series) -> bool:
+        if self._owner is None or series.name != self.name:
+            return False
+        token, owner = column_token(series)
+        return token == self.token and self._owner() is owner
+
+    def same_as(self, other: "ColumnVersion") -> bool:
+        """True if both snapshots refer to the same, still-alive column buffer."""
+        if self._owner is None or other._owner is None:
+            return False
+        owner = self._owner()
+        return (
+            self.name == other.name
+            and self.token == other.token
+            and owner is not None
+            and owner is other._owner()
+        )
+
+
+class VersionedCache:
+    """Thread-safe LRU of computed values that depend on one or more columns.
+
+    Each entry remembers the :class:`ColumnVersion` of every column it was
+    computed from and is only reused while all of them still match.
+    """
+
+    def __init__(self, max_entries: int = 32) -> None:
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, tuple[List[ColumnVersion], Any]]" = OrderedDict()
+
+    def get(
+        self, key: Hashable, versions: Sequence[ColumnVersion], compute: Callable[[], Any]
+    ) -> Any:
+        """Return the value cached under ``key`` or store ``compute()`` there."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and len(entry[0]) == len(versions) and all(
+                cached.same_as(current) for cached, current in zip(entry[0], versions)
+            ):
+                self._entries.move_to_end(key)
+                return entry[1]
+        value = compute()
+        if all(version.trackable for version in versions):
+            with self._lock:
+                self._entries[key] = (list(versions), value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, column: Hashable | None = None) -> None:
+        """Drop entries computed from ``column`` (or every entry when ``None``)."""
+        with self._lock:
+            if column is None:
+                self._entries.clear()
+                return
+            stale = [
+                key
+                for key, (versions, _) in self._entries.items()
+                if any(version.name == column for version in versions)
+            ]
+            for key in stale:
+                del self._entries[key]
+
+
+class ColumnIndexCache:
+    """LRU cache of :class:`SortedColumnIndex` objects keyed by column buffer.
+
+    Entries are validated against the buffer that backs the column, so a
+    replaced column (type conversion, filtering, reloading) never reuses a
+    stale index. In-place edits keep the same buffer and therefore must call
+    :meth:`invalidate` explicitly. The cache is shared with the render
+    thread, so lookups and updates are locked.
+    """
+
+    def __init__(self, max_entries: int = 32) -> None:
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[tuple, tuple[ColumnVersion, SortedColumnIndex]]" = (
+            OrderedDict()
+        )
+
+    def get(self, series: pd.Series) -> SortedColumnIndex | None:
+        """Return the sorted index for ``series`` or ``None`` if nothing is numeric."""
+        version = ColumnVersion(series)
+        key = (series.name, version.token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0].matches(series):
+                self._entries.move_to_end(key)
+                return entry[1]
+
+        index = self.build(series)
+        if index is None:
+            return None
+        if not version.trackable:
+            # Buffers that cannot be weakly referenced are indexed but not cached.
+            return index
+        with self._lock:
+            self._entries[key] = (version, index)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return index
+
+    @staticmethod
+    def build(series: pd.Series) -> SortedColumnIndex | None:
+        values = numeric_values(series)
+        valid = ~np.isnan(values)
+        if not valid.any():
+            return None
+        positions = np.flatnonzero(valid)
+        order = positions[np.argsort(values[positions], kind="stable")]
+        sorted_values = values[order]
+        monotonic = bool(valid.all() and np.all(order[1:] > order[:-1]))
+        logger.debug("Built sorted index for column %s (%d rows)", series.name, len(order))
+        return SortedColumnIndex(
+            order=order, values=sorted_values, length=len(values), monotonic=monotonic
+        )
+
+    def invalidate(self, column: Hashable | None = None) -> None:
+        """Drop cached indexes for ``column`` (or every column when ``None``)."""
+        with self._lock:
+            if column is None:
+                self._entries.clear()
+                return
+            for key in [key for key in self._entries if key[0] == column]:
+                del self._entries[key]
+
+
+__all__ = [
+    "ColumnIndexCache",
+    "ColumnVersion",
+    "SortedColumnIndex",
+    "VersionedCache",
+    "column_token",
+    "numeric_values",
+]
@@ -4,17 +4,32 @@ from __future__ import annotations
 
 import json
 from pathlib import Path
+from typing import Any, Dict
 
 from visulite.models.chart_config import ChartConfig
 
 
 class ConfigManager:
-    """Read and write chart configurations."""
+    """Read and write chart configurations and application preferences."""
 
     def __init__(self, base_dir: Path | None = None) -> None:
         self.base_dir = base_dir or Path.home() / ".visulite"
         self.base_dir.mkdir(parents=True, exist_ok=True)
         self.config_path = self.base_dir / "chart_config.json"
+        self.preferences_path = self.base_dir / "preferences.json"
+
+    def load_preferences(self) -> Dict[str, Any]:
+        try:
+            data = json.loads(self.preferences_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def save_preferences(self, preferences: Dict[str, Any]) -> Path:
+        self.preferences_path.write_text(
+            json.dumps(preferences, ensure_ascii=False, indent=2), encoding="utf-8"
+        )
+        return self.preferences_path
 
     def save_chart_config(self, config: ChartConfig) -> Path:
         with self.config_path.open("w", encoding="utf-8") as fh:
@@ -24,7 +39,12 @@ class ConfigManager:
     def load_chart_config(self) -> ChartConfig | None:
         if not self.config_path.exists():
             return None
-        with self.config_path.open(encoding="utf-8") as fh:
+        return self.read_chart_config(self.config_path)
+
+    @staticmethod
+    def read_chart_config(path: Path) -> ChartConfig:
+        """Configuration saved in ``path``; raises on unreadable files or unknown keys."""
+        with path.open(encoding="utf-8") as fh:
             data = json.load(fh)
         return ChartConfig(**data)
 
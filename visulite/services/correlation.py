@@ -0,0 +1,170 @@
+"""Correlation matrices for wide numeric data, computed in float32 with BLAS."""
+
+from __future__ import annotations
+
+import logging
+from typing import List, Sequence
+
+import numpy as np
+import pandas as pd
+
+from visulite.services.column_index import ColumnVersion, VersionedCache
+
+logger = logging.getLogger("visulite.correlation")
+
+# Rows per chunk are chosen so one float32 chunk stays around this size.
+CHUNK_BYTES = 64 * 1024 * 1024
+# Clusters at or below this size are ordered directly instead of split again.
+LEAF_SIZE = 8
+
+
+def _row_chunks(frame: pd.DataFrame, columns: Sequence[str]):
+    subset = frame[list(columns)]
+    step = max(1, CHUNK_BYTES // (4 * max(1, len(columns))))
+    for start in range(0, len(subset.index), step):
+        yield subset.iloc[start:start + step].to_numpy(dtype=np.float32, na_value=np.nan)
+
+
+def correlation_matrix(
+    frame: pd.DataFrame, columns: Sequence[str], pairwise: bool = True
+) -> np.ndarray:
+    """Pearson correlation of ``columns`` as a float32 matrix.
+
+    Rows are streamed in chunks and reduced with float32 matrix products,
+    accumulating across chunks in float64. With ``pairwise`` each pair uses
+    every row where both values are present (like ``DataFrame.corr``);
+    otherwise only rows complete across all columns are used, which needs a
+    single product per chunk. Pairs with fewer than two observations or no
+    variance are ``NaN``.
+    """
+    columns = list(columns)
+    width = len(columns)
+    # Centre on the column means first; it keeps float32 products accurate.
+    means = np.array(
+        [np.nanmean(frame[column].to_numpy(dtype=np.float64, na_value=np.nan))
+         if len(frame.index) else 0.0 for column in columns]
+    )
+    means = np.nan_to_num(means).astype(np.float32)
+
+    if not pairwise:
+        gram = np.zeros((width, width))
+        sums = np.zeros(width)
+        count = 0
+        for chunk in _row_chunks(frame, columns):
+            chunk = chunk[~np.isnan(chunk).any(axis=1)] - means
+            gram += chunk.T @ chunk
+            sums += chunk.sum(axis=0, dtype=np.float64)
+            count += len(chunk)
+        if count < 2:
+            return np.full((width, width), np.nan, dtype=np.float32)
+        cov = gram - np.outer(sums, sums) / count
+        var = np.diag(cov).copy()
+        with np.errstate(invalid="ignore", divide="ignore"):
+            scale = np.where(var > 0, 1.0 / np.sqrt(var), np.nan)
+            corr = cov * scale[:, None] * scale[None, :]
+        np.fill_diagonal(corr, np.where(var > 0, 1.0, np.nan))
+        return np.clip(corr, -1.0, 1.0).astype(np.float32)
+
+    cross = np.zeros((width, width))  # sum of x_i * x_j over shared rows
+    sum_i = np.zeros((width, width))  # sum of x_i over rows where x_j is present
+    sq_i = np.zeros((width, width))  # sum of x_i ** 2 over rows where x_j is present
+    counts = np.zeros((width, width))
+    for chunk in _row_chunks(frame, columns):
+        present = ~np.isnan(chunk)
+        values = np.where(present, chunk - means, np.float32(0))
+        mask = present.astype(np.float32)
+        cross += values.T @ values
+        sum_i += values.T @ mask
+        sq_i += (values * values).T @ mask
+        counts += mask.T @ mask
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = cross - sum_i * sum_i.T / counts
+        var_i = sq_i - sum_i * sum_i / counts
+        corr = cov / np.sqrt(var_i * var_i.T)
+    corr[(counts < 2) | (var_i <= 0) | (var_i.T <= 0)] = np.nan
+    diagonal = np.diag(corr)
+    np.fill_diagonal(corr, np.where(np.isnan(diagonal), np.nan, 1.0))
+    return np.clip(corr, -1.0, 1.0).astype(np.float32)
+
+
+def cluster_order(corr: np.ndarray) -> np.ndarray:
+    """Order variables so strongly correlated ones sit next to each other.
+
+    Divisive (top-down) hierarchical clustering on ``|corr|``: each cluster
+    is split by the sign of its rows' first principal component, found by
+    power iteration, until clusters reach :data:`LEAF_SIZE`. Leaves are
+    ordered by that component, so neighbouring blocks also flow into each
+    other.
+    """
+    similarity = np.nan_to_num(np.abs(corr.astype(np.float32)))
+    order: List[np.ndarray] = []
+    rng = np.random.default_rng(0)
+
+    def split(members: np.ndarray) -> None:
+        block = similarity[np.ix_(members, members)]
+        centred = block - block.mean(axis=0)
+        vector = rng.standard_normal(len(members)).astype(np.float32)
+        for _ in range(30):
+            vector = centred @ (centred.T @ vector)
+            norm = float(np.linalg.norm(vector))
+            if norm == 0.0:
+                break
+            vector /= norm
+        ranked = members[np.argsort(vector, kind="stable")]
+        if len(members) <= LEAF_SIZE:
+            order.append(ranked)
+            return
+        left = vector < 0
+        if left.all() or not left.any():
+            # No structure left to split on; halve along the component.
+            half = len(members) // 2
+            split(ranked[:half])
+            split(ranked[half:])
+            return
+        split(ranked[: int(left.sum())])
+        split(ranked[int(left.sum()):])
+
+    if len(corr):
+        split(np.arange(len(corr)))
+    return np.concatenate(order) if order else np.arange(0)
+
+
+class CorrelationCache:
+    """Correlation matrices and cluster orders cached per column set and version."""
+
+    def __init__(self, max_entries: int = 8) -> None:
+        self._cache = VersionedCache(max_entries)
+
+    def matrix(
+        self, frame: pd.DataFrame, columns: Sequence[str], pairwise: bool = True
+    ) -> np.ndarray:
+        versions = [ColumnVersion(frame[column]) for column in columns]
+        key = ("corr", tuple((v.name, v.token) for v in versions), pairwise)
+        return self._cache.get(
+            key, versions, lambda: self._compute(frame, columns, pairwise)
+        )
+
+    def order(
+        self, frame: pd.DataFrame, columns: Sequence[str], pairwise: bool = True
+    ) -> np.ndarray:
+        versions = [ColumnVersion(frame[column]) for column in columns]
+        key = ("order", tuple((v.name, v.token) for v in versions), pairwise)
+        return self._cache.get(
+            key, versions, lambda: cluster_order(self.matrix(frame, columns, pairwise))
+        )
+
+    def invalidate(self, column: str | None = None) -> None:
+        self._cache.invalidate(column)
+
+    @staticmethod
+    def _compute(frame: pd.DataFrame, columns: Sequence[str], pairwise: bool) -> np.ndarray:
+        # Without missing values both modes agree; take the single-product path.
+        complete = not any(frame[column].hasnans for column in columns)
+        logger.info(
+            "Computing %dx%d correlation matrix (%s)",
+            len(columns), len(columns), "pairwise" if pairwise and not complete else "complete",
+        )
+        return correlation_matrix(frame, columns, pairwise=pairwise and not complete)
+
+
+__all__ = ["CorrelationCache", "cluster_order", "correlation_matrix"]
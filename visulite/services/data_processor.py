@@ -6,8 +6,11 @@ import logging
 from dataclasses import dataclass
 from typing import Dict, Iterable, Optional
 
+import numpy as np
 import pandas as pd
 
+from visulite.services.column_index import ColumnIndexCache
+
 logger = logging.getLogger("visulite.data_processor")
 
 
@@ -21,40 +24,145 @@ class FilterCriteria:
 class DataProcessor:
     """Applies simple preprocessing steps to pandas DataFrames."""
 
+    def __init__(self, index_cache: ColumnIndexCache | None = None) -> None:
+        self.index_cache = index_cache or ColumnIndexCache()
+
     def apply_filters(self, frame: pd.DataFrame, criteria: FilterCriteria) -> pd.DataFrame:
+        """Return the rows of ``frame`` matching every criterion.
+
+        All criteria are combined into one boolean mask over ``frame`` so the
+        data is copied only once. Numeric ranges are answered with binary
+        searches over the cached sorted index of each column.
+        """
         logger.info("Applying filters to dataframe")
-        result = frame.copy()
+        mask = np.ones(len(frame.index), dtype=bool)
         if criteria.text_filters:
             for column, keyword in criteria.text_filters.items():
-                if column in result.columns and keyword:
-                    mask = result[column].astype(str).str.contains(keyword, case=False, na=False)
-                    result = result[mask]
+                if column in frame.columns and keyword:
+                    matches = frame[column].astype(str).str.contains(keyword, case=False, na=False)
+                    mask &= matches.to_numpy(dtype=bool)
 
         if criteria.numeric_ranges:
             for column, (min_v, max_v) in criteria.numeric_ranges.items():
-                if column in result.columns:
-                    series = pd.to_numeric(result[column], errors="coerce")
-                    if min_v is not None:
-                        result = result[series >= min_v]
-                    if max_v is not None:
-                        result = result[series <= max_v]
+                if column not in frame.columns or (min_v is None and max_v is None):
+                    continue
+                index = self.index_cache.get(frame[column])
+                if index is None:
+                    mask[:] = False
+                else:
+                    mask &= index.range_mask(min_v, max_v)
 
         if criteria.dropna_columns:
-            result = result.dropna(subset=list(criteria.dropna_columns))
+            mask &= frame[list(criteria.dropna_columns)].notna().all(axis=1).to_numpy()
+
+        return frame[mask]
+
+    FILL_METHODS = {"mean", "median", "zero", "ffill", "bfill", "interpolate"}
+
+    def fill_missing(
+        self,
+        frame: pd.DataFrame,
+        method: str = "mean",
+        columns: Iterable[str] | None = None,
+        group_by: str | None = None,
+    ) -> pd.DataFrame:
+        """Fill missing values column by column.
+
+        Only columns that actually contain missing values are replaced; the
+        remaining columns are shared with ``frame`` rather than copied.
 
+        Args:
+            frame: The DataFrame to fill
+            method: One of 'mean', 'median', 'zero', 'ffill', 'bfill', 'interpolate'
+            columns: Columns to fill (defaults to every column)
+            group_by: Optional column whose categories are filled independently
+
+        Returns:
+            A new DataFrame with the filled columns
+        """
+        if method not in self.FILL_METHODS:
+            method = "mean"
+        if group_by is not None and group_by not in frame.columns:
+            raise ValueError(f"Column '{group_by}' not found in DataFrame")
+        targets = list(frame.columns) if columns is None else list(columns)
+        missing = [col for col in targets if col not in frame.columns]
+        if missing:
+            raise ValueError(f"Columns not found: {', '.join(missing)}")
+
+        has_missing = frame[targets].isna().any()
+        targets = [col for col in targets if has_missing[col] and col != group_by]
+        if method in {"mean", "median", "interpolate"}:
+            targets = [
+                col for col in targets
+                if pd.api.types.is_numeric_dtype(frame[col])
+                and not pd.api.types.is_bool_dtype(frame[col])
+            ]
+        if not targets:
+            return frame
+
+        logger.info(
+            "Filling missing values with '%s' in %d column(s)%s",
+            method,
+            len(targets),
+            f" grouped by '{group_by}'" if group_by else "",
+        )
+        subset = frame[targets]
+        grouped = (
+            subset.groupby(frame[group_by], sort=False, dropna=False)
+            if group_by is not None
+            else None
+        )
+        if method == "zero":
+            filled = subset.fillna(0)
+        elif method in {"ffill", "bfill"}:
+            source = grouped if grouped is not None else subset
+            filled = source.ffill() if method == "ffill" else source.bfill()
+        elif method == "interpolate":
+            filled = self._interpolate(subset, frame[group_by] if group_by else None)
+        elif grouped is not None:
+            filled = subset.fillna(grouped.transform(method))
+        else:
+            stats = subset.median() if method == "median" else subset.mean()
+            filled = subset.fillna(stats)
+
+        result = frame.copy(deep=False)
+        for column in targets:
+            result[column] = filled[column]
         return result
 
-    def fill_missing(self, frame: pd.DataFrame, method: str = "mean") -> pd.DataFrame:
-        if method == "ffill":
-            return frame.ffill()
-        elif method == "bfill":
-            return frame.bfill()
-        elif method == "zero":
-            return frame.fillna(0)
-        elif method == "median":
-            return frame.fillna(frame.median(numeric_only=True))
-        else:  # default to mean
-            return frame.fillna(frame.mean(numeric_only=True))
+    @staticmethod
+    def _interpolate(subset: pd.DataFrame, keys: pd.Series | None) -> pd.DataFrame:
+        """Linear interpolation by row position, optionally within groups.
+
+        Built from forward/backward fills of values and row positions so that
+        grouped interpolation stays vectorized. Like ``Series.interpolate``,
+        leading gaps stay empty and trailing gaps repeat the last value.
+        """
+        if keys is not None:
+            # Points are equally spaced within each group, as in ``interpolate``.
+            positions = (
+                keys.groupby(keys, sort=False, dropna=False).cumcount().to_numpy(np.float64)
+            )
+        else:
+            positions = np.arange(len(subset.index), dtype=np.float64)
+        filled = {}
+        for column in subset.columns:
+            values = subset[column].astype(np.float64)
+            valid_pos = pd.Series(
+                np.where(values.notna().to_numpy(), positions, np.nan), index=subset.index
+            )
+            work = pd.DataFrame({"value": values, "pos": valid_pos})
+            source = work.groupby(keys, sort=False, dropna=False) if keys is not None else work
+            before = source.ffill()
+            after = source.bfill()
+            span = (after["pos"] - before["pos"]).to_numpy()
+            with np.errstate(invalid="ignore", divide="ignore"):
+                weight = np.where(span > 0, (positions - before["pos"].to_numpy()) / span, 0.0)
+            result = before["value"] + (after["value"] - before["value"]) * weight
+            trailing = after["pos"].isna() & before["pos"].notna()
+            result[trailing] = before["value"][trailing]
+            filled[column] = result.where(values.isna(), values)
+        return pd.DataFrame(filled, index=subset.index)
 
     def convert_column_type(
         self, frame: pd.DataFrame, column: str, target_type: str
@@ -67,27 +175,58 @@ class DataProcessor:
             target_type: One of 'string', 'int', 'float', 'datetime'
             
         Returns:
-            A new DataFrame with the converted column
+            A new DataFrame sharing every other column with ``frame``
         """
         if column not in frame.columns:
             raise ValueError(f"Column '{column}' not found in DataFrame")
         
-        result = frame.copy()
+        source = frame[column]
         logger.info("Converting column '%s' to type '%s'", column, target_type)
         
         if target_type == "string":
-            result[column] = result[column].astype(str)
+            converted = source.astype(str)
         elif target_type == "int":
-            result[column] = pd.to_numeric(result[column], errors="coerce").fillna(0).astype(int)
+            converted = pd.to_numeric(source, errors="coerce").fillna(0).astype(int)
         elif target_type == "float":
-            result[column] = pd.to_numeric(result[column], errors="coerce")
+            converted = pd.to_numeric(source, errors="coerce")
         elif target_type == "datetime":
-            result[column] = pd.to_datetime(result[column], errors="coerce")
+            converted = self._parse_datetimes(source)
         else:
             raise ValueError(f"Unsupported target type: {target_type}")
         
+        # Shallow copy: only the converted column gets a new buffer.
+        result = frame.copy(deep=False)
+        result[column] = converted
+        self.index_cache.invalidate(column)
         return result
 
+    @staticmethod
+    def _parse_datetimes(source: pd.Series, sample_size: int = 200) -> pd.Series:
+        """Parse ``source`` to datetimes, with one format for every row when possible.
+
+        The format is guessed from the first value and checked against a
+        spread-out sample; if it fits, the whole column is parsed with it
+        (and repeated strings only once). Otherwise each value is parsed on
+        its own.
+        """
+        if pd.api.types.is_datetime64_any_dtype(source.dtype):
+            return source
+        present = source.dropna()
+        if not len(present) or not isinstance(present.iloc[0], str):
+            return pd.to_datetime(source, errors="coerce")
+        guess = pd.tseries.api.guess_datetime_format(present.iloc[0])
+        if guess is not None:
+            positions = np.unique(np.linspace(0, len(present) - 1, sample_size).astype(np.intp))
+            try:
+                pd.to_datetime(present.iloc[positions], format=guess)
+            except (ValueError, TypeError):
+                guess = None
+        if guess is None:
+            logger.info("No single datetime format fits '%s', parsing per value", source.name)
+            return pd.to_datetime(source, errors="coerce", format="mixed")
+        logger.info("Parsing '%s' with datetime format %s", source.name, guess)
+        return pd.to_datetime(source, errors="coerce", format=guess, cache=True)
+
     def slice_rows(
         self,
         frame: pd.DataFrame,
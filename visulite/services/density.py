@@ -0,0 +1,151 @@
+"""Rasterized density rendering for very large scatter plots."""
+
+from __future__ import annotations
+
+import math
+
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.colors import LinearSegmentedColormap, to_rgb
+from matplotlib.image import AxesImage
+
+from visulite.services.column_index import SortedColumnIndex
+
+
+def bin_points(
+    x: np.ndarray,
+    y: np.ndarray,
+    x_range: tuple[float, float],
+    y_range: tuple[float, float],
+    shape: tuple[int, int],
+) -> np.ndarray:
+    """Count points per cell of a ``(height, width)`` grid over the given ranges."""
+    height, width = shape
+    x0, x1 = x_range
+    y0, y1 = y_range
+    if x1 <= x0 or y1 <= y0 or width <= 0 or height <= 0:
+        return np.zeros(shape, dtype=np.int64)
+    col = np.floor((x - x0) * (width / (x1 - x0)))
+    row = np.floor((y - y0) * (height / (y1 - y0)))
+    inside = (col >= 0) & (col < width) & (row >= 0) & (row < height)
+    flat = row[inside].astype(np.int64) * width + col[inside].astype(np.int64)
+    return np.bincount(flat, minlength=width * height).reshape(height, width)
+
+
+def density_colormap(color: str, min_alpha: float = 0.25) -> LinearSegmentedColormap:
+    """Single-hue colormap fading from translucent to opaque ``color``."""
+    r, g, b = to_rgb(color)
+    cmap = LinearSegmentedColormap.from_list(
+        f"density-{color}", [(r, g, b, min_alpha), (r, g, b, 1.0)]
+    )
+    cmap.set_bad((0, 0, 0, 0))
+    return cmap
+
+
+class DensityImage(AxesImage):
+    """Image artist that bins its points at the axes' pixel resolution.
+
+    Binning happens lazily in :meth:`draw` whenever the view limits or the
+    pixel size of the axes changed, so zooming, panning, resizing and
+    exporting at a different DPI all re-aggregate from the full data.
+    """
+
+    def __init__(
+        self,
+        axes: plt.Axes,
+        x: np.ndarray,
+        y: np.ndarray,
+        color: str,
+        x_index: SortedColumnIndex | None = None,
+        **kwargs,
+    ) -> None:
+        super().__init__(
+            axes,
+            cmap=density_colormap(color),
+            origin="lower",
+            interpolation="nearest",
+            **kwargs,
+        )
+        finite = np.isfinite(x) & np.isfinite(y)
+        self._all_finite = bool(finite.all())
+        self._x = x
+        self._y = y
+        self._finite = finite
+        self._x_index = x_index
+        self._view_key: tuple | None = None
+        self._view_extent = self._extent = (0.0, 1.0, 0.0, 1.0)
+        self.set_data(np.ma.masked_all((1, 1)))
+        if finite.any():
+            self.data_bounds = (
+                float(x[finite].min()),
+                float(x[finite].max()),
+                float(y[finite].min()),
+                float(y[finite].max()),
+            )
+        else:
+            self.data_bounds = (0.0, 1.0, 0.0, 1.0)
+
+    def get_extent(self):  # noqa: D401 - matplotlib override
+        return self._view_extent
+
+    def _visible_points(self, x0: float, x1: float) -> tuple[np.ndarray, np.ndarray]:
+        if self._x_index is None:
+            if self._all_finite:
+                return self._x, self._y
+            return self._x[self._finite], self._y[self._finite]
+        lo, hi = self._x_index.bounds(x0, x1)
+        rows = slice(lo, hi) if self._x_index.monotonic else self._x_index.order[lo:hi]
+        return self._x[rows], self._y[rows]
+
+    def rebin(self) -> None:
+        axes = self.axes
+        x0, x1 = sorted(axes.get_xlim())
+        y0, y1 = sorted(axes.get_ylim())
+        bbox = axes.get_window_extent()
+        width = max(1, int(math.ceil(bbox.width)))
+        height = max(1, int(math.ceil(bbox.height)))
+        key = (x0, x1, y0, y1, width, height)
+        if key == self._view_key:
+            return
+        self._view_key = key
+        x, y = self._visible_points(x0, x1)
+        counts = bin_points(x, y, (x0, x1), (y0, y1), (height, width))
+        shaded = np.ma.masked_equal(np.log1p(counts, dtype=np.float64), 0.0)
+        # AxesImage.get_window_extent reads _extent directly (tight layout).
+        self._view_extent = self._extent = (x0, x1, y0, y1)
+        self.set_data(shaded)
+        top = float(shaded.max()) if shaded.count() else 1.0
+        self.set_clim(0.0, top)
+
+    def get_cursor_data(self, event):  # noqa: D401 - matplotlib override
+        value = super().get_cursor_data(event)
+        if value is None or np.ma.is_masked(value):
+            return 0
+        # Undo the log shading so the cursor readout shows the point count.
+        return int(round(np.expm1(value)))
+
+    def format_cursor_data(self, data) -> str:
+        return f"{data:,} 个点"
+
+    def draw(self, renderer) -> None:
+        self.rebin()
+        super().draw(renderer)
+
+
+def add_density_image(
+    axes: plt.Axes,
+    x: np.ndarray,
+    y: np.ndarray,
+    color: str,
+    x_index: SortedColumnIndex | None = None,
+) -> DensityImage:
+    """Attach a :class:`DensityImage` to ``axes`` and include it in autoscaling."""
+    image = DensityImage(axes, x, y, color, x_index=x_index)
+    axes.add_image(image)
+    xmin, xmax, ymin, ymax = image.data_bounds
+    axes.update_datalim([(xmin, ymin), (xmax, ymax)])
+    axes.autoscale_view()
+    return image
+
+
+__all__ = ["DensityImage", "add_density_image", "bin_points", "density_colormap"]
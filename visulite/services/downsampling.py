@@ -0,0 +1,93 @@
+"""Shape-preserving downsampling for dense line series."""
+
+from __future__ import annotations
+
+import math
+
+import matplotlib.pyplot as plt
+import numpy as np
+
+DOWNSAMPLE_METHODS = ("minmax", "lttb", "none")
+
+
+def point_budget(axes: plt.Axes, points_per_pixel: float = 2.0, minimum: int = 500) -> int:
+    """Return how many points a series needs to look exact at the axes' pixel width."""
+    width = axes.get_window_extent().width
+    if not math.isfinite(width) or width <= 0:
+        width = axes.figure.get_figwidth() * axes.figure.dpi
+    return max(minimum, int(width * points_per_pixel))
+
+
+def minmax_indices(y: np.ndarray, n_out: int) -> np.ndarray:
+    """Keep the minimum and maximum of each of ``n_out // 2`` equal buckets.
+
+    Every peak and trough survives, so a min-max decimated line renders the
+    same envelope as the full series at screen resolution.
+    """
+    n = len(y)
+    if n <= n_out or n_out < 4:
+        return np.arange(n)
+    n_buckets = n_out // 2
+    bucket = math.ceil(n / n_buckets)
+    n_buckets = math.ceil(n / bucket)
+    padded = np.full(n_buckets * bucket, np.nan)
+    padded[:n] = y
+    blocks = padded.reshape(n_buckets, bucket)
+    nan = np.isnan(blocks)
+    lows = np.where(nan, np.inf, blocks).argmin(axis=1)
+    highs = np.where(nan, -np.inf, blocks).argmax(axis=1)
+    offsets = np.arange(n_buckets) * bucket
+    keep = np.concatenate([offsets + lows, offsets + highs, [0, n - 1]])
+    keep = keep[keep < n]
+    return np.unique(keep)
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets selection of ``n_out`` points.
+
+    ``NaN`` samples are skipped. The per-bucket triangle areas are computed
+    with NumPy; only the walk over buckets is a Python loop.
+    """
+    valid = np.flatnonzero(~(np.isnan(x) | np.isnan(y)))
+    n = len(valid)
+    if n <= n_out or n_out < 3:
+        return valid
+    xs = x[valid]
+    ys = y[valid]
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    previous = 0
+    for bucket in range(n_out - 2):
+        start, end = edges[bucket], max(edges[bucket + 1], edges[bucket] + 1)
+        next_start = end
+        next_end = edges[bucket + 2] if bucket + 2 < len(edges) else n
+        next_end = max(next_end, next_start + 1)
+        avg_x = xs[next_start:next_end].mean()
+        avg_y = ys[next_start:next_end].mean()
+        px, py = xs[previous], ys[previous]
+        areas = np.abs(
+            (px - avg_x) * (ys[start:end] - py) - (px - xs[start:end]) * (avg_y - py)
+        )
+        previous = start + int(areas.argmax())
+        selected[bucket + 1] = previous
+    return valid[selected]
+
+
+def downsample_indices(x: np.ndarray, y: np.ndarray, n_out: int, method: str) -> np.ndarray:
+    """Dispatch to the configured downsampling ``method``."""
+    if method == "lttb":
+        return lttb_indices(x, y, n_out)
+    if method == "minmax":
+        return minmax_indices(y, n_out)
+    return np.arange(len(y))
+
+
+__all__ = [
+    "DOWNSAMPLE_METHODS",
+    "downsample_indices",
+    "lttb_indices",
+    "minmax_indices",
+    "point_budget",
+]
@@ -2,30 +2,320 @@
 
 from __future__ import annotations
 
+import io
 import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from dataclasses import asdict, dataclass
 from pathlib import Path
+from typing import ContextManager, Dict, Iterator, List, Sequence, Tuple
 
+import matplotlib as mpl
 import matplotlib.pyplot as plt
+from matplotlib.artist import Artist
+from matplotlib.collections import Collection
+from matplotlib.lines import Line2D
+from matplotlib.transforms import Bbox
+from PIL import Image, PngImagePlugin
+
+from visulite.services.render_cache import RenderCache, render_key
 
 logger = logging.getLogger("visulite.export_manager")
 
+# Formats drawn to raw pixels first, so encoding can run on the I/O pool.
+RASTER_FORMATS = {"png", "jpg"}
+VECTOR_FORMATS = {"svg", "pdf"}
+
+
+@dataclass(frozen=True)
+class VectorOptions:
+    """Keep SVG/PDF exports of dense charts small enough to open.
+
+    Lines and collections (scatter markers, hexbins, ...) with more than
+    ``rasterize_above`` points are embedded as images at the export DPI,
+    while axes, ticks and text stay vectors. Lines that stay vectors are
+    simplified: vertices closer than ``simplify_tolerance`` pixels (at most
+    1; Matplotlib's own default is 1/9) to the drawn path are dropped.
+    ``None`` turns either step off. Raster formats are not affected.
+    """
+
+    rasterize_above: int | None = 50_000
+    simplify_tolerance: float | None = 0.5
+
+    def __post_init__(self) -> None:
+        if self.simplify_tolerance is not None and not 0 < self.simplify_tolerance <= 1:
+            raise ValueError("simplify_tolerance must be in (0, 1] pixels")
+
+    @contextmanager
+    def applied(self, figure: plt.Figure) -> Iterator[None]:
+        """Apply these options to ``figure`` while it is saved."""
+        rasterized: List[Artist] = []
+        simplified: List[Line2D] = []
+        for axes in figure.axes:
+            for artist in (*axes.lines, *axes.collections):
+                dense = (
+                    self.rasterize_above is not None
+                    and _point_count(artist) > self.rasterize_above
+                )
+                if dense and not artist.get_rasterized():
+                    artist.set_rasterized(True)
+                    rasterized.append(artist)
+                elif not dense and isinstance(artist, Line2D):
+                    simplified.append(artist)
+        settings = {}
+        if self.simplify_tolerance is not None:
+            settings = {"path.simplify": True, "path.simplify_threshold": self.simplify_tolerance}
+        try:
+            # Paths read the simplification settings when they are built: some
+            # lines build theirs while drawing, the others are rebuilt here.
+            with mpl.rc_context(settings):
+                if settings:
+                    for line in simplified:
+                        line.recache(always=True)
+                yield
+        finally:
+            for artist in rasterized:
+                artist.set_rasterized(False)
+            if settings:
+                for line in simplified:
+                    line.recache(always=True)
+
+
+def _point_count(artist: Artist) -> int:
+    if isinstance(artist, Line2D):
+        return len(artist.get_xydata())
+    if isinstance(artist, Collection):
+        return max(
+            len(artist.get_offsets()), sum(len(path.vertices) for path in artist.get_paths())
+        )
+    return 0
+
+
+@dataclass(frozen=True)
+class ExportTarget:
+    """One output of :meth:`ExportManager.export_many`.
+
+    ``size`` is in inches (``None`` keeps the figure's size) and ``label``
+    is appended to the file stem, e.g. ``"_slides"``. ``vector`` only
+    applies to SVG and PDF.
+    """
+
+    fmt: str
+    dpi: int = 300
+    size: Tuple[float, float] | None = None
+    label: str = ""
+    vector: VectorOptions | None = None
+
+    def path_for(self, base_path: Path) -> Path:
+        return base_path.with_name(f"{base_path.stem}{self.label}.{self.fmt}")
+
+    def cache_key(self, cache_key: str) -> str:
+        parts: list = [self.dpi, self.fmt]
+        if self.size is not None:
+            parts.append(list(self.size))
+        if self.vector is not None and self.fmt in VECTOR_FORMATS:
+            parts.append(asdict(self.vector))
+        return render_key(cache_key, *parts)
+
+    def options(self, figure: plt.Figure) -> ContextManager:
+        """Context in which ``figure`` is saved for this target."""
+        if self.vector is not None and self.fmt in VECTOR_FORMATS:
+            return self.vector.applied(figure)
+        return nullcontext()
+
 
 class ExportManager:
-    """Persist matplotlib figures to disk with sensible defaults."""
+    """Persist matplotlib figures to disk with sensible defaults.
+
+    With a :class:`RenderCache`, exports given a ``cache_key`` (describing
+    the data, chart configuration and figure size) are stored in the cache
+    and repeated exports are copied from it instead of rendered again.
+    """
 
     SUPPORTED_FORMATS = {"png", "jpg", "svg", "pdf"}
 
+    def __init__(self, cache: RenderCache | None = None, io_workers: int = 2) -> None:
+        self.cache = cache
+        # Encoding and writing files overlaps with drawing the next target.
+        self._io = ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="visulite-export")
+
     def export(
-        self, figure: plt.Figure, target_path: Path, dpi: int = 300, fmt: str | None = None
+        self,
+        figure: plt.Figure,
+        target_path: Path,
+        dpi: int = 300,
+        fmt: str | None = None,
+        cache_key: str | None = None,
+        vector: VectorOptions | None = None,
     ) -> Path:
-        fmt = fmt or target_path.suffix.lstrip(".").lower()
-        if fmt not in self.SUPPORTED_FORMATS:
-            raise ValueError(f"Unsupported export format: {fmt}")
+        target = ExportTarget(self._format(target_path, fmt), dpi, vector=vector)
+        if self.restore(target_path, cache_key, dpi=dpi, fmt=target.fmt, vector=vector):
+            return target_path
 
         logger.info("Exporting chart to %s", target_path)
         target_path.parent.mkdir(parents=True, exist_ok=True)
-        figure.savefig(target_path, dpi=dpi, format=fmt, bbox_inches="tight")
+        if self.cache is None or cache_key is None:
+            with target.options(figure):
+                figure.savefig(target_path, dpi=dpi, format=target.fmt, bbox_inches="tight")
+            return target_path
+        buffer = io.BytesIO()
+        with target.options(figure):
+            figure.savefig(buffer, dpi=dpi, format=target.fmt, bbox_inches="tight")
+        data = buffer.getvalue()
+        target_path.write_bytes(data)
+        self.cache.put(target.cache_key(cache_key), data)
         return target_path
 
+    def restore(
+        self,
+        target_path: Path,
+        cache_key: str | None,
+        dpi: int = 300,
+        fmt: str | None = None,
+        vector: VectorOptions | None = None,
+    ) -> bool:
+        """Write a cached export of ``cache_key`` to ``target_path``; False on a miss."""
+        if self.cache is None or cache_key is None:
+            return False
+        target = ExportTarget(self._format(target_path, fmt), dpi, vector=vector)
+        return self._write_cached(target_path, self.cache.get(target.cache_key(cache_key)))
+
+    @staticmethod
+    def _write_cached(target_path: Path, data: bytes | None) -> bool:
+        if data is None:
+            return False
+        logger.info("Exporting cached chart to %s", target_path)
+        target_path.parent.mkdir(parents=True, exist_ok=True)
+        target_path.write_bytes(data)
+        return True
+
+    def export_many(
+        self,
+        figure: plt.Figure,
+        base_path: Path,
+        targets: Sequence[ExportTarget],
+        cache_key: str | None = None,
+    ) -> List[Path]:
+        """Write ``figure`` once per target, next to ``base_path``.
+
+        The figure is laid out and its tight bounding box measured once per
+        distinct size; every format at that size is then drawn with the
+        layout frozen. PNG/JPG are drawn to raw pixels and encoded on the
+        I/O pool while the next target draws; PDF/SVG bytes are written
+        there too. Targets found in the render cache are copied from it.
+        """
+        paths = [target.path_for(base_path) for target in targets]
+        if len(set(paths)) != len(paths):
+            raise ValueError("Export targets must write to distinct files")
+        for target, path in zip(targets, paths):
+            self._format(path, target.fmt)
+        cache = self.cache if cache_key is not None else None
+        todo = [
+            (target, path)
+            for target, path in zip(targets, paths)
+            if cache is None or not self._write_cached(path, cache.get(target.cache_key(cache_key)))
+        ]
+        if not todo:
+            return paths
+
+        by_size: Dict[Tuple[float, float] | None, List[Tuple[ExportTarget, Path]]] = {}
+        for target, path in todo:
+            by_size.setdefault(target.size, []).append((target, path))
+        original_size = tuple(figure.get_size_inches())
+        engine = figure.get_layout_engine()
+        writes: List[Future] = []
+        try:
+            for size, group in by_size.items():
+                figure.set_size_inches(size or original_size, forward=False)
+                bbox = self._tight_bbox(figure)
+                if engine is not None:
+                    figure.set_layout_engine("none")
+                for target, path in group:
+                    logger.info("Exporting chart to %s", path)
+                    key = target.cache_key(cache_key) if cache_key is not None else None
+                    writes.append(self._render(figure, target, path, bbox, key))
+                if engine is not None:
+                    figure.set_layout_engine(engine)
+        finally:
+            figure.set_size_inches(original_size, forward=False)
+            if engine is not None and figure.get_layout_engine() is not engine:
+                figure.set_layout_engine(engine)
+            for write in writes:
+                write.result()  # wait for every write; re-raises the first failure
+        return paths
+
+    def restore_many(
+        self, base_path: Path, targets: Sequence[ExportTarget], cache_key: str | None
+    ) -> bool:
+        """Write every target from the cache; False if any of them is missing."""
+        if self.cache is None or cache_key is None:
+            return False
+        entries = [self.cache.get(target.cache_key(cache_key)) for target in targets]
+        if any(data is None for data in entries):
+            return False
+        for target, data in zip(targets, entries):
+            self._write_cached(target.path_for(base_path), data)
+        return True
+
+    @staticmethod
+    def _tight_bbox(figure: plt.Figure) -> Bbox:
+        # The same box savefig(bbox_inches="tight") measures, computed once.
+        figure.draw_without_rendering()
+        return figure.get_tightbbox().padded(mpl.rcParams["savefig.pad_inches"])
+
+    def _render(
+        self, figure: plt.Figure, target: ExportTarget, path: Path, bbox: Bbox, key: str | None
+    ) -> Future:
+        buffer = io.BytesIO()
+        if target.fmt in RASTER_FORMATS:
+            figure.savefig(buffer, format="rgba", dpi=target.dpi, bbox_inches=bbox)
+            # The Agg canvas sizes itself exactly like this: truncated, but
+            # tolerant of floating-point error just below a whole pixel.
+            shape = (int(bbox.height * target.dpi + 1e-8), int(bbox.width * target.dpi + 1e-8))
+            if len(buffer.getbuffer()) == shape[0] * shape[1] * 4:
+                return self._io.submit(
+                    self._encode_and_write, buffer.getvalue(), shape, target, path, key
+                )
+            buffer = io.BytesIO()
+        with target.options(figure):
+            figure.savefig(buffer, format=target.fmt, dpi=target.dpi, bbox_inches=bbox)
+        return self._io.submit(self._write, path, buffer.getvalue(), key)
+
+    def _encode_and_write(
+        self,
+        rgba: bytes,
+        shape: Tuple[int, int],
+        target: ExportTarget,
+        path: Path,
+        key: str | None,
+    ) -> None:
+        height, width = shape
+        image = Image.frombuffer("RGBA", (width, height), rgba, "raw", "RGBA", 0, 1)
+        stream = io.BytesIO()
+        if target.fmt == "jpg":
+            # Like Matplotlib's JPEG export: blend onto white, JPEG has no alpha.
+            background = Image.new("RGB", image.size, (255, 255, 255))
+            background.paste(image, image)
+            background.save(stream, format="jpeg", dpi=(target.dpi, target.dpi))
+        else:
+            info = PngImagePlugin.PngInfo()
+            info.add_text(
+                "Software", f"Matplotlib version{mpl.__version__}, https://matplotlib.org/"
+            )
+            image.save(stream, format="png", dpi=(target.dpi, target.dpi), pnginfo=info)
+        self._write(path, stream.getvalue(), key)
+
+    def _write(self, path: Path, data: bytes, key: str | None) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        if self.cache is not None and key is not None:
+            self.cache.put(key, data)
+
+    def _format(self, target_path: Path, fmt: str | None) -> str:
+        fmt = fmt or target_path.suffix.lstrip(".").lower()
+        if fmt not in self.SUPPORTED_FORMATS:
+            raise ValueError(f"Unsupported export format: {fmt}")
+        return fmt
+
 
-__all__ = ["ExportManager"]
+__all__ = ["ExportManager", "ExportTarget", "VectorOptions"]
@@ -0,0 +1,291 @@
+"""Level-of-detail min/max/mean pyramids for very long line series."""
+
+from __future__ import annotations
+
+import io
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from visulite.services.column_index import ColumnVersion
+from visulite.services.render_cache import RenderCache, column_digest, render_key
+
+logger = logging.getLogger("visulite.lod")
+
+# Rows per bucket on the finest level; each coarser level merges LEVEL_FACTOR buckets.
+BASE_BUCKET = 64
+LEVEL_FACTOR = 4
+# Levels stop once they are this small.
+MIN_BUCKETS = 256
+# Series shorter than this are downsampled directly; a pyramid is not worth it.
+LOD_MIN_ROWS = 2_000_000
+# Rows reduced per step while building the finest level (bounds temporaries).
+CHUNK_ROWS = BASE_BUCKET * 65_536
+
+_LEVEL_ARRAYS = ("lows", "highs", "low_rows", "high_rows", "sums", "counts")
+
+
+@dataclass(frozen=True)
+class LodLevel:
+    """Per-bucket statistics of one level; buckets cover ``size`` consecutive rows."""
+
+    size: int
+    lows: np.ndarray
+    highs: np.ndarray
+    low_rows: np.ndarray  # row of each bucket minimum
+    high_rows: np.ndarray  # row of each bucket maximum
+    sums: np.ndarray
+    counts: np.ndarray
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in _LEVEL_ARRAYS)
+
+
+class LodPyramid:
+    """Min/max/mean pyramid of one Y column by row position.
+
+    Queries pick the finest level with at most ``budget / 2`` buckets in
+    the requested rows, so their cost depends only on the budget, never on
+    the length of the series.
+    """
+
+    def __init__(self, length: int, levels: List[LodLevel]) -> None:
+        self.length = length
+        self.levels = levels
+
+    @property
+    def nbytes(self) -> int:
+        return sum(level.nbytes for level in self.levels)
+
+    @classmethod
+    def build(cls, values: np.ndarray, cancelled=lambda: False) -> "LodPyramid | None":
+        """Build the pyramid of float ``values``; ``None`` if ``cancelled()`` turns true."""
+        length = len(values)
+        parts: List[Tuple[np.ndarray, ...]] = []
+        for start in range(0, length, CHUNK_ROWS):
+            if cancelled():
+                return None
+            parts.append(_reduce_rows(values[start:start + CHUNK_ROWS], start))
+        levels = [LodLevel(BASE_BUCKET, *(np.concatenate(column) for column in zip(*parts)))]
+        while len(levels[-1].lows) > MIN_BUCKETS:
+            levels.append(_merge(levels[-1]))
+        return cls(length, levels)
+
+    def query(
+        self, start: int, stop: int, budget: int, method: str = "minmax"
+    ) -> Tuple[np.ndarray, np.ndarray] | None:
+        """Rows and Y values to draw rows ``[start, stop)`` with about ``budget`` points.
+
+        ``"minmax"`` yields each bucket's minimum and maximum in row order,
+        anything else the bucket means at the bucket centres. Returns
+        ``None`` when even the finest level is too coarse for ``budget``;
+        there are then few enough rows for the caller to reduce directly.
+        """
+        span = stop - start
+        if span / self.levels[0].size < budget / (2 * LEVEL_FACTOR):
+            return None
+        # The finest level with at most budget / 2 buckets has more than
+        # budget / (2 * LEVEL_FACTOR) of them, so the detail stays close to the budget.
+        level = next(
+            (level for level in self.levels if span / level.size <= budget / 2), self.levels[-1]
+        )
+        first = start // level.size
+        last = min(len(level.lows), -(-stop // level.size))
+        if method == "minmax":
+            rows = np.column_stack([level.low_rows[first:last], level.high_rows[first:last]])
+            values = np.column_stack([level.lows[first:last], level.highs[first:last]])
+            # Keep each pair in row order so the line does not double back.
+            swap = rows[:, 0] > rows[:, 1]
+            rows[swap] = rows[swap][:, ::-1]
+            values[swap] = values[swap][:, ::-1]
+            return rows.ravel(), values.ravel()
+        counts = level.counts[first:last]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = level.sums[first:last] / counts
+        centres = np.minimum(
+            np.arange(first, last) * level.size + level.size // 2, self.length - 1
+        )
+        return centres, means
+
+    def to_bytes(self) -> bytes:
+        arrays: Dict[str, np.ndarray] = {"length": np.array([self.length])}
+        for index, level in enumerate(self.levels):
+            arrays[f"size{index}"] = np.array([level.size])
+            for name in _LEVEL_ARRAYS:
+                arrays[f"{name}{index}"] = getattr(level, name)
+        buffer = io.BytesIO()
+        np.savez(buffer, **arrays)
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "LodPyramid":
+        with np.load(io.BytesIO(data)) as arrays:
+            levels = []
+            index = 0
+            while f"size{index}" in arrays:
+                levels.append(
+                    LodLevel(
+                        int(arrays[f"size{index}"][0]),
+                        *(arrays[f"{name}{index}"] for name in _LEVEL_ARRAYS),
+                    )
+                )
+                index += 1
+            return cls(int(arrays["length"][0]), levels)
+
+
+def _reduce_rows(values: np.ndarray, offset: int) -> Tuple[np.ndarray, ...]:
+    """Finest-level statistics of ``values`` starting at row ``offset``."""
+    full = len(values) // BASE_BUCKET * BASE_BUCKET
+    blocks = [values[:full].reshape(-1, BASE_BUCKET)]
+    if full < len(values):
+        tail = np.full((1, BASE_BUCKET), np.nan)
+        tail[0, : len(values) - full] = values[full:]
+        blocks.append(tail)
+    results = []
+    for block_offset, block in zip((offset, offset + full), blocks):
+        missing = np.isnan(block)
+        low_source = np.where(missing, np.inf, block)
+        high_source = np.where(missing, -np.inf, block)
+        low_at = low_source.argmin(axis=1)
+        high_at = high_source.argmax(axis=1)
+        buckets = np.arange(len(block))
+        lows = low_source[buckets, low_at]
+        highs = high_source[buckets, high_at]
+        counts = (~missing).sum(axis=1).astype(np.int32)
+        empty = counts == 0
+        lows[empty] = np.nan
+        highs[empty] = np.nan
+        first_row = block_offset + buckets * BASE_BUCKET
+        results.append(
+            (
+                lows,
+                highs,
+                first_row + low_at,
+                first_row + high_at,
+                np.where(missing, 0.0, block).sum(axis=1),
+                counts,
+            )
+        )
+    return tuple(np.concatenate(column) for column in zip(*results))
+
+
+def _merge(level: LodLevel) -> LodLevel:
+    """Combine every LEVEL_FACTOR buckets of ``level`` into one."""
+    count = -(-len(level.lows) // LEVEL_FACTOR)
+    padding = count * LEVEL_FACTOR - len(level.lows)
+
+    def grouped(array: np.ndarray, fill) -> np.ndarray:
+        if padding:
+            array = np.concatenate([array, np.full(padding, fill, dtype=array.dtype)])
+        return array.reshape(count, LEVEL_FACTOR)
+
+    lows = grouped(np.where(np.isnan(level.lows), np.inf, level.lows), np.inf)
+    highs = grouped(np.where(np.isnan(level.highs), -np.inf, level.highs), -np.inf)
+    low_at = lows.argmin(axis=1)
+    high_at = highs.argmax(axis=1)
+    buckets = np.arange(count)
+    merged_lows = lows[buckets, low_at]
+    merged_highs = highs[buckets, high_at]
+    merged_lows[np.isinf(merged_lows)] = np.nan
+    merged_highs[np.isinf(merged_highs)] = np.nan
+    return LodLevel(
+        level.size * LEVEL_FACTOR,
+        merged_lows,
+        merged_highs,
+        grouped(level.low_rows, 0)[buckets, low_at],
+        grouped(level.high_rows, 0)[buckets, high_at],
+        grouped(level.sums, 0.0).sum(axis=1),
+        grouped(level.counts, 0).sum(axis=1).astype(np.int32),
+    )
+
+
+class LodCache:
+    """Pyramids per Y column, built once on a background thread.
+
+    :meth:`get` never blocks: it returns ``None`` and starts a build the
+    first time a column is asked for. With a ``store``, finished pyramids
+    are persisted under the column's content hash and loaded from there
+    next time, even in a later session.
+    """
+
+    def __init__(self, store: RenderCache | None = None, max_entries: int = 8) -> None:
+        self.store = store
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: Dict[tuple, Tuple[ColumnVersion, LodPyramid]] = {}
+        self._building: set = set()
+        self._closed = False
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="visulite-lod")
+
+    def get(self, version: ColumnVersion, values: np.ndarray) -> LodPyramid | None:
+        """Pyramid of ``values`` (the column described by ``version``) if it is ready."""
+        if len(values) < LOD_MIN_ROWS or not version.trackable:
+            return None
+        key = (version.name, version.token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0].same_as(version):
+                return entry[1]
+            if key in self._building or self._closed:
+                return None
+            self._building.add(key)
+        self._executor.submit(self._build, key, version, values)
+        return None
+
+    def clear(self) -> None:
+        """Forget built pyramids, in memory and in the store."""
+        with self._lock:
+            self._entries.clear()
+        if self.store is not None:
+            self.store.clear()
+
+    def shutdown(self) -> None:
+        """Abandon running builds and stop the worker."""
+        self._closed = True
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _build(self, key: tuple, version: ColumnVersion, values: np.ndarray) -> None:
+        try:
+            pyramid = None
+            store_key = None
+            if self.store is not None:
+                digest = column_digest(pd.Series(values, copy=False))
+                store_key = render_key("lod", BASE_BUCKET, LEVEL_FACTOR, digest)
+                data = self.store.get(store_key)
+                if data is not None:
+                    pyramid = LodPyramid.from_bytes(data)
+            if pyramid is None:
+                pyramid = LodPyramid.build(values, cancelled=lambda: self._closed)
+                if pyramid is None:
+                    return
+                logger.info(
+                    "Built %d-level pyramid for %s (%.1f MB)",
+                    len(pyramid.levels), version.name, pyramid.nbytes / 1e6,
+                )
+                if store_key is not None:
+                    self.store.put(store_key, pyramid.to_bytes())
+            with self._lock:
+                self._entries[key] = (version, pyramid)
+                while len(self._entries) > self.max_entries:
+                    self._entries.pop(next(iter(self._entries)))
+        except Exception:  # pragma: no cover - the plain path keeps working
+            logger.exception("Building level-of-detail pyramid for %s failed", version.name)
+        finally:
+            with self._lock:
+                self._building.discard(key)
+
+
+__all__ = [
+    "BASE_BUCKET",
+    "LEVEL_FACTOR",
+    "LOD_MIN_ROWS",
+    "LodCache",
+    "LodLevel",
+    "LodPyramid",
+]
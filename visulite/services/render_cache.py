@@ -0,0 +1,289 @@
+"""Memoized chart renders keyed by data fingerprint, configuration and output size."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import struct
+import tempfile
+import threading
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Iterable, Sequence
+
+import numpy as np
+import pandas as pd
+from matplotlib.colors import to_hex
+from matplotlib.figure import Figure
+
+from visulite.services.column_index import ColumnVersion, VersionedCache
+
+logger = logging.getLogger("visulite.render_cache")
+
+_RASTER_HEADER = struct.Struct(">II")
+
+
+def column_digest(series: pd.Series) -> str:
+    """Content hash of one column's values (the index is ignored)."""
+    digest = hashlib.blake2b(digest_size=16)
+    dtype = series.dtype
+    digest.update(str(dtype).encode())
+    if isinstance(dtype, np.dtype) and dtype.kind in "biufcmM":
+        digest.update(np.ascontiguousarray(series.to_numpy()).view(np.uint8))
+    else:
+        # Objects, strings, categoricals and nullable types hash by value.
+        digest.update(pd.util.hash_pandas_object(series, index=False).to_numpy().view(np.uint8))
+    return digest.hexdigest()
+
+
+def render_key(*parts: Any) -> str:
+    """Stable hash of JSON-serializable key ``parts``."""
+    payload = json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.blake2b(payload.encode(), digest_size=20).hexdigest()
+
+
+def figure_view(figure: Figure) -> list:
+    """View limits of every axes; a zoomed figure renders differently."""
+    return [[*axes.get_xlim(), *axes.get_ylim()] for axes in figure.axes]
+
+
+def figure_edits(figure: Figure) -> list:
+    """What the toolbar's figure options and subplot tool can change in ``figure``.
+
+    Margins, titles, labels, scales, the legend and the style of every line
+    and color-mapped artist; figures plotted alike that agree here and in
+    :func:`figure_view` draw the same image.
+    """
+    params = figure.subplotpars
+    edits: list = [
+        [params.left, params.right, params.bottom, params.top, params.wspace, params.hspace]
+    ]
+    for axes in figure.axes:
+        legend = axes.get_legend()
+        mappables = [
+            *axes.get_images(),
+            *(collection for collection in axes.collections if collection.get_array() is not None),
+        ]
+        edits.append(
+            [
+                axes.get_title(),
+                axes.get_xlabel(),
+                axes.get_ylabel(),
+                axes.get_xscale(),
+                axes.get_yscale(),
+                [text.get_text() for text in legend.get_texts()] if legend else None,
+                [
+                    [
+                        line.get_label(),
+                        str(line.get_linestyle()),
+                        line.get_drawstyle(),
+                        line.get_linewidth(),
+                        to_hex(line.get_color(), keep_alpha=True),
+                        str(line.get_marker()),
+                        line.get_markersize(),
+                        to_hex(line.get_markerfacecolor(), keep_alpha=True),
+                        to_hex(line.get_markeredgecolor(), keep_alpha=True),
+                    ]
+                    for line in axes.get_lines()
+                ],
+                [
+                    [
+                        mappable.get_label(),
+                        mappable.get_cmap().name,
+                        list(mappable.get_clim()),
+                        getattr(mappable, "get_interpolation", lambda: None)(),
+                    ]
+                    for mappable in mappables
+                ],
+            ]
+        )
+    return edits
+
+
+def encode_raster(rgba: np.ndarray) -> bytes:
+    height, width = rgba.shape[:2]
+    return _RASTER_HEADER.pack(height, width) + zlib.compress(
+        np.ascontiguousarray(rgba, dtype=np.uint8).tobytes(), 1
+    )
+
+
+def decode_raster(data: bytes) -> np.ndarray:
+    height, width = _RASTER_HEADER.unpack_from(data)
+    pixels = zlib.decompress(data[_RASTER_HEADER.size:])
+    return np.frombuffer(pixels, dtype=np.uint8).reshape(height, width, 4)
+
+
+class DataFingerprinter:
+    """Content fingerprints of data frames, hashed incrementally per column.
+
+    Column digests are cached by :class:`ColumnVersion`. Processing steps
+    replace only the columns they change, so after a step only those are
+    hashed again.
+    """
+
+    def __init__(self, max_entries: int = 256) -> None:
+        self._digests = VersionedCache(max_entries)
+
+    def column_digest(self, series: pd.Series) -> str:
+        version = ColumnVersion(series)
+        return self._digests.get(
+            (version.name, version.token), [version], lambda: column_digest(series)
+        )
+
+    def fingerprint(
+        self,
+        frame: pd.DataFrame,
+        columns: Iterable[str] | None = None,
+        history: Sequence[Any] = (),
+    ) -> str:
+        """Fingerprint of ``columns`` of ``frame`` (all by default) plus ``history``."""
+        names = list(frame.columns) if columns is None else list(dict.fromkeys(columns))
+        digests = [[str(name), self.column_digest(frame[name])] for name in names]
+        return render_key(len(frame.index), digests, list(history))
+
+
+class RenderCache:
+    """Bounded two-level cache of rendered bytes: an in-memory LRU over a directory.
+
+    Entries are immutable and addressed by :func:`render_key` strings. The
+    memory level holds the most recently used entries up to
+    ``memory_bytes``; every entry is also written to ``directory`` (when
+    given), which is trimmed to ``disk_bytes`` by dropping the least
+    recently used files. Disk errors only disable the disk level. The cache
+    is used from the render thread, so it is locked.
+    """
+
+    def __init__(
+        self,
+        directory: Path | None = None,
+        memory_bytes: int = 128 * 1024 * 1024,
+        disk_bytes: int = 512 * 1024 * 1024,
+    ) -> None:
+        self.directory = directory
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_size = 0
+        self._disk_size: int | None = None
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                return data
+        path = self._path(key)
+        if path is None:
+            return None
+        try:
+            data = path.read_bytes()
+            os.utime(path)  # mark as recently used for trimming
+        except OSError:
+            return None
+        with self._lock:
+            self._remember(key, data)
+        logger.debug("Render cache disk hit %s", key)
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        with self._lock:
+            self._remember(key, data)
+        path = self._path(key)
+        if path is None:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write and rename, so readers never see half a file.
+            handle, temporary = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(handle, "wb") as stream:
+                stream.write(data)
+            os.replace(temporary, path)
+        except OSError:
+            logger.warning("Could not write render cache entry %s", path, exc_info=True)
+            return
+        with self._lock:
+            if self._disk_size is not None:
+                self._disk_size += len(data)
+        self._trim_disk()
+
+    def set_directory(self, directory: Path | None) -> None:
+        """Keep the disk level in ``directory`` from now on; ``None`` turns it off."""
+        with self._lock:
+            self.directory = directory
+            self._disk_size = None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._memory_size = 0
+            self._disk_size = None
+        for path, _size, _mtime in self._disk_entries():
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    def _remember(self, key: str, data: bytes) -> None:
+        if len(data) > self.memory_bytes:
+            return
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_size -= len(previous)
+        self._memory[key] = data
+        self._memory_size += len(data)
+        while self._memory_size > self.memory_bytes:
+            _, dropped = self._memory.popitem(last=False)
+            self._memory_size -= len(dropped)
+
+    def _path(self, key: str) -> Path | None:
+        if self.directory is None:
+            return None
+        return self.directory / key[:2] / f"{key}.bin"
+
+    def _disk_entries(self) -> list[tuple[Path, int, float]]:
+        if self.directory is None or not self.directory.exists():
+            return []
+        entries = []
+        for path in self.directory.glob("*/*.bin"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def _trim_disk(self) -> None:
+        with self._lock:
+            size = self._disk_size
+        if size is not None and size <= self.disk_bytes:
+            return
+        entries = self._disk_entries()
+        size = sum(entry[1] for entry in entries)
+        if size > self.disk_bytes:
+            for path, entry_size, _mtime in sorted(entries, key=lambda entry: entry[2]):
+                try:
+                    path.unlink()
+                except OSError:
+                    continue
+                size -= entry_size
+                if size <= self.disk_bytes * 0.8:
+                    break
+            logger.info("Trimmed render cache to %.1f MB", size / 1e6)
+        with self._lock:
+            self._disk_size = size
+
+
+__all__ = [
+    "DataFingerprinter",
+    "RenderCache",
+    "column_digest",
+    "decode_raster",
+    "encode_raster",
+    "figure_edits",
+    "figure_view",
+    "render_key",
+]
@@ -0,0 +1,131 @@
+"""Chart themes resolved once into rc dictionaries and applied per render."""
+
+from __future__ import annotations
+
+import logging
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Dict, Iterator, Mapping
+
+import matplotlib as mpl
+import matplotlib.style
+from matplotlib import font_manager
+from matplotlib.figure import Figure
+
+logger = logging.getLogger("visulite.themes")
+
+# Settings that describe the session rather than the look of a chart; style
+# sheets never touch them (same list matplotlib's style.use skips).
+_SESSION_KEYS = frozenset({
+    "backend", "backend_fallback", "date.epoch", "docstring.hardcopy",
+    "figure.max_open_warning", "figure.raise_window", "interactive",
+    "savefig.directory", "timezone", "tk.window_focus", "toolbar",
+    "webagg.address", "webagg.open_in_browser", "webagg.port", "webagg.port_retries",
+})
+
+# Fonts with Chinese glyphs on Windows, macOS and Linux, for the labels the
+# application draws itself (e.g. the "其他" bar) and Chinese column names.
+_CJK_FONTS = (
+    "Microsoft YaHei", "SimHei", "PingFang SC", "Hiragino Sans GB", "Noto Sans CJK SC",
+    "Source Han Sans SC", "WenQuanYi Micro Hei", "WenQuanYi Zen Hei", "Droid Sans Fallback",
+    "Arial Unicode MS",
+)
+
+# rcParams are process-global, so renders in different threads take turns.
+_rc_lock = threading.RLock()
+
+
+@lru_cache(maxsize=1)
+def cjk_fonts() -> tuple[str, ...]:
+    """The installed fonts of :data:`_CJK_FONTS`."""
+    installed = {font.name for font in font_manager.fontManager.ttflist}
+    return tuple(name for name in _CJK_FONTS if name in installed)
+
+
+@lru_cache(maxsize=None)
+def theme_rc(theme: str) -> Mapping[str, Any]:
+    """Complete, read-only rc settings for ``theme`` on top of matplotlib's defaults.
+
+    Unknown themes fall back to the defaults with a warning. Installed CJK
+    fonts are appended to the font family as fallbacks, so the theme's
+    font still draws Latin text and glyphs it lacks come from them.
+    """
+    rc: Dict[str, Any] = {
+        key: value for key, value in mpl.rcParamsDefault.items() if key not in _SESSION_KEYS
+    }
+    if theme and theme != "default":
+        style = matplotlib.style.library.get(theme)
+        if style is None:
+            logger.warning("Theme '%s' not available, using default", theme)
+        else:
+            rc.update((key, value) for key, value in style.items() if key not in _SESSION_KEYS)
+    family = rc["font.family"]
+    family = [family] if isinstance(family, str) else list(family)
+    rc["font.family"] = family + [name for name in cjk_fonts() if name not in family]
+    return MappingProxyType(rc)
+
+
+@contextmanager
+def theme_context(theme: str) -> Iterator[Mapping[str, Any]]:
+    """Apply ``theme`` while creating artists, restoring the previous rc afterwards.
+
+    Artists read rcParams when they are created, so wrapping a render in
+    this context styles that figure only; other figures and threads never
+    see the theme.
+    """
+    rc = theme_rc(theme)
+    with _rc_lock, mpl.rc_context(dict(rc)):
+        yield rc
+
+
+def _resolve(rc: Mapping[str, Any], key: str, fallback: str) -> Any:
+    value = rc[key]
+    return rc[fallback] if value in ("inherit", "auto", "None", None) else value
+
+
+def grid_style(rc: Mapping[str, Any]) -> Dict[str, Any]:
+    """Keyword arguments for ``Axes.grid`` matching the theme's grid lines."""
+    return {
+        "color": rc["grid.color"],
+        "linestyle": rc["grid.linestyle"],
+        "linewidth": rc["grid.linewidth"],
+        "alpha": rc["grid.alpha"],
+    }
+
+
+def apply_theme(figure: Figure, rc: Mapping[str, Any]) -> None:
+    """Restyle an existing figure's background, axes, ticks and text in place.
+
+    Data artists are left alone, so switching themes does not re-plot.
+    """
+    figure.set_facecolor(rc["figure.facecolor"])
+    figure.set_edgecolor(rc["figure.edgecolor"])
+    for axes in figure.axes:
+        axes.set_facecolor(rc["axes.facecolor"])
+        for side, spine in axes.spines.items():
+            spine.set_edgecolor(rc["axes.edgecolor"])
+            spine.set_linewidth(rc["axes.linewidth"])
+            spine.set_visible(rc.get(f"axes.spines.{side}", True))
+        for axis in ("x", "y"):
+            axes.tick_params(
+                axis=axis,
+                which="major",
+                color=rc[f"{axis}tick.color"],
+                labelcolor=_resolve(rc, f"{axis}tick.labelcolor", f"{axis}tick.color"),
+                labelsize=rc[f"{axis}tick.labelsize"],
+                direction=rc[f"{axis}tick.direction"],
+                length=rc[f"{axis}tick.major.size"],
+                width=rc[f"{axis}tick.major.width"],
+            )
+        axes.title.set_color(_resolve(rc, "axes.titlecolor", "text.color"))
+        axes.title.set_fontsize(rc["axes.titlesize"])
+        axes.title.set_fontweight(rc["axes.titleweight"])
+        for label in (axes.xaxis.label, axes.yaxis.label):
+            label.set_color(rc["axes.labelcolor"])
+            label.set_fontsize(rc["axes.labelsize"])
+            label.set_fontweight(rc["axes.labelweight"])
+
+
+__all__ = ["apply_theme", "cjk_fonts", "grid_style", "theme_context", "theme_rc"]
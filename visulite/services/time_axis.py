@@ -0,0 +1,199 @@
+"""Tick location and labels for datetime axes plotted as epoch nanoseconds.
+
+Datetime X columns are drawn as float64 nanoseconds since the epoch (the
+values :func:`~visulite.services.column_index.numeric_values` produces), so
+Matplotlib never converts them point by point through its date units. The
+locator and formatter here put calendar-aligned ticks on such an axis and
+only ever format the handful of visible tick values.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from matplotlib.axis import Axis
+from matplotlib.ticker import Formatter, Locator
+
+logger = logging.getLogger("visulite.time_axis")
+
+_NS = {
+    "us": 1_000,
+    "ms": 1_000_000,
+    "s": 1_000_000_000,
+    "m": 60 * 1_000_000_000,
+    "h": 3600 * 1_000_000_000,
+    "D": 86_400 * 1_000_000_000,
+}
+# (unit, count) tick steps from finest to coarsest; months and years are
+# calendar steps, the rest fixed lengths.
+_STEPS: List[Tuple[str, int]] = [
+    *(("us", n) for n in (1, 2, 5, 10, 20, 50, 100, 200, 500)),
+    *(("ms", n) for n in (1, 2, 5, 10, 20, 50, 100, 200, 500)),
+    *(("s", n) for n in (1, 2, 5, 10, 15, 30)),
+    *(("m", n) for n in (1, 2, 5, 10, 15, 30)),
+    *(("h", n) for n in (1, 2, 3, 6, 12)),
+    *(("D", n) for n in (1, 2, 7, 14)),
+    *(("M", n) for n in (1, 2, 3, 6)),
+    *(("Y", n) for n in (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)),
+]
+_APPROX_NS = {"M": 30 * _NS["D"], "Y": 365 * _NS["D"], **_NS}
+# 1970-01-01 was a Thursday; weekly ticks start on Mondays.
+_WEEK_ORIGIN = 4 * _NS["D"]
+_FULL_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def is_datetime(series: pd.Series) -> bool:
+    return pd.api.types.is_datetime64_any_dtype(series.dtype)
+
+
+def _to_timestamps(values: Sequence[float], tz) -> pd.DatetimeIndex:
+    nanoseconds = np.asarray(values, dtype=np.float64).round().astype(np.int64)
+    if tz is None:
+        return pd.to_datetime(nanoseconds, unit="ns")
+    return pd.to_datetime(nanoseconds, unit="ns", utc=True).tz_convert(tz)
+
+
+def _utc_offset(value: float, tz) -> int:
+    """Nanoseconds ``tz`` is ahead of UTC at ``value`` (0 for naive axes)."""
+    if tz is None:
+        return 0
+    offset = _to_timestamps([value], tz)[0].utcoffset()
+    return int(offset.total_seconds() * 1e9) if offset is not None else 0
+
+
+def _from_wall_clock(local: np.ndarray, tz) -> np.ndarray:
+    """Epoch nanoseconds of the wall-clock times ``local`` (nanoseconds) in ``tz``.
+
+    Times a DST change skips move forward to the first valid time; repeated
+    ones take their first (summer time) occurrence.
+    """
+    stamps = pd.DatetimeIndex(local.astype("datetime64[ns]")).tz_localize(
+        tz, ambiguous=np.ones(len(local), dtype=bool), nonexistent="shift_forward"
+    )
+    utc = stamps.tz_convert("UTC").tz_localize(None).as_unit("ns")
+    return np.unique(utc.to_numpy().astype(np.int64))
+
+
+class EpochLocator(Locator):
+    """Calendar-aligned ticks for an axis in epoch nanoseconds.
+
+    Picks the finest step from microseconds to millennia that yields at
+    most ``max_ticks`` ticks; month and year steps follow the calendar.
+    For timezone-aware data the ticks align to local wall-clock time, also
+    across DST changes.
+    """
+
+    def __init__(self, max_ticks: int = 8, tz=None) -> None:
+        self.max_ticks = max_ticks
+        self.tz = tz
+
+    def __call__(self) -> Sequence[float]:
+        vmin, vmax = self.axis.get_view_interval()
+        return self.tick_values(vmin, vmax)
+
+    def tick_values(self, vmin: float, vmax: float) -> Sequence[float]:
+        if not (np.isfinite(vmin) and np.isfinite(vmax)):
+            return []
+        vmin, vmax = sorted((vmin, vmax))
+        span = max(vmax - vmin, 1.0)
+        unit, count = next(
+            (
+                (unit, count)
+                for unit, count in _STEPS
+                if span / (_APPROX_NS[unit] * count) <= self.max_ticks
+            ),
+            _STEPS[-1],
+        )
+        calendar = unit in ("M", "Y")
+        # Steps up to an hour stay evenly spaced in UTC, as DST moves clocks by
+        # whole hours; longer ones are placed on the wall clock tick by tick.
+        wall_clock = self.tz is not None and (calendar or _NS[unit] * count > _NS["h"])
+        offset = _utc_offset(vmin, self.tz)
+        low = int(vmin) + offset
+        high = int(vmax) + (_utc_offset(vmax, self.tz) if wall_clock else offset)
+        if calendar:
+            first = np.datetime64(low, "ns").astype(f"datetime64[{unit}]")
+            last = np.datetime64(high, "ns").astype(f"datetime64[{unit}]")
+            periods = np.arange(first, last + 1)
+            # Align to calendar months and years, not to counts since 1970.
+            numbers = periods.astype(np.int64) + (1970 if unit == "Y" else 0)
+            periods = periods[numbers % count == 0]
+            ticks = periods.astype("datetime64[ns]").astype(np.int64)
+        else:
+            step = _NS[unit] * count
+            origin = _WEEK_ORIGIN if unit == "D" and count >= 7 else 0
+            start = -(-(low - origin) // step) * step + origin
+            ticks = np.arange(start, high + 1, step, dtype=np.int64)
+        ticks = _from_wall_clock(ticks, self.tz) if wall_clock else ticks - offset
+        ticks = ticks[(ticks >= vmin) & (ticks <= vmax)]
+        return self.raise_if_exceeds(ticks.astype(np.float64))
+
+
+class EpochFormatter(Formatter):
+    """Concise labels for ticks in epoch nanoseconds.
+
+    Labels show only the fields that change between ticks; the remaining
+    context (e.g. the date under hourly ticks) goes to the axis offset text.
+    """
+
+    def __init__(self, tz=None) -> None:
+        self.tz = tz
+        self.offset_string = ""
+
+    def __call__(self, x: float, pos=None) -> str:
+        return self.format_data_short(x)
+
+    def format_ticks(self, values: Sequence[float]) -> List[str]:
+        self.offset_string = ""
+        if not len(values):
+            return []
+        stamps = _to_timestamps(values, self.tz)
+        step = np.min(np.diff(values)) if len(values) > 1 else _NS["D"]
+        if step >= 360 * _NS["D"]:
+            return list(stamps.strftime("%Y"))
+        if step >= 28 * _NS["D"]:
+            return list(stamps.strftime("%Y-%m"))
+        offset_format = "%Y-%m-%d"
+        if step >= _NS["D"]:
+            labels = stamps.strftime("%m-%d")
+            offset_format = "%Y"
+        elif step >= _NS["m"]:
+            labels = stamps.strftime("%H:%M")
+            # Label ticks at midnight with the date they start.
+            midnight = stamps == stamps.normalize()
+            labels = np.where(midnight, stamps.strftime("%m-%d"), labels)
+        elif step >= _NS["s"]:
+            labels = stamps.strftime("%H:%M:%S")
+        else:
+            # Float nanoseconds carry rounding noise; round to the tick precision.
+            digits = 6 if step < _NS["ms"] else 3
+            stamps = stamps.round("us" if digits == 6 else "ms")
+            labels = [label[: 9 + digits] for label in stamps.strftime("%H:%M:%S.%f")]
+        self.offset_string = stamps[-1].strftime(offset_format)
+        return list(labels)
+
+    def get_offset(self) -> str:
+        return self.offset_string
+
+    def format_data_short(self, value: float) -> str:
+        if not np.isfinite(value):
+            return ""
+        return _to_timestamps([value], self.tz)[0].strftime(_FULL_FORMAT)
+
+
+def set_datetime_axis(axis: Axis, series: pd.Series) -> None:
+    """Put epoch ticks and labels for datetime ``series`` on ``axis``."""
+    tz = getattr(series.dtype, "tz", None)
+    axis.set_major_locator(EpochLocator(tz=tz))
+    axis.set_major_formatter(EpochFormatter(tz=tz))
+
+
+__all__ = [
+    "EpochFormatter",
+    "EpochLocator",
+    "is_datetime",
+    "set_datetime_axis",
+]
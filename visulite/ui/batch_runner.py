@@ -0,0 +1,84 @@
+"""Background batch plotting with per-file progress and cancellation."""
+
+from __future__ import annotations
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from PySide6.QtCore import QObject, Signal
+
+from visulite.services.batch_plotter import BatchJob, BatchPlotter
+
+logger = logging.getLogger("visulite.batch_runner")
+
+
+class BatchRunner(QObject):
+    """Run one batch at a time on a worker thread.
+
+    ``started`` carries the list of source files, ``result_ready`` each
+    file's :class:`~visulite.services.batch_plotter.BatchResult` in file
+    order and ``finished`` whether the run was cancelled. :meth:`cancel`
+    stops the run between files; with worker processes, files that have
+    not started are dropped and running ones finish first. Signals are
+    delivered on the thread that owns the runner (the UI thread).
+    """
+
+    started = Signal(object)
+    result_ready = Signal(object)
+    finished = Signal(bool)
+    failed = Signal(str)
+
+    def __init__(self, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="visulite-batch")
+        self._cancelled = threading.Event()
+        self._running = False
+        self.finished.connect(self._on_stopped)
+        self.failed.connect(self._on_stopped)
+
+    @property
+    def busy(self) -> bool:
+        return self._running
+
+    def start(
+        self, plotter: BatchPlotter, source_dir: Path, job: BatchJob, workers: int = 1
+    ) -> None:
+        if self._running:
+            raise RuntimeError("A batch run is already in progress")
+        self._running = True
+        self._cancelled.clear()
+        self._executor.submit(self._run, plotter, source_dir, job, workers)
+
+    def cancel(self) -> None:
+        if self._running:
+            logger.info("Cancelling batch run")
+            self._cancelled.set()
+
+    def shutdown(self) -> None:
+        self.cancel()
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def _run(self, plotter: BatchPlotter, source_dir: Path, job: BatchJob, workers: int) -> None:
+        try:
+            self.started.emit(plotter.source_files(source_dir))
+            results = plotter.iter_results(source_dir, job, workers)
+            try:
+                for result in results:
+                    self.result_ready.emit(result)
+                    if self._cancelled.is_set():
+                        break
+            finally:
+                results.close()
+        except Exception as exc:
+            logger.exception("Batch plotting failed")
+            self.failed.emit(str(exc))
+            return
+        self.finished.emit(self._cancelled.is_set())
+
+    def _on_stopped(self, *_args) -> None:
+        self._running = False
+
+
+__all__ = ["BatchRunner"]
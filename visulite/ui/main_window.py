@@ -5,9 +5,13 @@ from __future__ import annotations
 import logging
 import os
 import subprocess
+import time
+from contextlib import nullcontext
+from dataclasses import replace
 from datetime import datetime
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 from PySide6.QtCore import Qt, QSortFilterProxyModel
 from PySide6.QtGui import QAction, QColor, QKeySequence, QShortcut
@@ -25,8 +29,6 @@ from PySide6.QtWidgets import (
     QHBoxLayout,
     QLabel,
     QLineEdit,
-    QListWidget,
-    QListWidgetItem,
     QMainWindow,
     QMenu,
     QMenuBar,
@@ -40,6 +42,7 @@ from PySide6.QtWidgets import (
     QTableWidget,
     QTableWidgetItem,
     QPlainTextEdit,
+    QProgressBar,
     QTextEdit,
     QVBoxLayout,
     QWidget,
@@ -47,16 +50,29 @@ from PySide6.QtWidgets import (
 
 from visulite.models.app_state import AppState
 from visulite.models.chart_config import ChartConfig
+from visulite.models.column_list_model import ColumnListModel
 from visulite.models.dataframe_model import DataFrameModel
-from visulite.services.batch_plotter import BatchPlotter
+from visulite.services.batch_book import COMBINED_NAME, SheetLayout
+from visulite.services.batch_plotter import BatchJob, BatchPlotter, BatchResult
 from visulite.services.chart_manager import ChartManager
+from visulite.services.column_index import ColumnIndexCache, numeric_values
 from visulite.services.config_manager import ConfigManager
 from visulite.services.data_loader import DataLoader, UnsupportedFormatError
 from visulite.services.data_processor import DataProcessor, FilterCriteria
-from visulite.services.export_manager import ExportManager
+from visulite.services.export_manager import ExportManager, VectorOptions
+from visulite.services.lod import LodCache
 from visulite.services.recent_files import RecentFilesManager
+from visulite.services.render_cache import (
+    DataFingerprinter,
+    RenderCache,
+    figure_edits,
+    figure_view,
+    render_key,
+)
+from visulite.services.time_axis import is_datetime
+from visulite.ui.batch_runner import BatchRunner
 from visulite.ui.styles import QSS_LIGHT, QSS_DARK
-from visulite.ui.widgets import ChartWidget
+from visulite.ui.widgets import ChartWidget, ColumnChecklist, ColumnComboBox
 
 logger = logging.getLogger("visulite.ui.main_window")
 
@@ -94,16 +110,40 @@ class MainWindow(QMainWindow):
 
         self.state = AppState()
         self.table_model = DataFrameModel()
+        # One column list shared by every column picker.
+        self.column_model = ColumnListModel()
         self.proxy_model = NumericSortProxy()
         self.proxy_model.setSourceModel(self.table_model)
         self.data_loader = DataLoader()
-        self.chart_manager = ChartManager()
-        self.export_manager = ExportManager()
+        # Sorted column indexes are shared by range filters and chart zooming.
+        self.column_index = ColumnIndexCache()
         self.config_manager = ConfigManager()
-        self.data_processor = DataProcessor()
+        self.preferences = self.config_manager.load_preferences()
+        disk_cache = self.preferences.get("render_cache_disk", True)
+        # Level-of-detail pyramids of long line series, persisted across
+        # sessions while the disk cache is on.
+        self.lod_cache_dir = Path.home() / ".visulite" / "lod_cache"
+        self.lod_cache = LodCache(
+            RenderCache(self.lod_cache_dir if disk_cache else None, memory_bytes=0)
+        )
+        self.chart_manager = ChartManager(
+            index_cache=self.column_index, lod_cache=self.lod_cache
+        )
+        # Rendered charts and exports, keyed by data fingerprint and settings;
+        # the disk level can be turned off in the view menu.
+        self.render_cache_dir = Path.home() / ".visulite" / "render_cache"
+        self.render_cache = RenderCache(self.render_cache_dir if disk_cache else None)
+        self.fingerprinter = DataFingerprinter()
+        self.export_manager = ExportManager(cache=self.render_cache)
+        self.data_processor = DataProcessor(index_cache=self.column_index)
         self.recent_files_manager = RecentFilesManager()
+        self.batch_runner = BatchRunner(self)
         self.selected_color: str = "auto"
         self.chart_theme: str = "default"  # Chart matplotlib style
+        # (frame, config, theme, history) the chart on screen was drawn from,
+        # and that of the render in progress until it succeeds
+        self._rendered: tuple | None = None
+        self._requested: tuple | None = None
 
         self._build_menu_bar()
         self._build_ui()
@@ -201,6 +241,17 @@ class MainWindow(QMainWindow):
         self.dark_mode_action.triggered.connect(self._toggle_dark_mode)
         view_menu.addAction(self.dark_mode_action)
 
+        cache_menu = QMenu("渲染缓存(&C)", self)
+        self.disk_cache_action = QAction("保存到磁盘 (~/.visulite)", self)
+        self.disk_cache_action.setCheckable(True)
+        self.disk_cache_action.setChecked(self.render_cache.directory is not None)
+        self.disk_cache_action.triggered.connect(self._set_disk_cache)
+        cache_menu.addAction(self.disk_cache_action)
+        clear_cache_action = QAction("清空渲染缓存", self)
+        clear_cache_action.triggered.connect(self._clear_render_cache)
+        cache_menu.addAction(clear_cache_action)
+        view_menu.addMenu(cache_menu)
+
         # Help menu
         help_menu = menu_bar.addMenu("帮助(&H)")
         
@@ -274,18 +325,43 @@ class MainWindow(QMainWindow):
             app.setStyleSheet(QSS_DARK if checked else QSS_LIGHT)
             self.statusBar().showMessage("已切换到" + ("深色模式" if checked else "浅色模式"))
 
+    def _set_disk_cache(self, enabled: bool) -> None:
+        """Keep rendered charts and exports on disk across sessions, or only in memory."""
+        self.render_cache.set_directory(self.render_cache_dir if enabled else None)
+        self.lod_cache.store.set_directory(self.lod_cache_dir if enabled else None)
+        self.preferences["render_cache_disk"] = enabled
+        self.config_manager.save_preferences(self.preferences)
+        self.statusBar().showMessage(
+            "渲染缓存将保存到磁盘" if enabled else "渲染缓存仅保留在内存中"
+        )
+
+    def _clear_render_cache(self) -> None:
+        self.render_cache.clear()
+        self.lod_cache.clear()
+        if self.render_cache.directory is None:
+            # Files written before the disk level was turned off.
+            RenderCache(self.render_cache_dir, memory_bytes=0).clear()
+            RenderCache(self.lod_cache_dir, memory_bytes=0).clear()
+        self.statusBar().showMessage("已清空渲染缓存")
+
     def _quick_export(self) -> None:
         """Quick export chart as PNG to desktop."""
         if not self.chart_widget.figure.axes:
             self.statusBar().showMessage("请先绘制图表")
             return
+        if self._chart_busy():
+            return
         
         desktop = Path.home() / "Desktop"
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         target = desktop / f"VisuLite_Chart_{timestamp}.png"
         
         try:
-            self.export_manager.export(self.chart_widget.figure, target, dpi=300)
+            figure = self.chart_widget.figure
+            with self._export_fidelity(figure):
+                self.export_manager.export(
+                    figure, target, dpi=300, cache_key=self._export_key(figure)
+                )
             self.statusBar().showMessage(f"已快速导出到桌面: {target.name}")
         except Exception as exc:
             self.statusBar().showMessage(f"导出失败: {exc}")
@@ -363,6 +439,21 @@ class MainWindow(QMainWindow):
 
         layout.addWidget(main_splitter)
         self.setCentralWidget(central)
+        self.readout_label = QLabel()
+        self.readout_label.setObjectName("chart-readout")
+        self.statusBar().addPermanentWidget(self.readout_label)
+        self.chart_widget.readout_changed.connect(self.readout_label.setText)
+        self.chart_widget.selection_made.connect(self._on_chart_selection)
+        self.render_progress = QProgressBar()
+        self.render_progress.setRange(0, 0)  # indeterminate
+        self.render_progress.setMaximumWidth(120)
+        self.render_progress.setTextVisible(False)
+        self.render_progress.setVisible(False)
+        self.statusBar().addPermanentWidget(self.render_progress)
+        scheduler = self.chart_widget.scheduler
+        scheduler.busy_changed.connect(self._on_render_busy)
+        scheduler.finished.connect(self._on_chart_rendered)
+        scheduler.failed.connect(self._on_chart_failed)
         self.statusBar().showMessage("准备就绪")
 
     def _create_card(self, title: str) -> tuple[QFrame, QVBoxLayout]:
@@ -417,14 +508,12 @@ class MainWindow(QMainWindow):
         form_layout.setSpacing(10)
         form_layout.setLabelAlignment(Qt.AlignLeft) # Align labels left
 
-        self.x_combo = QComboBox()
+        self.x_combo = ColumnComboBox(self.column_model)
         form_layout.addRow("X 轴列", self.x_combo)
 
         y_container = QVBoxLayout()
         y_container.setSpacing(4)
-        self.y_list = QListWidget()
-        self.y_list.setSelectionMode(QListWidget.MultiSelection)
-        self.y_list.setMinimumHeight(110)
+        self.y_list = ColumnChecklist(self.column_model)
         y_container.addWidget(self.y_list)
         
         y_button_row = QHBoxLayout()
@@ -469,6 +558,106 @@ class MainWindow(QMainWindow):
         self.marker_style_label = QLabel("点样式")
         form_layout.addRow(self.marker_style_label, self.marker_style_combo)
 
+        # Downsampling of dense line charts
+        self.downsample_combo = QComboBox()
+        self.downsample_combo.addItem("Min-Max (保留峰值)", "minmax")
+        self.downsample_combo.addItem("LTTB", "lttb")
+        self.downsample_combo.addItem("关闭", "none")
+        self.downsample_label = QLabel("降采样")
+        form_layout.addRow(self.downsample_label, self.downsample_combo)
+
+        # Rendering of very large scatter plots
+        self.scatter_mode_combo = QComboBox()
+        self.scatter_mode_combo.addItem("自动 (大数据用密度图)", "auto")
+        self.scatter_mode_combo.addItem("逐点绘制", "points")
+        self.scatter_mode_combo.addItem("密度图", "density")
+        self.scatter_mode_label = QLabel("散点渲染")
+        form_layout.addRow(self.scatter_mode_label, self.scatter_mode_combo)
+
+        # Bar aggregation (bar charts only)
+        self.bar_aggregate_combo = QComboBox()
+        self.bar_aggregate_combo.addItem("求和", "sum")
+        self.bar_aggregate_combo.addItem("平均值", "mean")
+        self.bar_aggregate_combo.addItem("计数", "count")
+        self.bar_aggregate_combo.addItem("最大值", "max")
+        self.bar_aggregate_label = QLabel("聚合方式")
+        form_layout.addRow(self.bar_aggregate_label, self.bar_aggregate_combo)
+
+        self.bar_top_n_spin = QSpinBox()
+        self.bar_top_n_spin.setRange(1, 500)
+        self.bar_top_n_spin.setValue(30)
+        self.bar_top_n_spin.setToolTip("只显示数值最大的 N 个类别，其余合并为「其他」")
+        self.bar_top_n_label = QLabel("显示类别数")
+        form_layout.addRow(self.bar_top_n_label, self.bar_top_n_spin)
+
+        self.bar_mode_combo = QComboBox()
+        self.bar_mode_combo.addItem("并列", "grouped")
+        self.bar_mode_combo.addItem("堆叠", "stacked")
+        self.bar_mode_label = QLabel("多列排列")
+        form_layout.addRow(self.bar_mode_label, self.bar_mode_combo)
+
+        # Histogram binning (histograms only)
+        self.hist_rule_combo = QComboBox()
+        self.hist_rule_combo.addItem("固定分箱数", "count")
+        self.hist_rule_combo.addItem("固定箱宽", "width")
+        self.hist_rule_combo.addItem("Freedman–Diaconis", "fd")
+        self.hist_rule_combo.addItem("Sturges", "sturges")
+        self.hist_rule_combo.currentIndexChanged.connect(self._on_hist_rule_changed)
+        self.hist_rule_label = QLabel("分箱规则")
+        form_layout.addRow(self.hist_rule_label, self.hist_rule_combo)
+
+        self.hist_bins_spin = QSpinBox()
+        self.hist_bins_spin.setRange(1, 1000)
+        self.hist_bins_spin.setValue(30)
+        self.hist_bins_label = QLabel("分箱数")
+        form_layout.addRow(self.hist_bins_label, self.hist_bins_spin)
+
+        self.hist_width_spin = QDoubleSpinBox()
+        self.hist_width_spin.setDecimals(4)
+        self.hist_width_spin.setRange(0.0001, 1e9)
+        self.hist_width_spin.setValue(1.0)
+        self.hist_width_label = QLabel("箱宽")
+        form_layout.addRow(self.hist_width_label, self.hist_width_spin)
+
+        self.hist_shared_checkbox = QCheckBox("多列共用分箱")
+        self.hist_shared_checkbox.setChecked(True)
+        form_layout.addRow(self.hist_shared_checkbox)
+
+        self.heatmap_pairwise_checkbox = QCheckBox("成对删除缺失值")
+        self.heatmap_pairwise_checkbox.setChecked(True)
+        self.heatmap_pairwise_checkbox.setToolTip("取消勾选时只使用所有列都有值的行，计算更快")
+        form_layout.addRow(self.heatmap_pairwise_checkbox)
+
+        self.heatmap_reorder_checkbox = QCheckBox("按相关性聚类排序")
+        form_layout.addRow(self.heatmap_reorder_checkbox)
+
+        self.box_group_checkbox = QCheckBox("按 X 列分组")
+        self.box_group_checkbox.setToolTip("为 X 列的每个取值分别绘制箱体")
+        form_layout.addRow(self.box_group_checkbox)
+
+        self.box_outliers_spin = QSpinBox()
+        self.box_outliers_spin.setRange(0, 100_000)
+        self.box_outliers_spin.setValue(1000)
+        self.box_outliers_spin.setToolTip("每个箱体最多绘制的离群点数，超出时均匀抽样")
+        self.box_outliers_label = QLabel("离群点上限")
+        form_layout.addRow(self.box_outliers_label, self.box_outliers_spin)
+
+        # Small multiples
+        self.grid_by_combo = QComboBox()
+        self.grid_by_combo.addItem("单图", "none")
+        self.grid_by_combo.addItem("每个 Y 列一个子图", "column")
+        self.grid_by_combo.addItem("按列取值拆分子图", "value")
+        self.grid_by_combo.currentIndexChanged.connect(self._on_grid_by_changed)
+        form_layout.addRow("多图网格", self.grid_by_combo)
+
+        self.grid_column_combo = ColumnComboBox(self.column_model)
+        self.grid_column_label = QLabel("拆分列")
+        form_layout.addRow(self.grid_column_label, self.grid_column_combo)
+
+        self.grid_share_y_checkbox = QCheckBox("子图共享 Y 轴")
+        self.grid_share_y_checkbox.setChecked(True)
+        form_layout.addRow(self.grid_share_y_checkbox)
+
         # Color selection
         color_row = QHBoxLayout()
         self.color_combo = QComboBox()
@@ -518,6 +707,29 @@ class MainWindow(QMainWindow):
         self.dpi_spin.setValue(300)
         form_layout.addRow("导出 DPI", self.dpi_spin)
 
+        self.full_fidelity_checkbox = QCheckBox("导出完整数据 (不降采样)")
+        form_layout.addRow(self.full_fidelity_checkbox)
+
+        # Size control for SVG/PDF exports of dense charts; PNG/JPG are not
+        # affected. Both steps start off, so exports match Matplotlib's output.
+        self.rasterize_spin = QSpinBox()
+        self.rasterize_spin.setRange(0, 100_000_000)
+        self.rasterize_spin.setSingleStep(10_000)
+        self.rasterize_spin.setValue(0)
+        self.rasterize_spin.setSpecialValueText("不栅格化")
+        self.rasterize_spin.setToolTip(
+            "SVG/PDF 中点数超过此值的折线与散点按导出 DPI 栅格化，坐标轴与文字仍为矢量"
+        )
+        form_layout.addRow("矢量栅格化阈值 (点)", self.rasterize_spin)
+        self.simplify_spin = QDoubleSpinBox()
+        self.simplify_spin.setRange(0.0, 1.0)
+        self.simplify_spin.setSingleStep(0.05)
+        self.simplify_spin.setValue(0.0)
+        self.simplify_spin.setSuffix(" px")
+        self.simplify_spin.setSpecialValueText("Matplotlib 默认")
+        self.simplify_spin.setToolTip("SVG/PDF 中折线路径的简化容差，越大文件越小")
+        form_layout.addRow("矢量路径简化容差", self.simplify_spin)
+
         # Export naming template
         self.name_template_combo = QComboBox()
         self.name_template_combo.addItem("chart", "chart")
@@ -553,6 +765,10 @@ class MainWindow(QMainWindow):
         self.load_config_button.clicked.connect(self._on_load_config)
         config_row.addWidget(self.load_config_button)
         layout.addLayout(config_row)
+
+        # Sync type-specific controls with the initial chart type
+        self._on_chart_type_changed(self.chart_type_combo.currentIndex())
+        self._on_grid_by_changed()
         return card
 
     def _build_processing_group(self) -> QFrame:
@@ -578,7 +794,7 @@ class MainWindow(QMainWindow):
 
         # Type conversion
         type_row = QHBoxLayout()
-        self.convert_column_combo = QComboBox()
+        self.convert_column_combo = ColumnComboBox(self.column_model)
         type_row.addWidget(self.convert_column_combo)
         self.target_type_combo = QComboBox()
         self.target_type_combo.addItem("字符串", "string")
@@ -591,13 +807,13 @@ class MainWindow(QMainWindow):
         type_row.addWidget(self.convert_type_button)
         form_layout.addRow("类型转换", type_row)
 
-        self.filter_column_combo = QComboBox()
+        self.filter_column_combo = ColumnComboBox(self.column_model)
         form_layout.addRow("文本筛选列", self.filter_column_combo)
         self.filter_text_input = QLineEdit()
         self.filter_text_input.setPlaceholderText("包含关键词...")
         form_layout.addRow("关键词", self.filter_text_input)
 
-        self.range_column_combo = QComboBox()
+        self.range_column_combo = ColumnComboBox(self.column_model)
         form_layout.addRow("数值列", self.range_column_combo)
         self.range_min_input = QLineEdit()
         self.range_min_input.setPlaceholderText("最小值 (可空)")
@@ -608,8 +824,7 @@ class MainWindow(QMainWindow):
         range_row.addWidget(self.range_max_input)
         form_layout.addRow("数值范围", range_row)
 
-        self.dropna_column_combo = QComboBox()
-        self.dropna_column_combo.addItem("不处理")
+        self.dropna_column_combo = ColumnComboBox(self.column_model, placeholder="不处理")
         form_layout.addRow("缺失值删除列", self.dropna_column_combo)
 
         self.fill_method_combo = QComboBox()
@@ -618,8 +833,15 @@ class MainWindow(QMainWindow):
         self.fill_method_combo.addItem("0 填充", "zero")
         self.fill_method_combo.addItem("前向填充", "ffill")
         self.fill_method_combo.addItem("后向填充", "bfill")
+        self.fill_method_combo.addItem("线性插值", "interpolate")
         form_layout.addRow("缺失值填充策略", self.fill_method_combo)
 
+        self.fill_column_combo = ColumnComboBox(self.column_model, placeholder="全部列")
+        form_layout.addRow("填充列", self.fill_column_combo)
+
+        self.fill_group_combo = ColumnComboBox(self.column_model, placeholder="不分组")
+        form_layout.addRow("分组填充列", self.fill_group_combo)
+
         # Enable word wrap for all labels in the form layout
         for i in range(form_layout.rowCount()):
             item = form_layout.itemAt(i, QFormLayout.LabelRole)
@@ -719,6 +941,12 @@ class MainWindow(QMainWindow):
                 self._load_file(file_path)
                 break  # Only load the first valid file
 
+    def closeEvent(self, event) -> None:
+        """Stop background batch runs and pyramid builds before the window goes away."""
+        self.batch_runner.shutdown()
+        self.lod_cache.shutdown()
+        super().closeEvent(event)
+
     # Event handlers ------------------------------------------------------------------
 
     def _on_chart_type_changed(self, index: int) -> None:
@@ -735,15 +963,56 @@ class MainWindow(QMainWindow):
         self.marker_style_combo.setVisible(marker_relevant)
         self.marker_style_label.setVisible(marker_relevant)
 
+        self.downsample_combo.setVisible(line_relevant)
+        self.downsample_label.setVisible(line_relevant)
+
+        scatter_relevant = chart_type == "scatter"
+        self.scatter_mode_combo.setVisible(scatter_relevant)
+        self.scatter_mode_label.setVisible(scatter_relevant)
+
+        bar_relevant = chart_type == "bar"
+        for widget in (
+            self.bar_aggregate_combo, self.bar_aggregate_label,
+            self.bar_top_n_spin, self.bar_top_n_label,
+            self.bar_mode_combo, self.bar_mode_label,
+        ):
+            widget.setVisible(bar_relevant)
+
+        hist_relevant = chart_type == "histogram"
+        for widget in (self.hist_rule_combo, self.hist_rule_label, self.hist_shared_checkbox):
+            widget.setVisible(hist_relevant)
+        self._on_hist_rule_changed()
+
+        heatmap_relevant = chart_type == "heatmap"
+        self.heatmap_pairwise_checkbox.setVisible(heatmap_relevant)
+        self.heatmap_reorder_checkbox.setVisible(heatmap_relevant)
+
+        box_relevant = chart_type == "boxplot"
+        for widget in (self.box_group_checkbox, self.box_outliers_spin, self.box_outliers_label):
+            widget.setVisible(box_relevant)
+
+    def _on_grid_by_changed(self, _index: int = 0) -> None:
+        grid_by = self.grid_by_combo.currentData()
+        self.grid_column_combo.setVisible(grid_by == "value")
+        self.grid_column_label.setVisible(grid_by == "value")
+        self.grid_share_y_checkbox.setVisible(grid_by != "none")
+
+    def _on_hist_rule_changed(self, _index: int = 0) -> None:
+        """Only show the bin count / width input the selected rule uses."""
+        hist_relevant = self.chart_type_combo.currentData() == "histogram"
+        rule = self.hist_rule_combo.currentData()
+        self.hist_bins_spin.setVisible(hist_relevant and rule == "count")
+        self.hist_bins_label.setVisible(hist_relevant and rule == "count")
+        self.hist_width_spin.setVisible(hist_relevant and rule == "width")
+        self.hist_width_label.setVisible(hist_relevant and rule == "width")
+
     def _select_all_y_columns(self) -> None:
-        """Select all items in Y column list."""
-        for i in range(self.y_list.count()):
-            self.y_list.item(i).setSelected(True)
+        """Select all Y columns matching the current search."""
+        self.y_list.set_visible_checked(True)
 
     def _deselect_all_y_columns(self) -> None:
-        """Deselect all items in Y column list."""
-        for i in range(self.y_list.count()):
-            self.y_list.item(i).setSelected(False)
+        """Deselect all Y columns matching the current search."""
+        self.y_list.set_visible_checked(False)
 
     def _on_color_changed(self, index: int) -> None:
         if self.color_combo.currentData() == "custom":
@@ -800,23 +1069,112 @@ class MainWindow(QMainWindow):
             return
         config = self._collect_chart_config()
         self.state.chart_config = config
-        try:
-            self.chart_manager.plot(
-                self.chart_widget.axes, 
-                self.state.data_frame, 
-                config,
-                theme=self.chart_theme
-            )  # type: ignore[arg-type]
-        except Exception as exc:  # pragma: no cover - GUI feedback
-            QMessageBox.warning(self, "绘图失败", str(exc))
-            logger.exception("Chart rendering error")
-        else:
-            self.statusBar().showMessage("图表已更新")
+        frame = self.state.data_frame
+        theme = self.chart_theme
+        self._requested = (frame, config, theme, tuple(self.state.history))
+        render_source = self._requested
+        # Plotting and drawing run on the render thread; see _on_chart_rendered.
+        self.chart_widget.render(
+            lambda figure: self.chart_manager.plot_figure(figure, frame, config, theme=theme),  # type: ignore[arg-type]
+            cache=self.render_cache,
+            key=lambda figure: self._chart_key(figure, render_source),
+        )
+        self.statusBar().showMessage("正在绘制图表...")
+
+    def _chart_key(self, figure, source: tuple | None = None, *extra) -> str | None:
+        """Render cache key of ``figure`` drawn from ``source`` (the chart on screen).
+
+        Covers the data fingerprint of the plotted columns, the processing
+        history, the config, the theme, the current view limits and edits
+        made with the toolbar's figure options and subplot tools.
+        """
+        source = source or self._rendered
+        if source is None:
+            return None
+        frame, config, theme, history = source
+        columns = [config.x_column, *config.y_columns]
+        if config.grid_by == "value" and config.grid_column:
+            columns.append(config.grid_column)
+        columns = [column for column in columns if column in frame.columns]
+        fingerprint = self.fingerprinter.fingerprint(frame, columns, history)
+        return render_key(
+            fingerprint,
+            config.to_dict(),
+            theme,
+            figure_view(figure),
+            figure_edits(figure),
+            *extra,
+        )
+
+    def _export_key(self, figure) -> str | None:
+        return self._chart_key(
+            figure,
+            None,
+            list(figure.get_size_inches()),
+            self.full_fidelity_checkbox.isChecked(),
+        )
+
+    def _on_chart_rendered(self, _result) -> None:
+        self._rendered = self._requested
+        self.chart_widget.set_overlay_enabled(True)
+        self.statusBar().showMessage("图表已更新")
+
+    def _on_chart_failed(self, message: str) -> None:  # pragma: no cover - GUI feedback
+        # The figure may hold part of the failed chart: nothing on screen has a key now.
+        self._rendered = None
+        QMessageBox.warning(self, "绘图失败", message)
+        self.statusBar().showMessage("绘图失败")
+
+    def _on_render_busy(self, busy: bool) -> None:
+        self.render_progress.setVisible(busy)
+
+    def _chart_busy(self) -> bool:
+        """True (with a status message) while the chart is still being rendered."""
+        if self.chart_widget.scheduler.busy:
+            self.statusBar().showMessage("图表正在绘制，请稍候")
+            return True
+        return False
+
+    def _on_chart_selection(self, x0: float, x1: float, y0: float, y1: float) -> None:
+        """Report how many plotted points fall inside a rubber-band selection."""
+        axes = self.chart_widget.axes
+        bounds = (
+            f"X: {axes.format_xdata(x0)} ~ {axes.format_xdata(x1)}, "
+            f"Y: {axes.format_ydata(y0)} ~ {axes.format_ydata(y1)}"
+        )
+        config = self.state.chart_config
+        frame = self.state.data_frame
+        if (
+            frame is None
+            or config is None
+            or config.chart_type not in ChartManager.SERIES_TYPES
+            or config.grid_by != "none"
+            or config.x_column not in frame.columns
+            or not (
+                pd.api.types.is_numeric_dtype(frame[config.x_column])
+                or is_datetime(frame[config.x_column])
+            )
+        ):
+            self.statusBar().showMessage(f"已框选 {bounds}")
+            return
+        index = self.column_index.get(frame[config.x_column])
+        if index is None:
+            self.statusBar().showMessage(f"已框选 {bounds}")
+            return
+        rows = index.range_mask(x0, x1)
+        count = 0
+        for column in config.y_columns:
+            if column in frame.columns:
+                values = numeric_values(frame[column])
+                count += int(np.count_nonzero(rows & (values >= y0) & (values <= y1)))
+        self.statusBar().showMessage(f"已框选 {bounds}，共 {count:,} 个数据点")
 
     def _on_export_chart(self) -> None:
         if not self.chart_widget.figure.axes:
             QMessageBox.information(self, "提示", "请先绘制图表。")
             return
+        if self._chart_busy():
+            return
         
         # Generate default filename from template
         default_name = self._generate_export_filename()
@@ -835,15 +1193,34 @@ class MainWindow(QMainWindow):
             self.fig_width_spin.value(), self.fig_height_spin.value(), forward=True
         )
         try:
-            self.export_manager.export(
-                figure, Path(target), dpi=self.dpi_spin.value()
-            )
+            with self._export_fidelity(figure):
+                self.export_manager.export(
+                    figure,
+                    Path(target),
+                    dpi=self.dpi_spin.value(),
+                    cache_key=self._export_key(figure),
+                    vector=self._vector_options(),
+                )
             self._show_export_success(Path(target))
         except Exception as exc:  # pragma: no cover
             QMessageBox.critical(self, "导出失败", str(exc))
         finally:
             figure.set_size_inches(*original_size, forward=True)
 
+    def _vector_options(self) -> VectorOptions | None:
+        """SVG/PDF size control from the export settings; 0 turns a step off."""
+        rasterize_above = self.rasterize_spin.value() or None
+        simplify_tolerance = self.simplify_spin.value() or None
+        if rasterize_above is None and simplify_tolerance is None:
+            return None
+        return VectorOptions(rasterize_above, simplify_tolerance)
+
+    def _export_fidelity(self, figure):
+        """Context that restores full-resolution data when the user asked for it."""
+        if self.full_fidelity_checkbox.isChecked():
+            return self.chart_manager.full_resolution(figure)
+        return nullcontext()
+
     def _show_export_success(self, file_path: Path) -> None:
         """Show export success dialog with options to open file or folder."""
         msg = QMessageBox(self)
@@ -882,8 +1259,8 @@ class MainWindow(QMainWindow):
     def _generate_export_filename(self) -> str:
         """Generate filename based on the template."""
         template = self.name_template_combo.currentText()
-        x_col = self.x_combo.currentText() or "x"
-        y_cols = [item.text() for item in self.y_list.selectedItems()]
+        x_col = self.x_combo.selected_column() or "x"
+        y_cols = self.y_list.checked_columns()
         y_col = y_cols[0] if y_cols else "y"
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
@@ -893,19 +1270,34 @@ class MainWindow(QMainWindow):
         return filename
 
     def _on_batch_plot(self) -> None:
-        """Open batch plotting dialog."""
+        """Open batch plotting dialog and start the run in the background."""
+        if self.batch_runner.busy:
+            QMessageBox.information(self, "提示", "已有批量绘图任务正在运行。")
+            return
         dialog = BatchPlotDialog(self, self.state.chart_config)
         if dialog.exec() == QDialog.Accepted:
-            source_dir, target_dir, config, fig_size, dpi, fmt = dialog.get_settings()
-            batch_plotter = BatchPlotter(self.data_loader, self.chart_manager, self.export_manager)
-            try:
-                exported = batch_plotter.run(
-                    source_dir, target_dir, config, fig_size, dpi, fmt, 
-                    theme=self.chart_theme
-                )
-                QMessageBox.information(self, "完成", f"成功导出 {len(exported)} 个图表到 {target_dir}")
-            except Exception as exc:
-                QMessageBox.critical(self, "批量绘图失败", str(exc))
+            (
+                source_dir, target_dir, config, fig_size, dpi, formats, full_fidelity, workers,
+                incremental, prune, combined_pdf, contact_sheet,
+            ) = dialog.get_settings()
+            # The run plots on a worker thread, so it gets a chart manager of its own.
+            batch_plotter = BatchPlotter(
+                self.data_loader, ChartManager(), self.export_manager, self.fingerprinter
+            )
+            job = BatchJob(
+                target_dir, config, fig_size, dpi, formats,
+                theme=self.chart_theme,
+                full_fidelity=full_fidelity,
+                incremental=incremental,
+                prune=prune,
+                combined_pdf=combined_pdf,
+                contact_sheet=contact_sheet,
+                vector=self._vector_options(),
+            )
+            progress = BatchProgressDialog(self, self.batch_runner)
+            progress.setAttribute(Qt.WA_DeleteOnClose)
+            progress.show()
+            self.batch_runner.start(batch_plotter, source_dir, job, workers=workers)
 
     def _on_save_config(self) -> None:
         config = self._collect_chart_config()
@@ -936,27 +1328,13 @@ class MainWindow(QMainWindow):
         self.file_info.setPlainText("\n".join(info_lines))
 
     def _populate_columns(self, columns: list[str]) -> None:
-        self.x_combo.clear()
-        self.x_combo.addItems(columns)
-        self.y_list.clear()
-        for column in columns:
-            item = QListWidgetItem(column)
-            item.setSelected(False)
-            self.y_list.addItem(item)
-        self.filter_column_combo.clear()
-        self.filter_column_combo.addItems(columns)
-        self.range_column_combo.clear()
-        self.range_column_combo.addItems(columns)
-        self.dropna_column_combo.clear()
-        self.dropna_column_combo.addItem("不处理")
-        self.dropna_column_combo.addItems(columns)
-        self.convert_column_combo.clear()
-        self.convert_column_combo.addItems(columns)
+        # Every picker is a view on column_model, so one reset updates them all.
+        self.column_model.set_columns(columns)
 
     def _collect_chart_config(self) -> ChartConfig:
-        y_columns = [item.text() for item in self.y_list.selectedItems()]
+        y_columns = self.y_list.checked_columns()
         return ChartConfig(
-            x_column=self.x_combo.currentText() or None,
+            x_column=self.x_combo.selected_column(),
             y_columns=y_columns,
             chart_type=self.chart_type_combo.currentData(),
             show_legend=self.legend_checkbox.isChecked(),
@@ -967,15 +1345,29 @@ class MainWindow(QMainWindow):
             color_scheme=self.selected_color,
             x_label=self.x_label_edit.text() or None,
             y_label=self.y_label_edit.text() or None,
+            downsample=self.downsample_combo.currentData(),
+            scatter_mode=self.scatter_mode_combo.currentData(),
+            bar_aggregate=self.bar_aggregate_combo.currentData(),
+            bar_top_n=self.bar_top_n_spin.value(),
+            bar_mode=self.bar_mode_combo.currentData(),
+            hist_rule=self.hist_rule_combo.currentData(),
+            hist_bins=self.hist_bins_spin.value(),
+            hist_bin_width=self.hist_width_spin.value(),
+            hist_shared_bins=self.hist_shared_checkbox.isChecked(),
+            heatmap_pairwise=self.heatmap_pairwise_checkbox.isChecked(),
+            heatmap_reorder=self.heatmap_reorder_checkbox.isChecked(),
+            box_group_by_x=self.box_group_checkbox.isChecked(),
+            box_max_outliers=self.box_outliers_spin.value(),
+            grid_by=self.grid_by_combo.currentData(),
+            grid_column=self.grid_column_combo.selected_column(),
+            grid_share_y=self.grid_share_y_checkbox.isChecked(),
         )
 
     def _apply_chart_config(self, config: ChartConfig) -> None:
         idx = self.x_combo.findText(config.x_column or "")
         if idx >= 0:
             self.x_combo.setCurrentIndex(idx)
-        for i in range(self.y_list.count()):
-            item = self.y_list.item(i)
-            item.setSelected(item.text() in config.y_columns)
+        self.y_list.set_checked_columns(config.y_columns)
         idx = self.chart_type_combo.findData(config.chart_type)
         if idx >= 0:
             self.chart_type_combo.setCurrentIndex(idx)
@@ -985,6 +1377,36 @@ class MainWindow(QMainWindow):
         idx = self.marker_style_combo.findData(config.marker_style)
         if idx >= 0:
             self.marker_style_combo.setCurrentIndex(idx)
+        idx = self.downsample_combo.findData(config.downsample)
+        if idx >= 0:
+            self.downsample_combo.setCurrentIndex(idx)
+        idx = self.scatter_mode_combo.findData(config.scatter_mode)
+        if idx >= 0:
+            self.scatter_mode_combo.setCurrentIndex(idx)
+        idx = self.bar_aggregate_combo.findData(config.bar_aggregate)
+        if idx >= 0:
+            self.bar_aggregate_combo.setCurrentIndex(idx)
+        self.bar_top_n_spin.setValue(config.bar_top_n)
+        idx = self.bar_mode_combo.findData(config.bar_mode)
+        if idx >= 0:
+            self.bar_mode_combo.setCurrentIndex(idx)
+        idx = self.hist_rule_combo.findData(config.hist_rule)
+        if idx >= 0:
+            self.hist_rule_combo.setCurrentIndex(idx)
+        self.hist_bins_spin.setValue(config.hist_bins)
+        self.hist_width_spin.setValue(config.hist_bin_width)
+        self.hist_shared_checkbox.setChecked(config.hist_shared_bins)
+        self.heatmap_pairwise_checkbox.setChecked(config.heatmap_pairwise)
+        self.heatmap_reorder_checkbox.setChecked(config.heatmap_reorder)
+        self.box_group_checkbox.setChecked(config.box_group_by_x)
+        self.box_outliers_spin.setValue(config.box_max_outliers)
+        idx = self.grid_by_combo.findData(config.grid_by)
+        if idx >= 0:
+            self.grid_by_combo.setCurrentIndex(idx)
+        idx = self.grid_column_combo.findText(config.grid_column or "")
+        if idx >= 0:
+            self.grid_column_combo.setCurrentIndex(idx)
+        self.grid_share_y_checkbox.setChecked(config.grid_share_y)
         self.legend_checkbox.setChecked(config.show_legend)
         self.grid_checkbox.setChecked(config.show_grid)
         self.title_edit.setText(config.title)
@@ -1011,7 +1433,7 @@ class MainWindow(QMainWindow):
         if frame is None:
             return
         sliced = self.data_processor.slice_rows(frame, head_n=head_n)
-        self.state.update_view(sliced)
+        self.state.update_view(sliced, ("head", head_n))
         self.table_model.update_frame(sliced)
         self._refresh_stats()
         self.statusBar().showMessage(f"已截取前 {head_n} 行")
@@ -1020,7 +1442,7 @@ class MainWindow(QMainWindow):
         if not self.state.has_data():
             QMessageBox.information(self, "提示", "请先加载数据文件。")
             return
-        column = self.convert_column_combo.currentText()
+        column = self.convert_column_combo.selected_column()
         target_type = self.target_type_combo.currentData()
         if not column:
             return
@@ -1029,7 +1451,7 @@ class MainWindow(QMainWindow):
             return
         try:
             converted = self.data_processor.convert_column_type(frame, column, target_type)
-            self.state.update_view(converted)
+            self.state.update_view(converted, ("convert", column, target_type))
             self.table_model.update_frame(converted)
             self._refresh_stats()
             self.statusBar().showMessage(f"已将列 '{column}' 转换为 {target_type}")
@@ -1041,22 +1463,20 @@ class MainWindow(QMainWindow):
             QMessageBox.information(self, "提示", "请先加载数据文件。")
             return
         text_filters = None
-        column = self.filter_column_combo.currentText()
+        column = self.filter_column_combo.selected_column()
         keyword = self.filter_text_input.text().strip()
         if column and keyword:
             text_filters = {column: keyword}
 
         numeric_ranges = None
-        range_column = self.range_column_combo.currentText()
+        range_column = self.range_column_combo.selected_column()
         min_value = self._parse_float(self.range_min_input.text())
         max_value = self._parse_float(self.range_max_input.text())
         if range_column and (min_value is not None or max_value is not None):
             numeric_ranges = {range_column: (min_value, max_value)}
 
-        drop_column = self.dropna_column_combo.currentText()
-        dropna_columns = None
-        if drop_column and drop_column != "不处理":
-            dropna_columns = [drop_column]
+        drop_column = self.dropna_column_combo.selected_column()
+        dropna_columns = [drop_column] if drop_column else None
 
         criteria = FilterCriteria(
             text_filters=text_filters,
@@ -1067,7 +1487,7 @@ class MainWindow(QMainWindow):
         if frame is None:
             return
         filtered = self.data_processor.apply_filters(frame, criteria)
-        self.state.update_view(filtered)
+        self.state.update_view(filtered, ("filter", repr(criteria)))
         self.table_model.update_frame(filtered)
         self._refresh_stats()
         self.statusBar().showMessage("筛选已应用")
@@ -1088,8 +1508,17 @@ class MainWindow(QMainWindow):
         if frame is None:
             return
         method = self.fill_method_combo.currentData()
-        filled = self.data_processor.fill_missing(frame.copy(), method)
-        self.state.update_view(filled)
+        column = self.fill_column_combo.selected_column()
+        columns = [column] if column else None
+        group_by = self.fill_group_combo.selected_column()
+        try:
+            filled = self.data_processor.fill_missing(
+                frame, method, columns=columns, group_by=group_by
+            )
+        except Exception as exc:
+            QMessageBox.warning(self, "缺失值处理失败", str(exc))
+            return
+        self.state.update_view(filled, ("fill", method, columns, group_by))
         self.table_model.update_frame(filled)
         self._refresh_stats()
         self.statusBar().showMessage("缺失值已处理")
@@ -1280,13 +1709,49 @@ class BatchPlotDialog(QDialog):
         self.dpi_spin.setValue(300)
         layout.addRow("DPI", self.dpi_spin)
 
-        # Format
-        self.format_combo = QComboBox()
-        self.format_combo.addItem("PNG", "png")
-        self.format_combo.addItem("JPG", "jpg")
-        self.format_combo.addItem("PDF", "pdf")
-        self.format_combo.addItem("SVG", "svg")
-        layout.addRow("导出格式", self.format_combo)
+        # Formats; every checked format is written from a single render per file.
+        format_row = QHBoxLayout()
+        self.format_checkboxes: dict[str, QCheckBox] = {}
+        for label, fmt in (("PNG", "png"), ("JPG", "jpg"), ("PDF", "pdf"), ("SVG", "svg")):
+            checkbox = QCheckBox(label)
+            checkbox.setChecked(fmt == "png")
+            format_row.addWidget(checkbox)
+            self.format_checkboxes[fmt] = checkbox
+        format_row.addStretch(1)
+        layout.addRow("导出格式", format_row)
+
+        self.full_fidelity_checkbox = QCheckBox("导出完整数据 (不降采样)")
+        layout.addRow(self.full_fidelity_checkbox)
+
+        # Worker processes, opt-in like the CLI's -j; 1 renders in this process,
+        # one file at a time.
+        cpu_count = os.cpu_count() or 1
+        self.workers_spin = QSpinBox()
+        self.workers_spin.setRange(1, cpu_count)
+        self.workers_spin.setValue(1)
+        self.workers_spin.setToolTip("每个进程独立加载与绘制文件，结果按文件顺序返回")
+        layout.addRow("并行进程数", self.workers_spin)
+
+        self.incremental_checkbox = QCheckBox("增量绘图 (跳过未变化的文件)")
+        self.incremental_checkbox.setChecked(True)
+        self.incremental_checkbox.setToolTip("输出文件夹中记录了每个源文件的大小、修改时间与绘图设置")
+        layout.addRow(self.incremental_checkbox)
+        self.prune_checkbox = QCheckBox("删除源文件已不存在的输出")
+        layout.addRow(self.prune_checkbox)
+
+        # Combined outputs in the target folder, next to the per-file ones.
+        combined_row = QHBoxLayout()
+        self.combined_pdf_checkbox = QCheckBox("合并为多页 PDF")
+        self.combined_pdf_checkbox.setToolTip(f"每个文件一页，写入 {COMBINED_NAME}.pdf")
+        combined_row.addWidget(self.combined_pdf_checkbox)
+        self.contact_sheet_checkbox = QCheckBox("缩略图总览")
+        self.contact_sheet_checkbox.setToolTip(
+            f"每页 {SheetLayout().columns}×{SheetLayout().rows} 个缩略图，"
+            f"写入 {COMBINED_NAME}_sheet_001.png 等"
+        )
+        combined_row.addWidget(self.contact_sheet_checkbox)
+        combined_row.addStretch(1)
+        layout.addRow("合并输出", combined_row)
 
         # Buttons
         button_box = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
@@ -1309,22 +1774,184 @@ class BatchPlotDialog(QDialog):
         target_dir = Path(self.target_dir_edit.text())
         
         y_columns = [col.strip() for col in self.y_columns_edit.text().split(",") if col.strip()]
-        config = ChartConfig(
+        # Everything not edited in this dialog comes from the main window's settings.
+        config = replace(
+            self.config,
             x_column=self.x_column_edit.text() or None,
             y_columns=y_columns,
             chart_type=self.chart_type_combo.currentData(),
-            show_legend=self.config.show_legend,
-            show_grid=self.config.show_grid,
-            title=self.config.title,
-            line_style=self.config.line_style,
-            marker_style=self.config.marker_style,
-            color_scheme=self.config.color_scheme,
+            x_label=None,
+            y_label=None,
         )
         fig_size = (self.fig_width_spin.value(), self.fig_height_spin.value())
         dpi = self.dpi_spin.value()
-        fmt = self.format_combo.currentData()
+        combined_pdf = self.combined_pdf_checkbox.isChecked()
+        contact_sheet = SheetLayout() if self.contact_sheet_checkbox.isChecked() else None
+        formats = tuple(
+            fmt for fmt, checkbox in self.format_checkboxes.items() if checkbox.isChecked()
+        )
+        # Without any format only the combined outputs are written.
+        if not formats and not (combined_pdf or contact_sheet):
+            formats = ("png",)
+        full_fidelity = self.full_fidelity_checkbox.isChecked()
+        workers = self.workers_spin.value()
         
-        return source_dir, target_dir, config, fig_size, dpi, fmt
+        return (
+            source_dir, target_dir, config, fig_size, dpi, formats, full_fidelity, workers,
+            self.incremental_checkbox.isChecked(), self.prune_checkbox.isChecked(),
+            combined_pdf, contact_sheet,
+        )
+
+
+class BatchProgressDialog(QDialog):
+    """Live progress of a background batch run, then its per-file results."""
+
+    STATUS_LABELS = {
+        "exported": "已导出",
+        "cached": "缓存复用",
+        "unchanged": "未变化",
+        "skipped": "已跳过",
+        "failed": "失败",
+        "removed": "已删除",
+        "combined": "合并输出",
+    }
+
+    def __init__(self, parent: QWidget, runner: BatchRunner) -> None:
+        super().__init__(parent)
+        self.setWindowTitle("批量绘图")
+        self.setMinimumSize(640, 420)
+        self.runner = runner
+        self.files: list[Path] = []
+        self.counts = {status: 0 for status in self.STATUS_LABELS}
+        self._started_at = time.monotonic()
+        self._build_ui()
+        runner.started.connect(self._on_started)
+        runner.result_ready.connect(self._on_result)
+        runner.finished.connect(self._on_finished)
+        runner.failed.connect(self._on_failed)
+
+    def _build_ui(self) -> None:
+        layout = QVBoxLayout(self)
+        self.current_label = QLabel("正在扫描源文件夹...")
+        layout.addWidget(self.current_label)
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 0)
+        layout.addWidget(self.progress_bar)
+        self.counts_label = QLabel()
+        layout.addWidget(self.counts_label)
+        self.rate_label = QLabel()
+        self.rate_label.setStyleSheet("color: #888;")
+        layout.addWidget(self.rate_label)
+
+        self.result_table = QTableWidget(0, 3)
+        self.result_table.setHorizontalHeaderLabels(["文件", "状态", "输出 / 说明"])
+        self.result_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.result_table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.result_table.horizontalHeader().setStretchLastSection(True)
+        self.result_table.verticalHeader().setVisible(False)
+        self.result_table.setVisible(False)
+        layout.addWidget(self.result_table, 1)
+
+        button_row = QHBoxLayout()
+        button_row.addStretch(1)
+        self.cancel_button = QPushButton("取消")
+        self.cancel_button.clicked.connect(self._on_cancel)
+        button_row.addWidget(self.cancel_button)
+        self.close_button = QPushButton("关闭")
+        self.close_button.clicked.connect(self.accept)
+        self.close_button.setVisible(False)
+        button_row.addWidget(self.close_button)
+        layout.addLayout(button_row)
+
+    @property
+    def done(self) -> int:
+        # Removed and combined outputs are not results of one of this run's files.
+        return sum(
+            count
+            for status, count in self.counts.items()
+            if status not in ("removed", "combined")
+        )
+
+    def _on_started(self, files: list) -> None:
+        self.files = list(files)
+        self._started_at = time.monotonic()
+        self.progress_bar.setRange(0, max(1, len(self.files)))
+        self.progress_bar.setValue(0)
+        self._update_labels()
+
+    def _on_result(self, result: BatchResult) -> None:
+        self.counts[result.status] = self.counts.get(result.status, 0) + 1
+        row = self.result_table.rowCount()
+        self.result_table.insertRow(row)
+        detail = ", ".join(str(output) for output in result.outputs) or result.message
+        for column, text in enumerate(
+            (result.source.name, self.STATUS_LABELS.get(result.status, result.status), detail)
+        ):
+            item = QTableWidgetItem(text)
+            if result.status == "failed":
+                item.setForeground(QColor("#d13438"))
+            self.result_table.setItem(row, column, item)
+        self.progress_bar.setValue(self.done)
+        self._update_labels()
+
+    def _update_labels(self) -> None:
+        total = len(self.files)
+        done = self.done
+        if done < total and self.cancel_button.isEnabled():
+            self.current_label.setText(f"正在处理: {self.files[done].name}")
+        succeeded = self.counts["exported"] + self.counts["cached"]
+        text = (
+            f"已完成 {done} / {total}，成功 {succeeded}，未变化 {self.counts['unchanged']}，"
+            f"失败 {self.counts['failed']}，跳过 {self.counts['skipped']}"
+        )
+        if self.counts["removed"]:
+            text += f"，删除过期输出 {self.counts['removed']}"
+        self.counts_label.setText(text)
+        elapsed = time.monotonic() - self._started_at
+        # Up-to-date files are reported without being rendered; counting them
+        # would make the rate far too optimistic for the files still to render.
+        rendered = done - self.counts["unchanged"]
+        if rendered and elapsed > 0:
+            rate = rendered / elapsed
+            remaining = (total - done) / rate
+            self.rate_label.setText(
+                f"速度 {rate:.2f} 个/秒，预计剩余 {int(remaining // 60):02d}:{int(remaining % 60):02d}"
+            )
+
+    def _on_cancel(self) -> None:
+        self.runner.cancel()
+        self.cancel_button.setEnabled(False)
+        self.current_label.setText("正在取消，等待当前文件完成...")
+
+    def _on_finished(self, cancelled: bool) -> None:
+        elapsed = time.monotonic() - self._started_at
+        self.current_label.setText(
+            f"{'已取消' if cancelled else '已完成'}，用时 {elapsed:.1f} 秒"
+            + (f"，未处理 {len(self.files) - self.done} 个文件" if cancelled else "")
+        )
+        self.rate_label.clear()
+        self._show_results()
+
+    def _on_failed(self, message: str) -> None:
+        self.current_label.setText(f"批量绘图失败: {message}")
+        self._show_results()
+
+    def _show_results(self) -> None:
+        self.progress_bar.setVisible(False)
+        self.cancel_button.setVisible(False)
+        self.close_button.setVisible(True)
+        self.result_table.setVisible(True)
+        self.result_table.resizeColumnsToContents()
+        self.result_table.horizontalHeader().setStretchLastSection(True)
+
+    def closeEvent(self, event) -> None:
+        # Closing the window while files are still rendering cancels the run.
+        self.runner.cancel()
+        super().closeEvent(event)
+
+    def reject(self) -> None:
+        self.runner.cancel()
+        super().reject()
 
 
-__all__ = ["MainWindow", "BatchPlotDialog"]
+__all__ = ["MainWindow", "BatchPlotDialog", "BatchProgressDialog"]
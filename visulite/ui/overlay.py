@@ -0,0 +1,290 @@
+"""Blitted interactive overlays for the chart canvas."""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+from matplotlib.backend_bases import FigureCanvasBase, MouseButton, MouseEvent
+from matplotlib.collections import PathCollection
+from matplotlib.image import AxesImage
+from matplotlib.lines import Line2D
+from matplotlib.patches import Rectangle
+
+logger = logging.getLogger("visulite.overlay")
+
+# (x0, x1, y0, y1) in data coordinates
+Selection = Tuple[float, float, float, float]
+
+
+@dataclass
+class _AxesOverlay:
+    """Animated artists drawn on top of one axes.
+
+    The artists are never added to the axes, so they do not take part in
+    autoscaling, legends or :meth:`Axes.clear`; the overlay draws them itself
+    on top of the cached background.
+    """
+
+    vline: Line2D
+    hline: Line2D
+    marker: Line2D
+    band: Rectangle
+
+    def artists(self) -> List:
+        return [self.vline, self.hline, self.marker, self.band]
+
+
+class ChartOverlay:
+    """Crosshair, nearest-value readout and rubber-band selection.
+
+    The static figure is cached after every full draw and the moving
+    artists are blitted on top of it, so mouse tracking never redraws the
+    data artists. Nearest-point lookups run against the points currently
+    displayed (already downsampled for dense lines), with their screen
+    positions cached until the next full draw.
+
+    Args:
+        canvas: Canvas to attach to; it must support blitting.
+        on_readout: Receives the hover text, or ``""`` when the cursor leaves.
+        on_select: Receives ``(x0, x1, y0, y1)`` after a rubber-band drag.
+    """
+
+    # Nearest points further away than this (in pixels) are not reported.
+    PICK_RADIUS = 30.0
+    # Drags smaller than this (in pixels) count as clicks.
+    MIN_SELECTION = 4.0
+    COLOR = "#888888"
+    HIGHLIGHT = "#e4572e"
+
+    def __init__(
+        self,
+        canvas: FigureCanvasBase,
+        on_readout: Callable[[str], None] | None = None,
+        on_select: Callable[[Selection], None] | None = None,
+    ) -> None:
+        self.canvas = canvas
+        self.on_readout = on_readout
+        self.on_select = on_select
+        self.enabled = False
+        self._background = None
+        self._overlays: Dict[object, _AxesOverlay] = {}
+        self._active: _AxesOverlay | None = None
+        self._points: Dict[int, Tuple[object, np.ndarray, np.ndarray]] = {}
+        self._drag_start: MouseEvent | None = None
+        self._connections = [
+            canvas.mpl_connect("draw_event", self._on_draw),
+            canvas.mpl_connect("motion_notify_event", self._on_move),
+            canvas.mpl_connect("button_press_event", self._on_press),
+            canvas.mpl_connect("button_release_event", self._on_release),
+            canvas.mpl_connect("figure_leave_event", self._on_leave),
+        ]
+
+    def set_enabled(self, enabled: bool) -> None:
+        self.enabled = enabled
+        if not enabled:
+            self._hide()
+
+    def disconnect(self) -> None:
+        for cid in self._connections:
+            self.canvas.mpl_disconnect(cid)
+        self._connections = []
+
+    # Artists ------------------------------------------------------------------------
+
+    def _overlay_for(self, axes) -> _AxesOverlay:
+        overlay = self._overlays.get(axes)
+        if overlay is None:
+            style = dict(color=self.COLOR, linewidth=0.8, linestyle="--", animated=True)
+            vline = Line2D([0, 0], [0, 1], transform=axes.get_xaxis_transform(), **style)
+            hline = Line2D([0, 1], [0, 0], transform=axes.get_yaxis_transform(), **style)
+            marker = Line2D(
+                [], [], transform=axes.transData, marker="o", markersize=7,
+                markerfacecolor="none", markeredgecolor=self.HIGHLIGHT,
+                markeredgewidth=1.5, linestyle="None", animated=True,
+            )
+            band = Rectangle(
+                (0, 0), 0, 0, transform=axes.transData, facecolor=self.HIGHLIGHT,
+                edgecolor=self.HIGHLIGHT, alpha=0.2, animated=True,
+            )
+            overlay = _AxesOverlay(vline, hline, marker, band)
+            for artist in overlay.artists():
+                artist.set_figure(axes.figure)
+                artist.axes = axes
+                artist.set_clip_box(axes.bbox)
+                artist.set_visible(False)
+            self._overlays[axes] = overlay
+        return overlay
+
+    def _draw_overlays(self, renderer) -> None:
+        for overlay in self._overlays.values():
+            for artist in overlay.artists():
+                if artist.get_visible():
+                    artist.draw(renderer)
+
+    def _blit(self) -> None:
+        if self._background is None:
+            return
+        self.canvas.restore_region(self._background)
+        self._draw_overlays(self.canvas.get_renderer())
+        self.canvas.blit(self.canvas.figure.bbox)
+
+    def _hide(self) -> None:
+        changed = False
+        for overlay in self._overlays.values():
+            for artist in overlay.artists():
+                changed |= artist.get_visible()
+                artist.set_visible(False)
+        self._active = None
+        if changed:
+            self._blit()
+        if self.on_readout is not None:
+            self.on_readout("")
+
+    # Event handlers -----------------------------------------------------------------
+
+    def _on_draw(self, event) -> None:
+        figure = self.canvas.figure
+        # Axes that were removed from the figure take their overlay with them.
+        self._overlays = {
+            axes: overlay for axes, overlay in self._overlays.items() if axes in figure.axes
+        }
+        self._points.clear()
+        # Use the renderer that was drawn into: it may be an offscreen one
+        # filled by the render thread rather than the canvas' own.
+        self._background = event.renderer.copy_from_bbox(figure.bbox)
+        self._draw_overlays(event.renderer)
+
+    def _tracking(self, event: MouseEvent) -> bool:
+        # Pan/zoom tools hold the widget lock; stay out of their way.
+        return (
+            self.enabled
+            and event.inaxes is not None
+            and event.inaxes.get_navigate()
+            and not self.canvas.widgetlock.locked()
+        )
+
+    def _on_move(self, event: MouseEvent) -> None:
+        if not self._tracking(event):
+            if self._active is not None:
+                self._hide()
+            return
+        axes = event.inaxes
+        overlay = self._overlay_for(axes)
+        if self._active is not None and self._active is not overlay:
+            for artist in self._active.artists():
+                artist.set_visible(False)
+        self._active = overlay
+
+        overlay.vline.set_xdata([event.xdata, event.xdata])
+        overlay.hline.set_ydata([event.ydata, event.ydata])
+        overlay.vline.set_visible(True)
+        overlay.hline.set_visible(True)
+
+        text = f"x={axes.format_xdata(event.xdata)}  y={axes.format_ydata(event.ydata)}"
+        nearest = self._nearest(axes, event)
+        if nearest is not None:
+            label, x, y = nearest
+            overlay.marker.set_data([x], [y])
+            overlay.marker.set_visible(True)
+            text += f"  |  {label}: ({axes.format_xdata(x)}, {axes.format_ydata(y)})"
+        else:
+            overlay.marker.set_visible(False)
+            value = self._image_value(axes, event)
+            if value is not None:
+                text += f"  |  {value}"
+
+        if self._drag_start is not None and self._drag_start.inaxes is axes:
+            x0, y0 = self._drag_start.xdata, self._drag_start.ydata
+            overlay.band.set_bounds(x0, y0, event.xdata - x0, event.ydata - y0)
+            overlay.band.set_visible(True)
+
+        self._blit()
+        if self.on_readout is not None:
+            self.on_readout(text)
+
+    def _on_press(self, event: MouseEvent) -> None:
+        if event.button == MouseButton.LEFT and self._tracking(event):
+            self._drag_start = event
+
+    def _on_release(self, event: MouseEvent) -> None:
+        start, self._drag_start = self._drag_start, None
+        if start is None:
+            return
+        overlay = self._overlays.get(start.inaxes)
+        if overlay is not None and overlay.band.get_visible():
+            overlay.band.set_visible(False)
+            self._blit()
+        if event.inaxes is not start.inaxes or event.xdata is None:
+            return
+        if max(abs(event.x - start.x), abs(event.y - start.y)) < self.MIN_SELECTION:
+            return
+        selection = (
+            min(start.xdata, event.xdata),
+            max(start.xdata, event.xdata),
+            min(start.ydata, event.ydata),
+            max(start.ydata, event.ydata),
+        )
+        logger.debug("Rubber-band selection %s", selection)
+        if self.on_select is not None:
+            self.on_select(selection)
+
+    def _on_leave(self, event) -> None:
+        self._drag_start = None
+        self._hide()
+
+    # Lookups ------------------------------------------------------------------------
+
+    def _candidates(self, axes) -> List[Tuple[object, np.ndarray, np.ndarray]]:
+        """Displayed points of every series in ``axes`` as (label, data, pixels)."""
+        found = []
+        for artist in [*axes.lines, *axes.collections]:
+            if not artist.get_visible():
+                continue
+            cached = self._points.get(id(artist))
+            if cached is None:
+                if isinstance(artist, Line2D):
+                    data = np.asarray(artist.get_xydata(), dtype=np.float64)
+                    transform = artist.get_transform()
+                elif isinstance(artist, PathCollection):
+                    data = np.asarray(artist.get_offsets(), dtype=np.float64)
+                    transform = artist.get_offset_transform()
+                else:
+                    continue
+                if data.ndim != 2 or not len(data):
+                    continue
+                data = data[np.isfinite(data).all(axis=1)]
+                pixels = transform.transform(data) if len(data) else data
+                cached = (artist.get_label(), data, pixels)
+                self._points[id(artist)] = cached
+            if len(cached[1]):
+                found.append(cached)
+        return found
+
+    def _nearest(self, axes, event: MouseEvent) -> Tuple[str, float, float] | None:
+        best = None
+        best_distance = self.PICK_RADIUS ** 2
+        for label, data, pixels in self._candidates(axes):
+            distance = (pixels[:, 0] - event.x) ** 2 + (pixels[:, 1] - event.y) ** 2
+            position = int(distance.argmin())
+            if distance[position] <= best_distance:
+                best_distance = distance[position]
+                name = label if label and not str(label).startswith("_") else "数据点"
+                best = (str(name), float(data[position, 0]), float(data[position, 1]))
+        return best
+
+    @staticmethod
+    def _image_value(axes, event: MouseEvent) -> str | None:
+        for image in reversed(axes.images):
+            if not isinstance(image, AxesImage) or not image.contains(event)[0]:
+                continue
+            value = image.get_cursor_data(event)
+            if value is None:
+                continue
+            return image.format_cursor_data(value).strip("[]")
+        return None
+
+
+__all__ = ["ChartOverlay", "Selection"]
@@ -0,0 +1,88 @@
+"""Background chart rendering with latest-request-wins scheduling."""
+
+from __future__ import annotations
+
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Tuple
+
+from PySide6.QtCore import QObject, Signal
+
+logger = logging.getLogger("visulite.render_scheduler")
+
+# A render job receives a callable telling it whether it is still the latest
+# request, so it can skip expensive steps once it has been superseded.
+RenderJob = Callable[[Callable[[], bool]], Any]
+
+
+class RenderScheduler(QObject):
+    """Run render jobs one at a time on a worker thread.
+
+    Only the newest request matters: a request made while another render is
+    running replaces any request still waiting, and results of superseded
+    renders are dropped. Signals are always delivered on the thread that
+    owns the scheduler (the UI thread).
+    """
+
+    busy_changed = Signal(bool)
+    finished = Signal(object)
+    failed = Signal(str)
+    _done = Signal(int, object, object)
+
+    def __init__(self, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="visulite-render")
+        self._generation = 0
+        self._pending: Tuple[int, RenderJob] | None = None
+        self._running = False
+        self._done.connect(self._on_done)
+
+    @property
+    def busy(self) -> bool:
+        return self._running
+
+    def request(self, job: RenderJob) -> None:
+        """Schedule ``job``, superseding every earlier request."""
+        self._generation += 1
+        self._pending = (self._generation, job)
+        if not self._running:
+            self._start_next()
+
+    def shutdown(self) -> None:
+        self._pending = None
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def _is_current(self, generation: int) -> bool:
+        return generation == self._generation
+
+    def _start_next(self) -> None:
+        generation, job = self._pending  # type: ignore[misc]
+        self._pending = None
+        if not self._running:
+            self._running = True
+            self.busy_changed.emit(True)
+        future = self._executor.submit(job, lambda: self._is_current(generation))
+        future.add_done_callback(lambda done: self._report(generation, done))
+
+    def _report(self, generation: int, future: Future) -> None:
+        # Runs on the worker thread; the signal is queued to the UI thread.
+        error = future.exception()
+        self._done.emit(generation, None if error else future.result(), error)
+
+    def _on_done(self, generation: int, result: Any, error: BaseException | None) -> None:
+        if self._pending is not None:
+            logger.debug("Dropping superseded render %d", generation)
+            self._start_next()
+            return
+        self._running = False
+        self.busy_changed.emit(False)
+        if not self._is_current(generation):
+            return
+        if error is not None:
+            logger.error("Chart rendering error", exc_info=error)
+            self.failed.emit(str(error))
+        else:
+            self.finished.emit(result)
+
+
+__all__ = ["RenderJob", "RenderScheduler"]
@@ -299,7 +299,8 @@ QSpinBox::down-button, QDoubleSpinBox::down-button {
    List Widget - Modern Selection
    ============================================ */
 
-QListWidget {
+QListWidget,
+QListView#column-checklist {
     background-color: #ffffff;
     border: 1px solid #d0d5dd;
     border-radius: 6px;
@@ -307,17 +308,20 @@ QListWidget {
     outline: none;
 }
 
-QListWidget::item {
+QListWidget::item,
+QListView#column-checklist::item {
     padding: 6px 8px;
     border-radius: 4px;
     color: #1a1a1a;
 }
 
-QListWidget::item:hover {
+QListWidget::item:hover,
+QListView#column-checklist::item:hover {
     background-color: #f5f5f5;
 }
 
-QListWidget::item:selected {
+QListWidget::item:selected,
+QListView#column-checklist::item:selected {
     background-color: #e5f1fb;
     color: #1a1a1a;
 }
@@ -905,7 +909,8 @@ QSpinBox:focus, QDoubleSpinBox:focus {
 }
 
 /* List Widget */
-QListWidget {
+QListWidget,
+QListView#column-checklist {
     background-color: #2d2d2d;
     color: #e4e4e4;
     border: 1px solid #4d4d4d;
@@ -914,17 +919,20 @@ QListWidget {
     outline: none;
 }
 
-QListWidget::item {
+QListWidget::item,
+QListView#column-checklist::item {
     padding: 6px 8px;
     border-radius: 4px;
     color: #e4e4e4;
 }
 
-QListWidget::item:hover {
+QListWidget::item:hover,
+QListView#column-checklist::item:hover {
     background-color: #3d3d3d;
 }
 
-QListWidget::item:selected {
+QListWidget::item:selected,
+QListView#column-checklist::item:selected {
     background-color: #3d5a80;
     color: #e4e4e4;
 }
@@ -2,21 +2,91 @@
 
 from __future__ import annotations
 
-from PySide6.QtCore import Qt
-from PySide6.QtWidgets import QSizePolicy, QVBoxLayout, QWidget
+from typing import Callable, Iterable, List
+
+from PySide6.QtCore import (
+    QConcatenateTablesProxyModel,
+    QModelIndex,
+    QSortFilterProxyModel,
+    QStringListModel,
+    Qt,
+    Signal,
+)
+from PySide6.QtGui import QResizeEvent
+from PySide6.QtWidgets import (
+    QComboBox,
+    QCompleter,
+    QLineEdit,
+    QListView,
+    QSizePolicy,
+    QVBoxLayout,
+    QWidget,
+)
+from matplotlib.backend_bases import DrawEvent
+from matplotlib.backends.backend_agg import RendererAgg
 from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg, NavigationToolbar2QT
 from matplotlib.figure import Figure
+import numpy as np
+
+from visulite.models.column_list_model import CheckableColumnProxy, ColumnListModel
+from visulite.services.render_cache import RenderCache, decode_raster, encode_raster, render_key
+from visulite.ui.overlay import ChartOverlay
+from visulite.ui.render_scheduler import RenderScheduler
 
 
 class MatplotlibCanvas(FigureCanvasQTAgg):
-    """Lightweight matplotlib canvas with default figure."""
+    """Lightweight matplotlib canvas with default figure.
+
+    While frozen the canvas neither draws nor resizes its figure, so a
+    worker thread can render it; paint events keep showing the last image.
+    """
 
     def __init__(self) -> None:
         self.figure = Figure(figsize=(5, 4), tight_layout=True)
+        self._frozen = False
+        self._resize_pending = False
         super().__init__(self.figure)
         self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         self.updateGeometry()
 
+    def freeze(self) -> None:
+        self._frozen = True
+
+    def thaw(self, renderer: RendererAgg | None = None) -> None:
+        """Resume drawing, showing ``renderer``'s image if it still fits the canvas."""
+        self._frozen = False
+        if self._resize_pending:
+            self._resize_pending = False
+            self.resizeEvent(QResizeEvent(self.size(), self.size()))
+        elif renderer is not None and self._adopt(renderer):
+            self.update()
+        else:
+            self.draw_idle()
+
+    def _adopt(self, renderer: RendererAgg) -> bool:
+        current = self.get_renderer()
+        if (current.width, current.height, current.dpi) != (
+            renderer.width, renderer.height, renderer.dpi
+        ):
+            return False
+        self.renderer = renderer
+        return True
+
+    def draw(self) -> None:
+        if not self._frozen:
+            super().draw()
+
+    def draw_idle(self) -> None:
+        # Also called from the render thread, which must not start Qt timers.
+        if not self._frozen:
+            super().draw_idle()
+
+    def resizeEvent(self, event) -> None:  # noqa: N802
+        if self._frozen:
+            self._resize_pending = True
+            return
+        super().resizeEvent(event)
+
     @property
     def axes(self):
         if not self.figure.axes:
@@ -44,13 +114,34 @@ class LocalizedNavigationToolbar(NavigationToolbar2QT):
 
 
 class ChartWidget(QWidget):
-    """Widget containing a matplotlib canvas with navigation toolbar."""
+    """Widget containing a matplotlib canvas with navigation toolbar.
+
+    A blitted :class:`ChartOverlay` provides the crosshair, the hover readout
+    (``readout_changed``) and rubber-band selection (``selection_made``); it
+    stays disabled until :meth:`set_overlay_enabled` is called.
+
+    :meth:`render` draws charts on a worker thread through ``scheduler``;
+    the canvas and toolbar are locked until the finished image is shown.
+    """
+
+    readout_changed = Signal(str)
+    selection_made = Signal(float, float, float, float)
 
     def __init__(self, parent: QWidget | None = None) -> None:
         super().__init__(parent)
         self.canvas = MatplotlibCanvas()
         self.toolbar = LocalizedNavigationToolbar(self.canvas, self)
         self.toolbar.setObjectName("matplotlib-toolbar")
+        self.overlay = ChartOverlay(
+            self.canvas,
+            on_readout=self.readout_changed.emit,
+            on_select=lambda bounds: self.selection_made.emit(*bounds),
+        )
+        self._overlay_enabled = False
+        self.scheduler = RenderScheduler(self)
+        self.scheduler.busy_changed.connect(self._on_busy_changed)
+        self.scheduler.finished.connect(self.canvas.thaw)
+        self.scheduler.failed.connect(lambda _message: self.canvas.thaw())
 
         layout = QVBoxLayout(self)
         layout.setContentsMargins(0, 0, 0, 0)
@@ -83,6 +174,62 @@ class ChartWidget(QWidget):
             spine.set_visible(False)
         self.canvas.draw_idle()
 
+    def set_overlay_enabled(self, enabled: bool) -> None:
+        self._overlay_enabled = enabled
+        self.overlay.set_enabled(enabled and not self.scheduler.busy)
+
+    def render(
+        self,
+        plot: Callable[[Figure], None],
+        cache: RenderCache | None = None,
+        key: Callable[[Figure], str | None] | None = None,
+    ) -> None:
+        """Run ``plot(figure)`` and draw the figure off the UI thread.
+
+        Requests made while a render is running supersede each other; only
+        the newest one is drawn and shown. With a ``cache``, ``key(figure)``
+        (called after plotting) identifies the image; the canvas size and
+        DPI are added to it, and a cached image is shown instead of drawing.
+        """
+        canvas = self.canvas
+        figure = self.figure
+
+        def job(is_current: Callable[[], bool]) -> RendererAgg | None:
+            plot(figure)
+            if not is_current():
+                return None
+            width, height = canvas.get_width_height(physical=True)
+            renderer = RendererAgg(width, height, figure.dpi)
+            cache_key = None
+            if cache is not None and key is not None:
+                base = key(figure)
+                cache_key = render_key(base, width, height, figure.dpi) if base else None
+            cached = cache.get(cache_key) if cache_key is not None else None
+            if cached is not None:
+                # Lay out the artists as a draw would, so hover and zoom line
+                # up with the cached pixels, then announce the "draw".
+                engine = figure.get_layout_engine()
+                if engine is not None:
+                    engine.execute(figure)
+                np.asarray(renderer.buffer_rgba())[...] = decode_raster(cached)
+                canvas.callbacks.process("draw_event", DrawEvent("draw_event", canvas, renderer))
+                return renderer
+            figure.draw(renderer)
+            if cache_key is not None:
+                cache.put(cache_key, encode_raster(np.asarray(renderer.buffer_rgba())))
+            return renderer
+
+        self.scheduler.request(job)
+
+    def _on_busy_changed(self, busy: bool) -> None:
+        if busy:
+            self.overlay.set_enabled(False)
+            self.canvas.freeze()
+        else:
+            self.overlay.set_enabled(self._overlay_enabled)
+        self.canvas.setEnabled(not busy)
+        self.toolbar.setEnabled(not busy)
+
     @property
     def figure(self):
         return self.canvas.figure
@@ -92,4 +239,120 @@ class ChartWidget(QWidget):
         return self.canvas.axes
 
 
-__all__ = ["MatplotlibCanvas", "ChartWidget"]
+class ColumnComboBox(QComboBox):
+    """Combo box backed by the shared :class:`ColumnListModel`.
+
+    An optional ``placeholder`` entry (e.g. "不处理") is prepended through a
+    concatenating proxy so the column list itself is never copied. Typing
+    filters the columns incrementally through a contains-match completer;
+    text that names no column is replaced by the current choice once
+    editing ends, and :meth:`selected_column` reads the choice from the
+    model, never from the edit text.
+    """
+
+    def __init__(
+        self,
+        model: ColumnListModel,
+        placeholder: str | None = None,
+        parent: QWidget | None = None,
+    ) -> None:
+        super().__init__(parent)
+        self._has_placeholder = placeholder is not None
+        if placeholder is not None:
+            self._placeholder_model = QStringListModel([placeholder], self)
+            combined = QConcatenateTablesProxyModel(self)
+            combined.addSourceModel(self._placeholder_model)
+            combined.addSourceModel(model)
+            self.setModel(combined)
+        else:
+            self.setModel(model)
+        self.setEditable(True)
+        self.setInsertPolicy(QComboBox.NoInsert)
+        self.setMaxVisibleItems(20)
+        self.setSizeAdjustPolicy(QComboBox.AdjustToMinimumContentsLengthWithIcon)
+        self.setMinimumContentsLength(8)
+        view = self.view()
+        if isinstance(view, QListView):
+            view.setUniformItemSizes(True)
+
+        completer = QCompleter(self.model(), self)
+        completer.setCaseSensitivity(Qt.CaseInsensitive)
+        completer.setFilterMode(Qt.MatchContains)
+        completer.setCompletionMode(QCompleter.PopupCompletion)
+        self.setCompleter(completer)
+        self.lineEdit().editingFinished.connect(self._commit_text)
+        self.model().modelReset.connect(self._select_first)
+
+    def selected_column(self) -> str | None:
+        """The chosen column; ``None`` for the placeholder entry or an empty list."""
+        index = self.currentIndex()
+        if index < 0 or (self._has_placeholder and index == 0):
+            return None
+        return self.itemText(index)
+
+    def _commit_text(self) -> None:
+        """Select the column that was typed, or show the current choice again."""
+        text = self.currentText()
+        index = self.findText(text, Qt.MatchExactly)
+        if index < 0:
+            index = self.findText(text, Qt.MatchFixedString)  # ignoring case
+        if index >= 0:
+            self.setCurrentIndex(index)
+        current = self.currentIndex()
+        self.setEditText(self.itemText(current) if current >= 0 else "")
+
+    def _select_first(self) -> None:
+        if self.count():
+            self.setCurrentIndex(0)
+
+
+class ColumnChecklist(QWidget):
+    """Searchable multi-select list of columns for Y axis selection."""
+
+    def __init__(self, model: ColumnListModel, parent: QWidget | None = None) -> None:
+        super().__init__(parent)
+        self.checkable_model = CheckableColumnProxy(model)
+        self.filter_model = QSortFilterProxyModel(self)
+        self.filter_model.setSourceModel(self.checkable_model)
+        self.filter_model.setFilterCaseSensitivity(Qt.CaseInsensitive)
+
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("搜索列...")
+        self.search_edit.setClearButtonEnabled(True)
+        self.search_edit.textChanged.connect(self.filter_model.setFilterFixedString)
+
+        self.view = QListView()
+        self.view.setObjectName("column-checklist")
+        self.view.setModel(self.filter_model)
+        self.view.setUniformItemSizes(True)
+        self.view.setMinimumHeight(110)
+        self.view.clicked.connect(self._toggle)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(4)
+        layout.addWidget(self.search_edit)
+        layout.addWidget(self.view)
+
+    def checked_columns(self) -> List[str]:
+        return self.checkable_model.checked_columns()
+
+    def set_checked_columns(self, columns: Iterable[str]) -> None:
+        self.checkable_model.set_checked_columns(columns)
+
+    def set_visible_checked(self, checked: bool) -> None:
+        """Check or uncheck every column that matches the current search."""
+        columns = [
+            self.filter_model.index(row, 0).data(Qt.DisplayRole)
+            for row in range(self.filter_model.rowCount())
+        ]
+        self.checkable_model.set_checked(columns, checked)
+
+    def _toggle(self, index: QModelIndex) -> None:
+        source_index = self.filter_model.mapToSource(index)
+        state = self.checkable_model.data(source_index, Qt.CheckStateRole)
+        new_state = Qt.Unchecked if state == Qt.Checked else Qt.Checked
+        self.checkable_model.setData(source_index, new_state, Qt.CheckStateRole)
+
+
+__all__ = ["MatplotlibCanvas", "ChartWidget", "ColumnComboBox", "ColumnChecklist"]